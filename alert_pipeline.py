@@ -0,0 +1,245 @@
+# alert_pipeline.py (Alert storm control)
+"""
+Sits between alert.raise / geofence alerts and the operator screen (the
+notify 'alerts' topic), so a target flapping on a zone boundary or an agent
+stuck in a loop cannot flood the consoles:
+
+1. Dedup: an alert whose (level, zone_id, target_id, message) matches one
+   delivered less than `dedup_s` ago is suppressed.
+2. Per-key token bucket on (level, zone_id, target_id): `key_rate` alerts
+   per second sustained, `key_burst` at once. Catches floods whose message
+   text varies (e.g. "speed 23.4 kn", "speed 23.5 kn").
+3. Global token bucket (`global_rate` / `global_burst`): hard bound on what
+   reaches the screen, whatever the number of keys.
+
+Suppressed alerts are counted per dedup key and folded into one summary
+alert every `summary_s` (level = highest suppressed level, top keys listed).
+Summaries and clears bypass the buckets; there is at most one summary per
+interval, so output stays bounded at global_rate + 1/summary_s.
+
+Delivered alerts, summaries and clears go to a bounded history (deque) that
+alert.history queries, and to every fn in `sinks`. Dedup/bucket state for
+idle keys is pruned by the summary thread, so memory follows the number of
+recently active keys (pending summary keys are capped at `max_keys`).
+
+Settings (from_env): ALERT_DEDUP_S, ALERT_KEY_RATE_PER_MIN, ALERT_KEY_BURST,
+ALERT_GLOBAL_RATE_PER_S, ALERT_GLOBAL_BURST, ALERT_SUMMARY_S, ALERT_HISTORY,
+ALERT_MAX_KEYS. Benchmark: python bench_alerts.py
+"""
+import os
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+LEVELS = ("info", "warning", "critical")
+_RANK = {lv: i for i, lv in enumerate(LEVELS)}
+
+
+class TokenBucket:
+    """rate tokens/s up to burst; one token per delivered alert."""
+
+    __slots__ = ("tokens", "t")
+
+    def __init__(self, burst: float, now: float):
+        self.tokens, self.t = burst, now
+
+    def take(self, rate: float, burst: float, now: float) -> bool:
+        self.tokens = min(burst, self.tokens + (now - self.t) * rate)
+        self.t = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def full(self, rate: float, burst: float, now: float) -> bool:
+        return self.tokens + (now - self.t) * rate >= burst
+
+
+class AlertPipeline:
+
+    def __init__(self, *, dedup_s: float = 5.0, key_rate: float = 0.1, key_burst: float = 3,
+                 global_rate: float = 20.0, global_burst: float = 40, summary_s: float = 10.0,
+                 history: int = 1000, max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.dedup_s = dedup_s
+        self.key_rate, self.key_burst = key_rate, key_burst
+        self.global_rate, self.global_burst = global_rate, global_burst
+        self.summary_s = summary_s
+        self.max_keys = max_keys
+        self.clock = clock
+        self.sinks: List[Callable[[dict], None]] = []
+        self.history: deque = deque(maxlen=history)
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._last: Dict[tuple, float] = {}            # dedup key -> last delivered (clock)
+        self._buckets: Dict[tuple, TokenBucket] = {}   # (level, zone_id, target_id) -> bucket
+        self._global = TokenBucket(global_burst, clock())
+        self._pending: Dict[tuple, list] = {}          # dedup key -> [count, first_ts, last_ts, reasons]
+        self._overflow = 0                             # suppressed alerts whose key did not fit in _pending
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # counters
+        self.submitted = 0
+        self.delivered = 0
+        self.suppressed: Dict[str, int] = {"duplicate": 0, "key_rate": 0, "global_rate": 0}
+        self.summaries = 0
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "AlertPipeline":
+        return cls(
+            dedup_s=float(env.get("ALERT_DEDUP_S", "5")),
+            key_rate=float(env.get("ALERT_KEY_RATE_PER_MIN", "6")) / 60.0,
+            key_burst=float(env.get("ALERT_KEY_BURST", "3")),
+            global_rate=float(env.get("ALERT_GLOBAL_RATE_PER_S", "20")),
+            global_burst=float(env.get("ALERT_GLOBAL_BURST", "40")),
+            summary_s=float(env.get("ALERT_SUMMARY_S", "10")),
+            history=int(env.get("ALERT_HISTORY", "1000")),
+            max_keys=int(env.get("ALERT_MAX_KEYS", "10000")),
+        )
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="alert-summary", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.summary_s):
+            self.flush()
+
+    # ---- input ----
+    def submit(self, level: str, message: str, zone_id: Optional[str] = None,
+               target_id: Optional[str] = None) -> Tuple[dict, Optional[str]]:
+        """Returns (alert, None) when delivered, (alert, reason) when suppressed."""
+        alert = {"level": level, "message": message, "zone_id": zone_id, "target_id": target_id}
+        key = (level, zone_id, target_id, message)
+        now = self.clock()
+        with self._lock:
+            self.submitted += 1
+            last = self._last.get(key)
+            if last is not None and now - last < self.dedup_s:
+                reason = "duplicate"
+            else:
+                bkey = key[:3]
+                bucket = self._buckets.get(bkey)
+                if bucket is None:
+                    bucket = self._buckets[bkey] = TokenBucket(self.key_burst, now)
+                if not bucket.take(self.key_rate, self.key_burst, now):
+                    reason = "key_rate"
+                elif not self._global.take(self.global_rate, self.global_burst, now):
+                    reason = "global_rate"
+                else:
+                    reason = None
+            if reason is not None:
+                self.suppressed[reason] += 1
+                self._fold(key, reason)
+                return alert, reason
+            self._last[key] = now
+            self.delivered += 1
+            entry = self._record("alert", alert)
+        self._emit(entry)
+        return alert, None
+
+    def clear(self) -> dict:
+        """Operator cleared the screen: log it and let the next alert of every key through dedup."""
+        with self._lock:
+            self._last.clear()
+            entry = self._record("clear", {"cleared": True})
+        self._emit(entry)
+        return entry
+
+    # ---- summaries ----
+    def _fold(self, key: tuple, reason: str) -> None:
+        ts = time.time()
+        p = self._pending.get(key)
+        if p is None:
+            if len(self._pending) >= self.max_keys:
+                self._overflow += 1
+                return
+            p = self._pending[key] = [0, ts, ts, {}]
+        p[0] += 1
+        p[2] = ts
+        p[3][reason] = p[3].get(reason, 0) + 1
+
+    def flush(self, top: int = 10) -> Optional[dict]:
+        """Emit one summary of everything suppressed since the last flush (if any) and prune idle state."""
+        now = self.clock()
+        with self._lock:
+            self._prune(now)
+            if not self._pending and not self._overflow:
+                return None
+            pending, overflow = self._pending, self._overflow
+            self._pending, self._overflow = {}, 0
+            total = sum(p[0] for p in pending.values()) + overflow
+            level = max((k[0] for k in pending), key=lambda lv: _RANK.get(lv, 0), default="info")
+            keys = sorted(pending.items(), key=lambda kv: -kv[1][0])[:top]
+            summary = {
+                "level": level,
+                "message": f"{total} alerts suppressed ({len(pending)} distinct)",
+                "zone_id": None,
+                "target_id": None,
+                "suppressed": total,
+                "distinct": len(pending) + (1 if overflow else 0),
+                "top": [
+                    {"level": k[0], "zone_id": k[1], "target_id": k[2], "message": k[3],
+                     "count": p[0], "first_ts": p[1], "last_ts": p[2], "reasons": p[3]}
+                    for k, p in keys
+                ],
+            }
+            self.summaries += 1
+            entry = self._record("summary", summary)
+        self._emit(entry)
+        return entry
+
+    def _prune(self, now: float) -> None:
+        self._last = {k: t for k, t in self._last.items() if now - t < self.dedup_s}
+        self._buckets = {k: b for k, b in self._buckets.items() if not b.full(self.key_rate, self.key_burst, now)}
+
+    # ---- output ----
+    def _record(self, kind: str, body: dict) -> dict:
+        self.seq += 1
+        entry = {"seq": self.seq, "ts": time.time(), "kind": kind, **body}
+        self.history.append(entry)
+        return entry
+
+    def _emit(self, entry: dict) -> None:
+        for fn in self.sinks:
+            fn(entry)
+
+    def query(self, since_seq: int = 0, level: Optional[str] = None, zone_id: Optional[str] = None,
+              target_id: Optional[str] = None, kind: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """
+        Oldest-first history entries after since_seq matching every given filter,
+        the first `limit` of them; pass the last seq back as since_seq for the next page.
+        """
+        min_rank = _RANK.get(level, 0) if level else 0
+        with self._lock:
+            items = list(self.history)
+        out = (
+            e for e in items
+            if e["seq"] > since_seq
+            and (not level or _RANK.get(e.get("level"), -1) >= min_rank)
+            and (zone_id is None or e.get("zone_id") == zone_id)
+            and (target_id is None or e.get("target_id") == target_id)
+            and (kind is None or e["kind"] == kind)
+        )
+        return list(islice(out, limit))
+
+    def stats(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "suppressed": dict(self.suppressed),
+            "summaries": self.summaries,
+            "pending_keys": len(self._pending),
+            "active_keys": len(self._buckets),
+            "history": len(self.history),
+        }
+
+
+PIPELINE = AlertPipeline.from_env(os.environ)
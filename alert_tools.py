@@ -1,25 +1,65 @@
 # alert_tools.py (Alert Management)
+from typing import Literal, Optional
+
 from pydantic import BaseModel, Field
 from server_main import app
 
+import notify
+from alert_pipeline import PIPELINE
+
+# 전달된 알림/요약/해제는 notify 'alerts' 토픽으로 (운용자 화면), 키는 파이프라인 순번
+PIPELINE.sinks.append(lambda entry: notify.HUB.publish("alerts", {str(entry["seq"]): entry}))
+
 class AlertRaiseParams(BaseModel):
     level: str = Field(..., pattern=r"^(info|warning|critical)$")
     message: str
     zone_id: str | None = None
     target_id: str | None = None
 
+class AlertHistoryParams(BaseModel):
+    since_seq: int = Field(0, ge=0, description="Only entries after this seq (from a previous call)")
+    level: Optional[Literal["info", "warning", "critical"]] = Field(None, description="Minimum level")
+    zone_id: Optional[str] = None
+    target_id: Optional[str] = None
+    kind: Optional[Literal["alert", "summary", "clear"]] = None
+    limit: int = Field(100, ge=1, le=1000)
+
 @app.tool(
     name="alert.raise",
     description=(
         "이 함수를 호출하면 운용자(사용자)의 모니터 화면에 알림 팝업이 표시된다. "
         "알림 창에 표시될 문구(제목/내용/심각도 등)는 AlertRaiseParams 파라미터로 전달받아 사용한다. "
-        "카메라 움직임이나 모드 변경은 수행하지 않고, 오직 화면 알림을 띄울 때만 사용한다."
+        "카메라 움직임이나 모드 변경은 수행하지 않고, 오직 화면 알림을 띄울 때만 사용한다. "
+        "같은 알림의 반복이나 과도한 빈도는 억제되고(suppressed 사유 반환) 주기적 요약 알림으로 합쳐진다."
     ),
 )
 def alert_raise(params: AlertRaiseParams):
-    return {"ok": True, "alert": params.dict()}
+    return _raise_internal(params)
+
+
+def _raise_internal(params: AlertRaiseParams) -> dict:
+    # alert.raise 와 서버 내부 이벤트(지오펜스 등)가 공유하는 경로: 중복 제거 + 속도 제한 (alert_pipeline)
+    PIPELINE.start()
+    alert, reason = PIPELINE.submit(params.level, params.message, params.zone_id, params.target_id)
+    out = {"ok": True, "alert": alert, "delivered": reason is None}
+    if reason is not None:
+        out["suppressed"] = reason
+    return out
 
 
 @app.tool(name="alert.clear", description="Clear current alert")
 def alert_clear():
+    PIPELINE.clear()
     return {"ok": True, "cleared": True}
+
+
+@app.tool(
+    name="alert.history",
+    description=(
+        "Recent delivered alerts, suppression summaries and clears (bounded in-memory history), oldest first. "
+        "Pass the last seq as since_seq to page forward. Includes pipeline counters."
+    ),
+)
+def alert_history(params: AlertHistoryParams):
+    items = PIPELINE.query(params.since_seq, params.level, params.zone_id, params.target_id, params.kind, params.limit)
+    return {"ok": True, "count": len(items), "alerts": items, "stats": PIPELINE.stats()}
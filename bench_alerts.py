@@ -0,0 +1,95 @@
+# bench_alerts.py
+"""
+알림 폭주 억제(alert_pipeline) 벤치마크: 초당 --rate 건을 넣고 화면(sink)으로 나가는 양을 잰다.
+
+입력 믹스 (초당 rate 건, --seconds 동안 10ms 단위로 균일하게 투입):
+- flap   : 경계에서 들락거리는 표적 --keys 개 x 구역 -> 같은 문구가 반복 (dedup 대상)
+- speed  : 속도 위반 문구에 값이 섞여 매번 달라짐 -> 키 버킷 대상
+- unique : 표적마다 한 번씩 나오는 새 키 -> 전역 버킷 대상
+측정:
+- in_rate       : 실제로 넣은 초당 건수
+- out_rate_max  : 1초 창 기준 최대 출력 (알림 + 요약 + 해제). 상한 = global_burst + global_rate + 1/summary_s
+- submit_us     : submit 1건 비용 (p50/p99, 마이크로초)
+- suppressed    : 사유별 억제 건수, summaries: 요약 알림 수
+
+    python bench_alerts.py
+    python bench_alerts.py --rate 10000 --seconds 10 --summary-s 2
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from alert_pipeline import AlertPipeline
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rate", type=int, default=10_000, help="입력 알림/초")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--keys", type=int, default=200, help="들락거리는 (구역, 표적) 키 수")
+    ap.add_argument("--summary-s", type=float, default=1.0)
+    ap.add_argument("--global-rate", type=float, default=20.0)
+    ap.add_argument("--global-burst", type=float, default=40.0)
+    args = ap.parse_args()
+
+    pipe = AlertPipeline(summary_s=args.summary_s, global_rate=args.global_rate, global_burst=args.global_burst)
+    out_ts: list = []
+    pipe.sinks.append(lambda e: out_ts.append(time.monotonic()))
+    pipe.start()
+
+    rng = np.random.default_rng(0)
+    tick = 0.01
+    per_tick = max(1, int(args.rate * tick))
+    n_ticks = int(args.seconds / tick)
+    kinds = rng.choice(3, size=(n_ticks, per_tick), p=[0.7, 0.25, 0.05])
+    keys = rng.integers(0, args.keys, size=(n_ticks, per_tick))
+    lat = np.empty(n_ticks * per_tick)
+
+    t0 = time.monotonic()
+    uniq = 0
+    i = 0
+    for k in range(n_ticks):
+        for kind, key in zip(kinds[k].tolist(), keys[k].tolist()):
+            zone, tgt = f"Z{key % 17:02d}", f"T{key:05d}"
+            s = time.perf_counter()
+            if kind == 0:
+                pipe.submit("critical", f"{tgt} entered no-entry zone {zone}", zone, tgt)
+            elif kind == 1:
+                pipe.submit("warning", f"{tgt} over speed limit in {zone}: {20 + (i % 97) / 10:.1f} kn", zone, tgt)
+            else:
+                uniq += 1
+                pipe.submit("info", f"new contact U{uniq}", None, f"U{uniq:07d}")
+            lat[i] = time.perf_counter() - s
+            i += 1
+        # 10ms 단위로 투입 속도를 맞춘다 (따라잡지 못하면 쉬지 않고 계속)
+        delay = t0 + (k + 1) * tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.monotonic() - t0
+    time.sleep(args.summary_s * 1.1)  # 마지막 요약까지 받는다
+    pipe.stop()
+
+    out = np.asarray(out_ts) - t0
+    windows = np.bincount(np.floor(out).astype(int)) if out.size else np.zeros(1, int)
+    bound = args.global_burst + args.global_rate + 1.0 / args.summary_s
+    lat = lat[:i] * 1e6
+    report = {
+        "in_total": i,
+        "in_rate": round(i / elapsed),
+        "out_total": int(out.size),
+        "out_rate_mean": round(out.size / (elapsed + args.summary_s * 1.1), 1),
+        "out_rate_max": int(windows.max()),
+        "out_rate_bound": bound,
+        "bounded": bool(windows.max() <= bound),
+        "submit_us": {"p50": round(float(np.percentile(lat, 50)), 2), "p99": round(float(np.percentile(lat, 99)), 2)},
+        **pipe.stats(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
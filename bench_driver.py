@@ -0,0 +1,63 @@
+# bench_driver.py
+"""
+장비 드라이버 계층 지연/처리량 벤치마크 (로컬 TCP 시뮬레이터 사용, 실장비 불필요).
+
+    python bench_driver.py
+    python bench_driver.py --latency-ms 2 --commands 5000 --concurrency 1 16 64 --pool 1 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from eots_driver import DeviceDriver
+from eots_simulator import EotsSimulator
+
+
+async def _run(port: int, pool: int, concurrency: int, n: int, queue: int) -> dict:
+    drv = DeviceDriver("127.0.0.1", port, pool_size=pool, queue_size=queue, timeout_s=5.0)
+    await drv.start()
+    await drv.send("ping")  # 연결 수립 대기
+    lat = np.zeros(n)
+    counter = iter(range(n))
+
+    async def worker() -> None:
+        for i in counter:
+            t = time.perf_counter()
+            await drv.send("set_pan", pan_deg=float(i % 360 - 180))
+            lat[i] = time.perf_counter() - t
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    await drv.close()
+    return {
+        "pool": pool, "concurrency": concurrency, "cmds_per_s": n / wall,
+        "p50_ms": np.percentile(lat, 50) * 1e3, "p99_ms": np.percentile(lat, 99) * 1e3,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    sim = EotsSimulator(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    port = await sim.start()
+    print(f"simulator latency {args.latency_ms} ms (+{args.jitter_ms} ms jitter), {args.commands} commands")
+    print(f"{'pool':>4} {'conc':>5} {'cmds/s':>10} {'p50_ms':>8} {'p99_ms':>8}")
+    for pool in args.pool:
+        for c in args.concurrency:
+            r = await _run(port, pool, c, args.commands, max(args.queue, c))
+            print(f"{r['pool']:>4} {r['concurrency']:>5} {r['cmds_per_s']:>10,.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+    await sim.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=5.0)
+    ap.add_argument("--jitter-ms", type=float, default=1.0)
+    ap.add_argument("--commands", type=int, default=2000)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    ap.add_argument("--pool", type=int, nargs="+", default=[1, 4])
+    ap.add_argument("--queue", type=int, default=64)
+    asyncio.run(main(ap.parse_args()))
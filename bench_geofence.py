@@ -0,0 +1,96 @@
+# bench_geofence.py
+"""
+지오펜스 증분 평가 처리량 벤치마크: 표적 10k x 구역 500, 1 Hz 갱신.
+
+매 tick 마다 모든 표적을 speed_kn/heading_deg 로 1초 추측항법 이동시키고
+target.update_tracks_batch 경로(_apply_updates)와 target.update_track 단건 경로로
+지오펜스 평가까지 포함한 처리 시간을 측정한다.
+
+    python bench_geofence.py
+    python bench_geofence.py --targets 10000 --zones 500 --ticks 10
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+
+import numpy as np
+
+import target_tools as tt
+import zone_tools as zt
+
+LAT_RANGE = (36.5, 38.0)
+LON_RANGE = (129.0, 130.2)
+
+
+def _polygon(rng: random.Random, k: int = 10) -> list:
+    clat, clon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+    r = rng.uniform(0.01, 0.03)
+    angs = sorted(rng.uniform(0, 2 * math.pi) for _ in range(k))
+    return [[clat + r * math.sin(a), clon + r * math.cos(a)] for a in angs]
+
+
+def _setup(n_targets: int, n_zones: int, rng: random.Random) -> None:
+    for i in range(n_zones):
+        zid = f"Z{i:04d}"
+        zt.zone_define.fn(zt.ZoneDefineParams(zone_id=zid, polygon=_polygon(rng)))
+        if i % 2 == 0:
+            zt.zone_set_rule.fn(zt.ZoneRuleParams(zone_id=zid, rule="no_entry"))
+        elif i % 4 == 1:
+            zt.zone_set_rule.fn(zt.ZoneRuleParams(zone_id=zid, rule="speed_limit", value=12.0))
+    for i in range(n_targets):
+        tt.target_register.fn(tt.TargetRegisterParams(
+            target_id=f"T{i:06d}", cls="vessel",
+            lat=rng.uniform(*LAT_RANGE), lon=rng.uniform(*LON_RANGE),
+            speed_kn=rng.uniform(0, 30), heading_deg=rng.uniform(0, 359.9),
+        ))
+
+
+def _tick_updates(dt_s: float) -> list:
+    # 1초 추측항법 (1 kn = 1.852 km/h)
+    lat, lon = tt._TARGETS.col("lat"), tt._TARGETS.col("lon")
+    spd, hdg = tt._TARGETS.col("speed_kn"), np.radians(tt._TARGETS.col("heading_deg"))
+    km = spd * 1.852 * dt_s / 3600.0
+    new_lat = lat + km * np.cos(hdg) / tt._KM_PER_DEG
+    new_lon = lon + km * np.sin(hdg) / (tt._KM_PER_DEG * np.cos(np.radians(lat)))
+    return [tt.TargetUpdateParams(target_id=tid, lat=a, lon=b)
+            for tid, a, b in zip(tt._TARGETS.ids, new_lat.tolist(), new_lon.tolist())]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--targets", type=int, default=10_000)
+    ap.add_argument("--zones", type=int, default=500)
+    ap.add_argument("--ticks", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=11)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    _setup(args.targets, args.zones, rng)
+    print(f"setup: {args.targets} targets, {args.zones} zones in {time.perf_counter() - t0:.2f}s")
+
+    batch_s, alerts = [], 0
+    for _ in range(args.ticks):
+        ups = _tick_updates(1.0)
+        t = time.perf_counter()
+        _, _, ev = tt._apply_updates(ups)
+        batch_s.append(time.perf_counter() - t)
+        alerts += len(ev)
+    b = np.array(batch_s)
+    print(f"batch path : {b.mean() * 1e3:7.1f} ms/tick (p max {b.max() * 1e3:.1f} ms), "
+          f"{args.targets / b.mean():,.0f} updates/s, 1 Hz budget used {b.mean() * 100:.1f}%, "
+          f"{alerts} alerts over {args.ticks} ticks")
+
+    ups = _tick_updates(1.0)
+    t = time.perf_counter()
+    for u in ups:
+        tt.target_update.fn(u)
+    single = time.perf_counter() - t
+    print(f"single path: {single * 1e3:7.1f} ms/tick, {args.targets / single:,.0f} updates/s")
+
+
+if __name__ == "__main__":
+    main()
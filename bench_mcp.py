@@ -0,0 +1,302 @@
+# bench_mcp.py
+"""
+MCP 부하 생성 / 벤치마크 (mcpclient_test.make_client 기반)
+
+server_main.app 을 로컬에서 띄우고 N 개의 fastmcp.Client 세션이 동시에 툴 믹스를 호출한다.
+- transport=memory : 같은 프로세스의 app 에 in-memory 로 연결 (서버 로직 자체의 비용)
+- transport=http   : server_main.py 를 자식 프로세스로 띄우고 Streamable-HTTP(/mcp) 로 연결
+- 툴 믹스(--mix): ptz / objects / targets / zones / mixed (아래 MIXES). 가중치대로 무작위 선택.
+  targets/zones 호출 전에 setup 단계에서 표적 --targets 개와 구역 --zones 개를 등록해 둔다.
+- 결과: 툴별 calls/errors/throughput/p50/p95/p99(ms) + 전체 합계를 JSON 으로 출력 (--out 파일).
+- 회귀 비교: --baseline 파일(이전 --out 결과)과 transport 별로 비교해 처리량이 --tolerance 비율 이상
+  떨어지거나 p95 가 그만큼 늘어난 툴을 regressions 로 보고하고 종료 코드 1.
+
+    python bench_mcp.py
+    python bench_mcp.py --transport memory http --sessions 16 --duration 10 --mix mixed
+    python bench_mcp.py --out bench_mcp.json                     # 기준선 저장
+    python bench_mcp.py --baseline bench_mcp.json --tolerance 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")  # 요청마다 찍히는 INFO 로그가 측정을 가리지 않도록
+
+import httpx
+import numpy as np
+
+from mcpclient_test import make_client
+
+# 동해안 감시 구역 근방
+LAT_RANGE = (36.5, 38.0)
+LON_RANGE = (129.0, 130.2)
+
+Args = Callable[[random.Random], Dict[str, Any]]
+
+
+def _latlon(rng: random.Random) -> Tuple[float, float]:
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+
+
+def _target_id(rng: random.Random, n: int) -> str:
+    return f"T{rng.randrange(n):06d}"
+
+
+def _square(lat: float, lon: float, half: float) -> List[List[float]]:
+    return [[lat - half, lon - half], [lat - half, lon + half], [lat + half, lon + half], [lat + half, lon - half]]
+
+
+def mixes(n_targets: int, n_zones: int) -> Dict[str, List[Tuple[str, float, Args]]]:
+    """믹스 이름 -> [(툴 이름, 가중치, 인자 생성 함수)]."""
+    ptz = [
+        ("eots.set_pan", 3, lambda r: {"pan_deg": round(r.uniform(-180, 180), 1)}),
+        ("eots.set_tilt", 2, lambda r: {"tilt_deg": round(r.uniform(-10, 10), 1)}),
+        ("eots.zoom", 2, lambda r: {"sensor": r.choice(["eo", "ir"]), "level": r.randint(1, 30)}),
+        ("eots.apply", 2, lambda r: {"mode": r.choice(["eo", "ir"]), "zoom": r.randint(1, 30),
+                                     "pan_deg": round(r.uniform(-180, 180), 1)}),
+        ("eots.stop", 1, lambda r: {}),
+    ]
+    objects = [
+        ("eots.objects_list", 4, lambda r: {}),
+        ("eots.objects_since", 1, lambda r: {"cursor": 0, "mode": "diff"}),
+    ]
+
+    def _update(r: random.Random) -> Dict[str, Any]:
+        lat, lon = _latlon(r)
+        return {"params": {"target_id": _target_id(r, n_targets), "lat": lat, "lon": lon,
+                           "speed_kn": round(r.uniform(0, 30), 1)}}
+
+    def _batch(r: random.Random) -> Dict[str, Any]:
+        return {"params": {"updates": [_update(r)["params"] for _ in range(50)]}}
+
+    def _nearest(r: random.Random) -> Dict[str, Any]:
+        lat, lon = _latlon(r)
+        return {"params": {"lat": lat, "lon": lon, "radius_km": 10.0, "limit": 10}}
+
+    targets = [
+        ("target.update_track", 4, _update),
+        ("target.update_tracks_batch", 1, _batch),
+        ("target.query_nearest", 3, _nearest),
+    ]
+
+    def _contains(r: random.Random) -> Dict[str, Any]:
+        lat, lon = _latlon(r)
+        return {"params": {"lat": lat, "lon": lon}}
+
+    def _classify(r: random.Random) -> Dict[str, Any]:
+        return {"params": {"points": [list(_latlon(r)) for _ in range(200)]}}
+
+    zones = [
+        ("zone.contains", 4, _contains),
+        ("zone.classify_points", 1, _classify),
+        ("zone.list", 1, lambda r: {"params": {}}),
+        ("zone.move_camera", 1, lambda r: {"zone_id": f"Z{r.randrange(n_zones):04d}"}),
+    ]
+    return {
+        "ptz": ptz,
+        "objects": objects,
+        "targets": targets,
+        "zones": zones,
+        "mixed": ptz + objects + targets + zones + [("system.status", 1, lambda r: {})],
+    }
+
+
+# =========================
+# 서버 기동 / 준비
+# =========================
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_http_server(timeout_s: float = 30.0) -> Tuple[subprocess.Popen, str]:
+    """server_main.py 를 자식 프로세스로 띄우고 /metrics 가 응답할 때까지 기다린다."""
+    port = _free_port()
+    env = {**os.environ, "MCP_HOST": "127.0.0.1", "MCP_PORT": str(port), "MCP_PATH": "/mcp"}
+    proc = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "server_main.py")],
+                            env=env, stdout=subprocess.DEVNULL)  # stdout 은 결과 JSON 전용
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=0.5).status_code == 200:
+                return proc, f"http://127.0.0.1:{port}/mcp"
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("server did not come up in time")
+
+
+async def setup(url: Optional[str], n_targets: int, n_zones: int, seed: int) -> None:
+    rng = random.Random(seed)
+    async with make_client(url) as client:
+        for i in range(n_zones):
+            lat, lon = _latlon(rng)
+            await client.call_tool("zone.define", {"params": {"zone_id": f"Z{i:04d}", "polygon": _square(lat, lon, 0.02)}})
+        for i in range(n_targets):
+            lat, lon = _latlon(rng)
+            await client.call_tool("target.register", {"params": {
+                "target_id": f"T{i:06d}", "cls": "vessel", "lat": lat, "lon": lon,
+                "speed_kn": round(rng.uniform(0, 30), 1), "heading_deg": round(rng.uniform(0, 359), 1)}})
+
+
+# =========================
+# 부하 실행
+# =========================
+async def run_load(url: Optional[str], mix: List[Tuple[str, float, Args]], sessions: int,
+                   duration_s: float, warmup_s: float, seed: int) -> Dict[str, Any]:
+    names = [m[0] for m in mix]
+    weights = [m[1] for m in mix]
+    make_args = {m[0]: m[2] for m in mix}
+    lat: Dict[str, List[float]] = {n: [] for n in names}
+    errors: Dict[str, int] = dict.fromkeys(names, 0)
+    t_start = t_end = 0.0
+    connected = 0
+    all_connected, ready = asyncio.Event(), asyncio.Event()
+
+    async def session(k: int) -> None:
+        nonlocal connected
+        rng = random.Random(seed * 1000 + k)
+        async with make_client(url) as client:  # initialize 핸드셰이크까지 끝난 상태
+            connected += 1
+            if connected == sessions:
+                all_connected.set()
+            await ready.wait()
+            while True:
+                now = time.perf_counter()
+                if now >= t_end:
+                    return
+                name = rng.choices(names, weights)[0]
+                args = make_args[name](rng)
+                t0 = time.perf_counter()
+                try:
+                    await client.call_tool(name, args)
+                    failed = False
+                except Exception:
+                    failed = True
+                if t0 >= t_start:  # 워밍업 구간은 집계하지 않음
+                    lat[name].append(time.perf_counter() - t0)
+                    errors[name] += failed
+
+    tasks = [asyncio.create_task(session(k)) for k in range(sessions)]
+    await all_connected.wait()
+    t_start = time.perf_counter() + warmup_s
+    t_end = t_start + duration_s
+    ready.set()
+    await asyncio.gather(*tasks)
+    return summarize(lat, errors, duration_s)
+
+
+def summarize(lat: Dict[str, List[float]], errors: Dict[str, int], duration_s: float) -> Dict[str, Any]:
+    tools = {}
+    for name, xs in sorted(lat.items()):
+        if not xs:
+            continue
+        a = np.asarray(xs) * 1e3
+        tools[name] = {
+            "calls": len(xs),
+            "errors": errors[name],
+            "throughput_rps": round(len(xs) / duration_s, 1),
+            "p50_ms": round(float(np.percentile(a, 50)), 3),
+            "p95_ms": round(float(np.percentile(a, 95)), 3),
+            "p99_ms": round(float(np.percentile(a, 99)), 3),
+        }
+    allx = np.concatenate([np.asarray(x) for x in lat.values() if x]) * 1e3 if any(lat.values()) else np.zeros(1)
+    total = {
+        "calls": sum(t["calls"] for t in tools.values()),
+        "errors": sum(t["errors"] for t in tools.values()),
+        "throughput_rps": round(sum(t["calls"] for t in tools.values()) / duration_s, 1),
+        "p50_ms": round(float(np.percentile(allx, 50)), 3),
+        "p95_ms": round(float(np.percentile(allx, 95)), 3),
+        "p99_ms": round(float(np.percentile(allx, 99)), 3),
+    }
+    return {"total": total, "tools": tools}
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """transport 별 total/툴마다 처리량 하락, p95 증가가 tolerance 를 넘는 항목."""
+    out = []
+    for transport, cur in result["runs"].items():
+        base = baseline.get("runs", {}).get(transport)
+        if base is None:
+            continue
+        pairs = [("total", cur["total"], base["total"])]
+        pairs += [(n, t, base["tools"][n]) for n, t in cur["tools"].items() if n in base["tools"]]
+        for name, c, b in pairs:
+            if b["throughput_rps"] and c["throughput_rps"] < b["throughput_rps"] * (1 - tolerance):
+                out.append({"transport": transport, "tool": name, "metric": "throughput_rps",
+                            "baseline": b["throughput_rps"], "current": c["throughput_rps"]})
+            if b["p95_ms"] and c["p95_ms"] > b["p95_ms"] * (1 + tolerance):
+                out.append({"transport": transport, "tool": name, "metric": "p95_ms",
+                            "baseline": b["p95_ms"], "current": c["p95_ms"]})
+    return out
+
+
+async def bench(transport: str, args: argparse.Namespace) -> Dict[str, Any]:
+    proc = None
+    url = None
+    if transport == "http":
+        proc, url = start_http_server()
+    try:
+        await setup(url, args.targets, args.zones, args.seed)
+        mix = mixes(args.targets, args.zones)[args.mix]
+        return await run_load(url, mix, args.sessions, args.duration, args.warmup, args.seed)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--transport", nargs="+", choices=["memory", "http"], default=["memory", "http"])
+    ap.add_argument("--mix", choices=["ptz", "objects", "targets", "zones", "mixed"], default="mixed")
+    ap.add_argument("--sessions", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=5.0, help="측정 구간 (초)")
+    ap.add_argument("--warmup", type=float, default=1.0, help="측정 전 워밍업 (초)")
+    ap.add_argument("--targets", type=int, default=1000)
+    ap.add_argument("--zones", type=int, default=50)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", help="결과 JSON 저장 경로 (다음 실행의 --baseline 으로 사용)")
+    ap.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="허용 회귀 비율 (0.2 = 20%%)")
+    args = ap.parse_args()
+
+    result: Dict[str, Any] = {
+        "config": {k: getattr(args, k) for k in ("mix", "sessions", "duration", "warmup", "targets", "zones", "seed")},
+        "runs": {},
+    }
+    for transport in args.transport:
+        result["runs"][transport] = asyncio.run(bench(transport, args))
+
+    failed = False
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        result["baseline"] = args.baseline
+        result["regressions"] = regressions
+        failed = bool(regressions)
+
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench_metrics.py
+"""
+툴 계측 오버헤드 벤치마크.
+
+1) ToolMetrics.observe() 단독 비용 (호출당 ns)
+2) MetricsMiddleware 1단 통과 비용: 아무 일도 안 하는 call_next 를 직접 await 한 경우와의 차이
+3) in-memory FastMCP Client 로 health 툴을 반복 호출하면서 MetricsMiddleware 를
+   켠 경우/끈 경우의 호출당 시간 차이 (라운드를 번갈아 돌려 최솟값 비교)
+
+    python bench_metrics.py
+    python bench_metrics.py --observe 1000000 --calls 2000 --rounds 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")  # 요청마다 찍히는 INFO 로그가 측정을 가리지 않도록
+
+from fastmcp import Client
+from fastmcp.server.middleware import MiddlewareContext
+
+import server_main
+from metrics import MetricsMiddleware, ToolMetrics
+
+
+def bench_observe(n: int) -> float:
+    m = ToolMetrics()
+    names = [f"tool.{i}" for i in range(16)]
+    t0 = time.perf_counter()
+    for i in range(n):
+        m.observe(names[i & 15], 0.0003)
+    return (time.perf_counter() - t0) / n * 1e9
+
+
+async def bench_middleware(n: int) -> tuple:
+    mw = MetricsMiddleware(ToolMetrics())
+    ctx = MiddlewareContext(message=SimpleNamespace(name="health"), method="tools/call")
+
+    async def call_next(context):
+        return None
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await call_next(ctx)
+    base = (time.perf_counter() - t0) / n * 1e6
+    t0 = time.perf_counter()
+    for _ in range(n):
+        await mw(ctx, call_next)
+    return base, (time.perf_counter() - t0) / n * 1e6
+
+
+async def bench_calls(calls: int, rounds: int) -> tuple:
+    app = server_main.app
+    ours = [mw for mw in app.middleware if isinstance(mw, MetricsMiddleware)]
+    others = [mw for mw in app.middleware if not isinstance(mw, MetricsMiddleware)]
+    best = {"on": float("inf"), "off": float("inf")}
+    async with Client(app) as client:
+        for _ in range(50):
+            await client.call_tool("health", {})
+        for _ in range(rounds):
+            for mode in ("off", "on"):
+                app.middleware[:] = others + (ours if mode == "on" else [])
+                t0 = time.perf_counter()
+                for _ in range(calls):
+                    await client.call_tool("health", {})
+                best[mode] = min(best[mode], (time.perf_counter() - t0) / calls * 1e6)
+    app.middleware[:] = others + ours
+    return best["off"], best["on"]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--observe", type=int, default=1_000_000)
+    ap.add_argument("--calls", type=int, default=2000)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"observe(): {bench_observe(args.observe):.0f} ns/call")
+    base, wrapped = asyncio.run(bench_middleware(args.observe // 4))
+    print(f"middleware hop: {base:.2f} -> {wrapped:.2f} us/call (overhead {wrapped - base:.2f} us)")
+    off, on = asyncio.run(bench_calls(args.calls, args.rounds))
+    print(f"health via in-memory client: off {off:.1f} us/call, on {on:.1f} us/call, "
+          f"overhead {on - off:+.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
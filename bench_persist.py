@@ -0,0 +1,131 @@
+# bench_persist.py
+"""
+영속화(persist.py) 벤치마크: 쓰기 증폭 + 재시작 복구 시간
+
+단계마다 새 파이썬 프로세스에서 실행한다 (복구는 실제 재시작과 같은 조건).
+1) write   : 표적 --targets 개 등록 -> 배치(--batch) 위치 갱신 --updates 회 -> 스냅샷 -> 꼬리 갱신 --tail 회
+             * payload  : 레코드 내용 바이트 (상태 변경 자체의 크기)
+             * journal  : 저널 파일에 실제로 쓴 바이트 (헤더 포함), fsync 횟수
+             * 쓰기 증폭 : (저널 + 스냅샷 바이트) / payload
+             * fsync/변경 : 그룹 커밋으로 변경 1건당 fsync 가 얼마나 줄었는지
+2) restore : 같은 디렉터리로 target_tools import (= 스냅샷 로드 + 꼬리 재생 + 인덱스 재구성) 시간
+3) replay  : 스냅샷 없이 저널만으로 복구하는 경우 (스냅샷 주기를 정할 때 비교용)
+
+    python bench_persist.py
+    python bench_persist.py --targets 100000 --updates 200 --batch 2000 --commit-ms 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+_WRITE = r"""
+import json, sys, time
+import numpy as np
+import persist, target_tools as tt
+n, updates, batch, tail = map(int, sys.argv[1:5])
+rng = np.random.default_rng(0)
+P = persist.PERSIST
+lat = rng.uniform(36.5, 38.0, n); lon = rng.uniform(128.5, 130.0, n)
+
+def mutate(k):
+    ups = []
+    for _ in range(k):
+        ids = rng.integers(0, n, batch)
+        ups.append([tt.TargetUpdateParams(target_id=f"T{i:06d}", lat=lat[i] + rng.normal(0, 1e-3),
+                                          lon=lon[i] + rng.normal(0, 1e-3), speed_kn=12.0) for i in ids.tolist()])
+    t = time.perf_counter()
+    for u in ups:
+        tt._apply_updates(u)
+    return time.perf_counter() - t
+
+t = time.perf_counter()
+for i in range(n):
+    r = tt._TARGETS.upsert(f"T{i:06d}", "vessel", lat=lat[i], lon=lon[i], speed_kn=0.0, heading_deg=0.0)
+    tt._INDEX.upsert(r, lat[i], lon[i])
+t_reg = time.perf_counter() - t
+t_upd = mutate(updates)
+t = time.perf_counter(); P.journal.flush(); t_flush = time.perf_counter() - t
+snap = P.snapshot()
+t_tail = mutate(tail)
+P.journal.flush()
+s = P.status()
+print(json.dumps({"register_s": t_reg, "update_s": t_upd, "tail_s": t_tail, "flush_s": t_flush,
+                  "mutations": n + (updates + tail) * batch, "snapshot": snap, **s}))
+"""
+
+_RESTORE = r"""
+import json, time
+t = time.perf_counter()
+import persist, target_tools as tt
+dt = time.perf_counter() - t
+print(json.dumps({"import_s": dt, "targets": len(tt._TARGETS), "restore": persist.PERSIST.restore_stats}))
+"""
+
+
+def _child(code: str, args: list, directory: str, commit_ms: float) -> dict:
+    env = {**os.environ, "PERSIST_DIR": directory, "PERSIST_COMMIT_MS": str(commit_ms),
+           "PERSIST_SNAPSHOT_S": "1e9", "PERSIST_SNAPSHOT_MB": "1e6",  # 스냅샷은 벤치가 직접 뜬다
+           "LOG_LEVEL": "WARNING", "PYTHONPATH": _HERE}
+    out = subprocess.run([sys.executable, "-c", code, *map(str, args)], env=env, check=True,
+                         capture_output=True, text=True, cwd=_HERE).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--targets", type=int, default=100_000)
+    ap.add_argument("--updates", type=int, default=100, help="스냅샷 전 배치 갱신 횟수")
+    ap.add_argument("--tail", type=int, default=20, help="스냅샷 후 배치 갱신 횟수 (복구 시 재생 구간)")
+    ap.add_argument("--batch", type=int, default=2000)
+    ap.add_argument("--commit-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    base = tempfile.mkdtemp(prefix="bench_persist_")
+    try:
+        w = _child(_WRITE, [args.targets, args.updates, args.batch, args.tail], base, args.commit_ms)
+        r = _child(_RESTORE, [], base, args.commit_ms)
+
+        # 스냅샷 없는 비교: 같은 작업을 스냅샷 없이 기록한 디렉터리에서 복구
+        full = tempfile.mkdtemp(prefix="bench_persist_full_")
+        code = _WRITE.replace("snap = P.snapshot()", "snap = None")
+        _child(code, [args.targets, args.updates, args.batch, args.tail], full, args.commit_ms)
+        rj = _child(_RESTORE, [], full, args.commit_ms)
+        shutil.rmtree(full, ignore_errors=True)
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    payload = w["payload_bytes"]
+    snap_bytes = w["snapshot_bytes_written"]
+    mut = w["mutations"]
+    report = {
+        "targets": args.targets,
+        "mutations": mut,
+        "records": w["records"],
+        "payload_mb": round(payload / 2**20, 2),
+        "journal_mb": round(w["journal_bytes_written"] / 2**20, 2),
+        "snapshot_mb": round(snap_bytes / 2**20, 2),
+        "write_amplification": round((w["journal_bytes_written"] + snap_bytes) / payload, 3),
+        "fsyncs": w["fsyncs"],
+        "fsyncs_per_1k_mutations": round(w["fsyncs"] * 1000 / mut, 3),
+        "update_throughput_per_s": round((args.updates + args.tail) * args.batch / (w["update_s"] + w["tail_s"])),
+        "snapshot": w["snapshot"],
+        "restore_snapshot_s": round(r["import_s"], 3),
+        "restore_snapshot_detail": r["restore"],
+        "restore_journal_only_s": round(rj["import_s"], 3),
+        "restore_journal_only_detail": rj["restore"],
+        "restored_targets": r["targets"],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# bench_scan_plan.py
+"""
+오토스캔 경로 계획 벤치마크: 구역 50~500 개.
+
+사이트 주변(반경 ~25 km) 해상에 임의 폴리곤 구역을 만들고 eots_scan_plan.plan_route 로
+커버리지 셀 생성 + 최근접 이웃 + 2-opt 순서를 계산한다.
+계획 시간과 순회 슬루 시간(pan 순 스윕 / NN / 2-opt), 분당 커버 구역 수를 출력한다.
+
+    python bench_scan_plan.py
+    python bench_scan_plan.py --zones 50 100 200 500 --zoom 8 --dwell 1.0
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+
+import eots_pointing
+import eots_scan
+import eots_scan_plan
+import zone_tools as zt
+
+
+def _zones(n: int, rng: random.Random) -> list:
+    s = eots_pointing.SOLVER
+    out = []
+    for i in range(n):
+        # 사이트 동쪽 반원(해상) 2~25 km
+        brg = math.radians(rng.uniform(0, 180))
+        d = rng.uniform(2.0, 25.0) / 111.0
+        clat = s.site_lat + d * math.cos(brg)
+        clon = s.site_lon + d * math.sin(brg) / math.cos(math.radians(s.site_lat))
+        r = rng.uniform(0.003, 0.02)
+        angs = sorted(rng.uniform(0, 2 * math.pi) for _ in range(8))
+        out.append(zt._CompiledZone(f"Z{i:04d}", [[clat + r * math.sin(a), clon + r * math.cos(a)] for a in angs]))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--zones", type=int, nargs="+", default=[50, 100, 200, 500])
+    ap.add_argument("--zoom", type=float, default=8.0)
+    ap.add_argument("--dwell", type=float, default=1.0)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rates = eots_scan.slew_rates({})
+    print(f"pan {rates[0]:.0f} deg/s, tilt {rates[1]:.0f} deg/s, zoom {args.zoom}, dwell {args.dwell}s")
+    print(f"{'zones':>6} {'cells':>6} {'plan ms':>9} {'slew sweep':>10} {'slew NN':>9} {'slew 2opt':>10} "
+          f"{'period s':>9} {'zones/min':>10}")
+    for n in args.zones:
+        zones = _zones(n, random.Random(args.seed + n))
+        t0 = time.perf_counter()
+        _, st = eots_scan_plan.plan_route(zones, eots_pointing.SOLVER, rates, zoom=args.zoom, dwell_s=args.dwell)
+        ms = (time.perf_counter() - t0) * 1000
+        sl = st["slew_s"]
+        print(f"{n:>6} {st['cells']:>6} {ms:>9.1f} {sl['sweep']:>10.2f} {sl['nearest_neighbour']:>9.2f} "
+              f"{sl['two_opt']:>10.2f} {st['period_s']:>9.1f} {st['zones_per_min']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench_startup.py
+"""
+서버 콜드 스타트 벤치마크: 지연 로딩(매니페스트) vs 전체 import.
+
+매 실행 새 파이썬 프로세스에서 측정한다 (import 캐시가 없는 상태).
+- interpreter : 프로세스 시작 -> 파이썬 실행 가능 (python -c pass)
+- import      : import server_main (툴 등록 완료) 에 걸린 시간
+- first_call  : in-memory 클라이언트 연결 후 첫 툴 호출 (지연 로딩이면 구현 모듈 import 포함)
+- http_ready  : --http 일 때 server_main.py 자식 프로세스 시작 -> /metrics 200 응답까지 (벽시계)
+
+    python bench_startup.py
+    python bench_startup.py --runs 5 --tool zone.list --http
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+_PROBE = r"""
+import asyncio, json, sys, time
+t0 = time.perf_counter()
+import server_main
+t1 = time.perf_counter()
+from fastmcp import Client
+async def first_call():
+    async with Client(server_main.app) as c:
+        t = time.perf_counter()
+        await c.call_tool(sys.argv[1], json.loads(sys.argv[2]))
+        return time.perf_counter() - t
+fc = asyncio.run(first_call())
+print(json.dumps({"mode": server_main.TOOL_LOADING, "import_s": t1 - t0, "first_call_s": fc}))
+"""
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _run(cmd: list, env: dict) -> float:
+    t = time.perf_counter()
+    subprocess.run(cmd, env=env, check=True, capture_output=True)
+    return time.perf_counter() - t
+
+
+def probe(lazy: bool, tool: str, args: str) -> dict:
+    env = {**os.environ, "MCP_LAZY_TOOLS": "1" if lazy else "0", "LOG_LEVEL": "WARNING", "PYTHONPATH": _HERE}
+    t = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", _PROBE, tool, args], env=env, check=True,
+                         capture_output=True, text=True, cwd=_HERE).stdout
+    r = json.loads(out.strip().splitlines()[-1])
+    r["process_s"] = time.perf_counter() - t
+    return r
+
+
+def http_ready(lazy: bool) -> float:
+    import bench_mcp  # 자식 서버 기동/대기 로직 재사용
+
+    os.environ["MCP_LAZY_TOOLS"] = "1" if lazy else "0"
+    t = time.perf_counter()
+    proc, _ = bench_mcp.start_http_server()
+    dt = time.perf_counter() - t
+    proc.terminate()
+    proc.wait(timeout=10)
+    return dt
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--tool", default="eots.objects_list", help="첫 호출에 쓸 툴")
+    ap.add_argument("--args", default="{}", help="첫 호출 인자 (JSON)")
+    ap.add_argument("--http", action="store_true", help="HTTP 서버 준비 시간도 측정")
+    args = ap.parse_args()
+
+    interp = min(_run([sys.executable, "-c", "pass"], dict(os.environ)) for _ in range(args.runs))
+    print(f"interpreter: {interp * 1e3:.0f} ms")
+    probe(True, args.tool, args.args)  # 매니페스트가 최신이 아니면 여기서 다시 만든다
+
+    print(f"{'mode':>6} {'import_ms':>10} {'first_call_ms':>14} {'process_ms':>11}" + (f" {'http_ready_ms':>14}" if args.http else ""))
+    for lazy in (False, True):
+        rs = [probe(lazy, args.tool, args.args) for _ in range(args.runs)]
+        med = {k: float(np.median([r[k] for r in rs])) * 1e3 for k in ("import_s", "first_call_s", "process_s")}
+        line = f"{rs[0]['mode']:>6} {med['import_s']:>10.0f} {med['first_call_s']:>14.1f} {med['process_s']:>11.0f}"
+        if args.http:
+            line += f" {float(np.median([http_ready(lazy) for _ in range(args.runs)])) * 1e3:>14.0f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
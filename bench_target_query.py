@@ -0,0 +1,85 @@
+# bench_target_query.py
+"""
+target.query_nearest 벤치마크: 격자 인덱스 + NumPy 일괄 거리 계산 vs 기존 _km 선형 스캔.
+
+    python bench_target_query.py                 # 1k / 10k / 100k
+    python bench_target_query.py --sizes 5000 --queries 500
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import target_tools as tt
+
+# 동해안 감시 구역 근방 (경도 129.0~130.2, 위도 36.5~38.0)
+LAT_RANGE = (36.5, 38.0)
+LON_RANGE = (129.0, 130.2)
+
+
+# 원래 구조: target_id -> params.dict()
+_LEGACY: dict = {}
+
+
+def _linear_scan(lat: float, lon: float, radius_km: float, limit: int) -> list:
+    # 주석 처리되어 있던 원래 target.query_nearest 로직 그대로
+    items = []
+    for t in _LEGACY.values():
+        d = tt._km(lat, lon, t["lat"], t["lon"])
+        if d <= radius_km:
+            items.append({"target_id": t["target_id"], "cls": t["cls"], "km": round(d, 2),
+                          "speed_kn": t["speed_kn"], "heading_deg": t["heading_deg"]})
+    items.sort(key=lambda x: x["km"])
+    return items[:limit]
+
+
+def _populate(n: int, rng: random.Random) -> None:
+    tt._TARGETS = tt._TargetStore()
+    tt._INDEX = tt._GridIndex()
+    _LEGACY.clear()
+    for i in range(n):
+        p = tt.TargetRegisterParams(
+            target_id=f"T{i:06d}", cls="vessel",
+            lat=rng.uniform(*LAT_RANGE), lon=rng.uniform(*LON_RANGE),
+            speed_kn=rng.uniform(0, 30), heading_deg=rng.uniform(0, 359.9),
+        )
+        tt.target_register.fn(p)
+        _LEGACY[p.target_id] = p.dict()
+
+
+def _time_queries(fn, queries, radius_km: float, limit: int) -> float:
+    t0 = time.perf_counter()
+    for lat, lon in queries:
+        fn(lat, lon, radius_km, limit)
+    return (time.perf_counter() - t0) / len(queries)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--radius-km", type=float, default=5.0)
+    ap.add_argument("--limit", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'targets':>9} {'linear_us':>11} {'indexed_us':>11} {'speedup':>8}")
+    for n in args.sizes:
+        _populate(n, rng)
+        queries = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(args.queries)]
+
+        # 결과 동일성 확인 (거리 순 정렬 결과의 km 값 비교)
+        for lat, lon in queries[:20]:
+            a = [x["km"] for x in _linear_scan(lat, lon, args.radius_km, args.limit)]
+            b = [x["km"] for x in tt._query_nearest(lat, lon, args.radius_km, args.limit)]
+            assert a == b, (lat, lon, a, b)
+
+        lin = _time_queries(_linear_scan, queries, args.radius_km, args.limit)
+        idx = _time_queries(tt._query_nearest, queries, args.radius_km, args.limit)
+        print(f"{n:>9} {lin * 1e6:>11.1f} {idx * 1e6:>11.1f} {lin / idx:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
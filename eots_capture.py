@@ -0,0 +1,262 @@
+# eots_capture.py
+"""
+정지 영상 캡처: 충돌 없는 ID + 공유 메모리 슬롯 + 백그라운드 인코딩 풀
+
+- ID: capture_<서버 기동 시각>_<단조 증가 번호>. 같은 초에 여러 장을 찍어도, 서버를 다시 띄워도 겹치지 않는다.
+- 프레임 전달: 고정 개수 슬롯으로 나눈 SharedMemory 1개를 두고, 캡처 시 링버퍼 최신 프레임을
+  빈 슬롯에 바로 복사한다. 인코더(스레드/프로세스)는 같은 슬롯을 그대로 읽으므로 피클링/추가 복사가 없다.
+  인코딩이 끝나면 슬롯을 반납한다. 빈 슬롯이 없으면 해당 캡처는 'dropped' 로 기록된다.
+- 인코딩/저장: PNG(zlib) 를 풀에서 수행. EOTS_CAPTURE_POOL=thread|process, EOTS_CAPTURE_WORKERS.
+- 인덱스: capture_id -> 상태(scheduled/queued/done/error/dropped), 경로, 크기. 최근 EOTS_CAPTURE_INDEX 건 유지.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import multiprocessing as mp
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("eots_capture")
+
+
+# =========================
+# PNG 인코딩 (워커에서 실행)
+# =========================
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def encode_png(img: np.ndarray, level: int = 6) -> bytes:
+    """8비트 회색조(H,W) 또는 RGB(H,W,3) 배열 -> PNG 바이트."""
+    h, w = img.shape[:2]
+    color = 0 if img.ndim == 2 else 2
+    rows = img.reshape(h, -1)
+    raw = np.empty((h, rows.shape[1] + 1), dtype=np.uint8)
+    raw[:, 0] = 0  # 필터 없음
+    raw[:, 1:] = rows
+    return (b"\x89PNG\r\n\x1a\n"
+            + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, color, 0, 0, 0))
+            + _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), level))
+            + _png_chunk(b"IEND", b""))
+
+
+def _write_png(img: np.ndarray, path: str) -> int:
+    data = encode_png(img)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def _encode_shm(shm_name: str, offset: int, shape: Tuple[int, ...], dtype: str, path: str) -> int:
+    """프로세스 풀 워커: 공유 메모리 슬롯에 붙어서 바로 인코딩."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # 세그먼트 수명은 부모가 관리: 워커 종료 시 resource_tracker 가 지우지 않도록 등록 해제
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    try:
+        return _write_png(np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset), path)
+    finally:
+        shm.close()
+
+
+# =========================
+# 공유 메모리 슬롯
+# =========================
+class FrameSlots:
+
+    def __init__(self, n_slots: int, shape: Tuple[int, ...], dtype: np.dtype):
+        self.shape, self.dtype = tuple(shape), np.dtype(dtype)
+        self.slot_bytes = int(np.prod(shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, n_slots * self.slot_bytes))
+        self.arrays = np.ndarray((n_slots, *shape), dtype=self.dtype, buffer=self.shm.buf)
+        self._free: "queue.SimpleQueue[int]" = queue.SimpleQueue()
+        for i in range(n_slots):
+            self._free.put(i)
+        self.n_slots = n_slots
+
+    def acquire(self) -> Optional[int]:
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, i: int) -> None:
+        self._free.put(i)
+
+    @property
+    def free(self) -> int:
+        return self._free.qsize()
+
+    def close(self) -> None:
+        del self.arrays
+        self.shm.close()
+        self.shm.unlink()
+
+
+# =========================
+# 캡처 관리자
+# =========================
+class CaptureManager:
+
+    def __init__(self, ring, fps: float, out_dir: str, *, pool: str = "thread", workers: int = 2,
+                 slots: int = 16, index_size: int = 4096):
+        self.ring = ring  # eots_recorder.PreEventBuffer (최신 프레임 제공)
+        self.fps = fps
+        self.out_dir = out_dir
+        self.pool_kind = pool
+        self.workers = workers
+        self.n_slots = slots
+        self.index_size = index_size
+        self.index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._bursts = itertools.count(1)
+        self._stamp = time.strftime("%Y%m%d%H%M%S")
+        self._lock = threading.Lock()
+        self._slots: Optional[FrameSlots] = None
+        self._pool: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls, ring, fps: float, env: Mapping[str, str]) -> "CaptureManager":
+        return cls(
+            ring, fps, env.get("EOTS_CAPTURE_DIR", "captures"),
+            pool=env.get("EOTS_CAPTURE_POOL", "thread"),
+            workers=int(env.get("EOTS_CAPTURE_WORKERS", "2")),
+            slots=int(env.get("EOTS_CAPTURE_SLOTS", "16")),
+            index_size=int(env.get("EOTS_CAPTURE_INDEX", "4096")),
+        )
+
+    def _ensure(self) -> None:
+        if self._pool is not None:
+            return
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._slots = FrameSlots(self.n_slots, self.ring.frames.shape[1:], self.ring.frames.dtype)
+        if self.pool_kind == "process":
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=mp.get_context("spawn"))
+        else:
+            self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="capture-enc")
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._slots is not None:
+            self._slots.close()
+            self._slots = None
+
+    # ---- ID / 인덱스 ----
+    def new_id(self) -> str:
+        return f"capture_{self._stamp}_{next(self._ids):06d}"
+
+    def _record(self, cid: str, **fields: Any) -> Dict[str, Any]:
+        with self._lock:
+            rec = self.index.get(cid)
+            if rec is None:
+                rec = self.index[cid] = {"capture_id": cid}
+                while len(self.index) > self.index_size:
+                    self.index.popitem(last=False)
+            rec.update(fields)
+            return rec
+
+    def fail(self, cid: str, error: str) -> Dict[str, Any]:
+        """프레임을 얻지 못한 캡처를 error 로 기록 (eots.capture / 버스트 공용)."""
+        return self._record(cid, status="error", error=error)
+
+    def lookup(self, ids: List[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(self.index.get(i) or {"capture_id": i, "status": "unknown"}) for i in ids]
+
+    def burst_members(self, burst_id: str) -> List[str]:
+        with self._lock:
+            return [k for k, v in self.index.items() if v.get("burst_id") == burst_id]
+
+    # ---- 캡처 ----
+    def schedule(self, count: int) -> Tuple[str, List[str]]:
+        burst_id = f"burst_{self._stamp}_{next(self._bursts):06d}"
+        ids = [self.new_id() for _ in range(count)]
+        for k, cid in enumerate(ids):
+            self._record(cid, burst_id=burst_id, index=k, status="scheduled")
+        return burst_id, ids
+
+    def grab(self, cid: str) -> Dict[str, Any]:
+        """최신 프레임을 공유 메모리 슬롯으로 복사하고 인코딩 작업을 제출. 인코딩은 기다리지 않는다."""
+        self._ensure()
+        slot = self._slots.acquire()
+        if slot is None:
+            return self._record(cid, status="dropped", error="no free frame slot (encoder backlog)")
+        with self.ring.lock:
+            i = self.ring.seq % self.ring.capacity
+            seq, ts = int(self.ring.seq), float(self.ring.ts[i])
+            self._slots.arrays[slot] = self.ring.frames[i]
+        path = os.path.join(self.out_dir, cid + ".png")
+        if self.pool_kind == "process":
+            fut = self._pool.submit(_encode_shm, self._slots.shm.name, slot * self._slots.slot_bytes,
+                                    self._slots.shape, self._slots.dtype.str, path)
+        else:
+            fut = self._pool.submit(_write_png, self._slots.arrays[slot], path)
+        rec = self._record(cid, status="queued", frame_seq=seq, frame_ts=ts, queued_at=time.time())
+        fut.add_done_callback(lambda f, cid=cid, slot=slot, path=path: self._done(f, cid, slot, path))
+        return rec
+
+    def _done(self, fut: Future, cid: str, slot: int, path: str) -> None:
+        if self._slots is not None:
+            self._slots.release(slot)
+        try:
+            size = fut.result()
+        except Exception as e:
+            self._record(cid, status="error", error=str(e))
+            logger.warning("capture %s encode failed: %s", cid, e)
+        else:
+            self._record(cid, status="done", path=path, bytes=size, done_at=time.time())
+
+    async def wait_frame(self, timeout_s: float = 2.0) -> bool:
+        """파이프라인 기동 직후처럼 링이 비어 있으면 첫 프레임을 기다린다."""
+        deadline = time.monotonic() + timeout_s
+        while self.ring.seq < 0:
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(1.0 / max(self.fps, 1.0))
+        return True
+
+    async def run_burst(self, ids: List[str], interval_ms: float) -> None:
+        """interval_ms 간격(절대 시각 기준)으로 ids 를 차례로 grab."""
+        loop = asyncio.get_running_loop()
+        if not await self.wait_frame():
+            for cid in ids:
+                self.fail(cid, "no frames from source")
+            return
+        t0 = loop.time()
+        for k, cid in enumerate(ids):
+            delay = t0 + k * interval_ms / 1000.0 - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.grab(cid)
+
+    @property
+    def busy_slots(self) -> int:
+        return self.n_slots - self._slots.free if self._slots is not None else 0
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for v in self.index.values():
+                counts[v["status"]] = counts.get(v["status"], 0) + 1
+        return {
+            "pool": self.pool_kind,
+            "workers": self.workers,
+            "slots": self.n_slots,
+            "free_slots": self._slots.free if self._slots is not None else self.n_slots,
+            "index": counts,
+        }
@@ -0,0 +1,212 @@
+# eots_driver.py
+"""
+EOTS 장비 드라이버 계층 (asyncio)
+
+툴 핸들러와 실제 장비(팬틸트 받침대/센서 헤드) 사이에서 명령을 비동기로 중계한다.
+- 장비와의 TCP 연결을 영구 유지 (pool_size 개, 끊기면 백오프 후 재접속)
+- 상한이 있는 명령 큐: 가득 차면 즉시 DriverBusy (툴 핸들러가 무한정 쌓이지 않음)
+- 명령마다 타임아웃 (DriverTimeout)
+- 요청 id 로 응답을 매칭하므로 한 연결에서 여러 명령을 파이프라이닝 가능
+
+와이어 프로토콜 (줄 단위 JSON):
+    요청  {"id": 7, "cmd": "set_pan", "args": {"pan_deg": 10.0}}
+    응답  {"id": 7, "ok": true, "result": {...}}
+          {"id": 7, "ok": false, "error": "..."}
+
+pool_size=1 이면 명령은 큐 순서대로 장비에 전달된다. pool_size>1 은 연결 간
+순서를 보장하지 않으므로, 순서가 중요한 PTZ 명령에는 1 을 사용한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("eots_driver")
+
+
+class DriverError(RuntimeError):
+    """장비 명령 실패 (연결 끊김, 장비 측 오류 응답 등)."""
+
+
+class DriverBusy(DriverError):
+    """명령 큐가 가득 참."""
+
+
+class DriverTimeout(DriverError):
+    """명령 응답이 타임아웃 안에 오지 않음."""
+
+
+class DeviceDriver:
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        pool_size: int = 1,
+        queue_size: int = 64,
+        timeout_s: float = 2.0,
+        reconnect_s: float = 0.5,
+    ):
+        self.host, self.port = host, port
+        self.pool_size = pool_size
+        self.timeout_s = timeout_s
+        self.reconnect_s = reconnect_s
+        self._queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._tasks: list = []
+        self._connected = 0
+
+    # ------------------------------------------------------------------
+    # 수명 주기
+    # ------------------------------------------------------------------
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self._queue_size)
+        self._tasks = [asyncio.create_task(self._connection(i)) for i in range(self.pool_size)]
+
+    async def close(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._fail_pending(DriverError("driver closed"))
+
+    # ------------------------------------------------------------------
+    # 명령 전송
+    # ------------------------------------------------------------------
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    @property
+    def connected(self) -> int:
+        return self._connected
+
+    async def send(self, cmd: str, timeout_s: Optional[float] = None, **args: Any) -> Dict[str, Any]:
+        """명령 1건 전송 후 장비 응답(result)을 기다린다."""
+        if not self._tasks:
+            await self.start()
+        req_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((req_id, cmd, args, fut))
+        except asyncio.QueueFull:
+            raise DriverBusy(f"command queue full ({self._queue_size})") from None
+        try:
+            return await asyncio.wait_for(fut, timeout_s or self.timeout_s)
+        except asyncio.TimeoutError:
+            raise DriverTimeout(f"{cmd}: no response within {timeout_s or self.timeout_s}s") from None
+        finally:
+            self._pending.pop(req_id, None)
+
+    # ------------------------------------------------------------------
+    # 연결 루프 (연결 1개당 태스크 1개: writer + reader)
+    # ------------------------------------------------------------------
+    async def _connection(self, slot: int) -> None:
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                logger.warning("driver[%d] connect %s:%d failed: %s", slot, self.host, self.port, e)
+                await asyncio.sleep(self.reconnect_s)
+                continue
+
+            self._connected += 1
+            logger.info("driver[%d] connected to %s:%d", slot, self.host, self.port)
+            mine: set = set()
+            read_task = asyncio.create_task(self._read_loop(reader, mine))
+            try:
+                await self._write_loop(writer, mine, read_task)
+            except (OSError, ConnectionError) as e:
+                logger.warning("driver[%d] connection lost: %s", slot, e)
+            finally:
+                self._connected -= 1
+                read_task.cancel()
+                writer.close()
+                # 이 연결로 나간 명령은 응답을 받을 수 없으므로 실패 처리
+                for req_id in mine:
+                    fut = self._pending.pop(req_id, None)
+                    if fut is not None and not fut.done():
+                        fut.set_exception(DriverError("device connection lost"))
+            await asyncio.sleep(self.reconnect_s)
+
+    async def _write_loop(self, writer: asyncio.StreamWriter, mine: set, read_task: asyncio.Task) -> None:
+        while True:
+            get = asyncio.create_task(self._queue.get())
+            try:
+                done, _ = await asyncio.wait({get, read_task}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                if not get.done():
+                    get.cancel()
+            if read_task in done:
+                # 큐에서 이미 꺼낸 명령은 재전송하지 않고 실패 처리 (뒤로 재삽입하면 순서가 바뀜)
+                if get.done() and not get.cancelled():
+                    fut = get.result()[3]
+                    if not fut.done():
+                        fut.set_exception(DriverError("device connection lost"))
+                raise ConnectionError("device closed the connection")
+            req_id, cmd, args, fut = get.result()
+            if fut.done():  # 큐에서 기다리는 동안 타임아웃된 명령
+                continue
+            self._pending[req_id] = fut
+            mine.add(req_id)
+            if len(mine) > 4 * self._queue_size:
+                mine.intersection_update(self._pending)  # 타임아웃으로 정리된 id 제거
+            writer.write(json.dumps({"id": req_id, "cmd": cmd, "args": args}).encode() + b"\n")
+            await writer.drain()
+
+    async def _read_loop(self, reader: asyncio.StreamReader, mine: set) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                logger.warning("driver: malformed response %r", line[:200])
+                continue
+            req_id = msg.get("id")
+            mine.discard(req_id)
+            fut = self._pending.pop(req_id, None)
+            if fut is None or fut.done():
+                continue  # 타임아웃 이후 늦게 도착한 응답
+            if msg.get("ok", False):
+                fut.set_result(msg.get("result") or {})
+            else:
+                fut.set_exception(DriverError(str(msg.get("error", "device error"))))
+
+    def _fail_pending(self, exc: Exception) -> None:
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+        self._pending.clear()
+
+
+def driver_from_env(env: Dict[str, str]) -> Optional[DeviceDriver]:
+    """EOTS_DRIVER_ADDR=host:port 가 설정된 경우에만 드라이버 생성 (없으면 상태만 갱신하는 데모 모드)."""
+    addr = env.get("EOTS_DRIVER_ADDR")
+    if not addr:
+        return None
+    host, _, port = addr.rpartition(":")
+    return DeviceDriver(
+        host or "127.0.0.1",
+        int(port),
+        pool_size=int(env.get("EOTS_DRIVER_POOL", "1")),
+        queue_size=int(env.get("EOTS_DRIVER_QUEUE", "64")),
+        timeout_s=float(env.get("EOTS_DRIVER_TIMEOUT_S", "2.0")),
+    )
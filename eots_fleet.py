@@ -0,0 +1,188 @@
+# eots_fleet.py
+"""
+다중 카메라(플릿) 지원: 카메라별 컨트롤러 + 레지스트리
+
+- CameraController: 카메라 1대의 상태 저장소/뷰(eots_state), 장비 드라이버(eots_driver),
+  명령 큐를 묶는다. 명령 큐는 상한이 있는 FIFO 로, 실행 중인 명령이 끝나면 다음 명령에게 차례를 넘기므로
+  같은 카메라로 온 명령은 도착 순서대로 하나씩 실행된다 (앞 명령의 장비 응답/상태 반영이 끝난 뒤 다음 명령).
+  큐가 가득 차면 즉시 DriverBusy.
+- 카메라가 다르면 큐가 다르므로 명령은 서로 기다리지 않고 병렬로 진행된다.
+- 현재 카메라는 contextvar 로 전달된다. eots_tools_core 의 _STATE/_STORE 는 아래 CurrentState/CurrentStore
+  프록시라서 기존 툴 본문(_STATE["pan"] = ...)이 그대로 호출 중인 카메라의 상태를 읽고 쓴다.
+  툴 본문에서 만든 백그라운드 태스크(오토 스캔 등)는 컨텍스트를 복사하므로 같은 카메라에 묶인다.
+
+설정 (from_env):
+    EOTS_CAMERA_ID=main                         기본 카메라 id (camera_id 생략 시, EOTS_DRIVER_ADDR 사용)
+    EOTS_CAMERAS=cam2=10.0.0.12:9000,cam3=...   추가 카메라 (주소 생략 시 상태만 갱신하는 데모 모드)
+    EOTS_CAMERA_QUEUE=64                        카메라별 명령 큐 상한
+드라이버 풀/큐/타임아웃(EOTS_DRIVER_POOL 등)은 모든 카메라가 같은 값을 쓴다.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, TypeVar
+
+from eots_driver import DeviceDriver, DriverBusy, driver_from_env
+from eots_state import StateStore, StateView
+
+T = TypeVar("T")
+
+# 현재 요청이 다루는 카메라 (None 이면 기본 카메라)
+_CURRENT: contextvars.ContextVar[Optional["CameraController"]] = contextvars.ContextVar("eots_camera", default=None)
+
+
+class CameraController:
+
+    def __init__(self, camera_id: str, state: StateView, driver: Optional[DeviceDriver], queue_size: int = 64):
+        self.camera_id = camera_id
+        self.state = state
+        self.store: StateStore = state.store
+        self.driver = driver
+        self._queue_size = queue_size
+        self._waiting: deque = deque()  # 차례를 기다리는 명령의 future (도착 순)
+        self.busy = False
+        self.executed = 0
+
+    # ---- 명령 큐 ----
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        fn 을 이 카메라의 명령 큐 차례에 실행. fn 은 호출자의 컨텍스트(세션, 현재 카메라)에서 돈다.
+        큐가 비어 있으면 바로 실행하고, 끝난 명령은 다음 명령에게 차례를 직접 넘긴다 (asyncio.Lock 과 같은 방식).
+        """
+        if self.busy or self._waiting:
+            if len(self._waiting) >= self._queue_size:
+                raise DriverBusy(f"camera {self.camera_id}: command queue full ({self._queue_size})")
+            turn = asyncio.get_running_loop().create_future()
+            self._waiting.append(turn)
+            try:
+                await turn
+            except asyncio.CancelledError:
+                if turn.cancelled():
+                    if turn in self._waiting:  # _next 가 이미 건너뛰었을 수 있다
+                        self._waiting.remove(turn)
+                else:  # 차례를 받은 직후 취소됨: 다음 명령에게 넘긴다
+                    self._next()
+                raise
+        else:
+            self.busy = True
+        try:
+            self.executed += 1
+            return await fn()
+        finally:
+            self._next()
+
+    def _next(self) -> None:
+        while self._waiting:
+            turn = self._waiting.popleft()
+            if not turn.done():
+                turn.set_result(None)  # busy 는 그대로 두고 차례만 넘김
+                return
+        self.busy = False
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+
+    def status(self) -> Dict[str, Any]:
+        data = self.store.snapshot.data
+        return {
+            "camera_id": self.camera_id,
+            "driver": None if self.driver is None else f"{self.driver.host}:{self.driver.port}",
+            "connected": None if self.driver is None or not self.driver.started else bool(self.driver.connected),
+            "queue_depth": self.queue_depth,
+            "busy": self.busy,
+            "executed": self.executed,
+            "version": self.store.snapshot.version,
+            "state": {k: data.get(k) for k in ("mode", "zoom", "pan", "tilt", "tracking", "auto_scan")},
+        }
+
+
+class CameraFleet:
+    """camera_id -> CameraController. 기본 카메라는 항상 있고 camera_id 를 생략한 호출이 쓴다."""
+
+    def __init__(self, default: CameraController):
+        self.default = default
+        self._cameras: Dict[str, CameraController] = {default.camera_id: default}
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str], initial: Mapping[str, Any],
+                 session_id: Callable[[], Optional[str]], session_ttl_s: float = 60.0) -> "CameraFleet":
+        queue_size = int(env.get("EOTS_CAMERA_QUEUE", "64"))
+
+        def make(camera_id: str, driver: Optional[DeviceDriver]) -> CameraController:
+            view = StateView(StateStore(dict(initial)), session_id, session_ttl_s)
+            return CameraController(camera_id, view, driver, queue_size)
+
+        fleet = cls(make(env.get("EOTS_CAMERA_ID", "main"), driver_from_env(env)))
+        for item in filter(None, (s.strip() for s in env.get("EOTS_CAMERAS", "").split(","))):
+            camera_id, _, addr = item.partition("=")
+            if camera_id in fleet._cameras:
+                continue
+            fleet.add(make(camera_id, driver_from_env({**env, "EOTS_DRIVER_ADDR": addr}) if addr else None))
+        return fleet
+
+    def add(self, camera: CameraController) -> None:
+        self._cameras[camera.camera_id] = camera
+
+    def get(self, camera_id: Optional[str]) -> Optional[CameraController]:
+        return self.default if camera_id is None else self._cameras.get(camera_id)
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._cameras)
+
+    def __iter__(self) -> Iterator[CameraController]:
+        return iter(list(self._cameras.values()))
+
+    def __len__(self) -> int:
+        return len(self._cameras)
+
+    # ---- 현재 카메라 ----
+    def current(self) -> CameraController:
+        return _CURRENT.get() or self.default
+
+    @staticmethod
+    def bind(camera: CameraController) -> contextvars.Token:
+        return _CURRENT.set(camera)
+
+    @staticmethod
+    def unbind(token: contextvars.Token) -> None:
+        _CURRENT.reset(token)
+
+
+class _Current:
+    """현재 카메라의 객체로 속성 접근을 넘기는 프록시 (target 이 대상 객체를 고른다)."""
+
+    def __init__(self, fleet: CameraFleet):
+        self._fleet = fleet
+
+    def _target(self) -> Any:
+        raise NotImplementedError
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+
+class CurrentState(_Current):
+    """dict 호환 StateView 프록시: 현재 카메라의 StateView 로 위임."""
+
+    def _target(self) -> StateView:
+        return self._fleet.current().state
+
+    def __getitem__(self, key: str) -> Any:
+        return self._target()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._target()[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._target()
+
+
+class CurrentStore(_Current):
+    """StateStore 프록시: 현재 카메라의 저장소로 위임 (snapshot/commit/check/modify)."""
+
+    def _target(self) -> StateStore:
+        return self._fleet.current().store
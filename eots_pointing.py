@@ -0,0 +1,170 @@
+# eots_pointing.py
+"""
+고정 카메라 사이트 기준 지리좌표 -> PTZ(팬/틸트/줌) 지향 해 계산 + 캐시
+
+- 방위각: 사이트에서 목표점까지의 대권 초기 방위 (0=북, 시계방향)
+- 틸트: 사이트 높이와 지구 곡률(대기 굴절 반영 유효반경 4/3 R)을 고려한 부각(내려다보는 각, 음수)
+- 줌: 목표 폭(extent_m)이 화면 폭의 1/EOTS_FRAME_FILL 을 차지하도록 하는 배율 (1x 수평화각 기준)
+
+이름 있는 프리셋과 zone 은 정의 시점에 해를 미리 계산해 CACHE 에 넣어 두고,
+zone.define 으로 폴리곤이 바뀌면 그 zone 의 해만 다시 계산한다.
+같은 지점으로 반복 이동할 때는 캐시 조회만 하므로 측지 계산이 다시 일어나지 않는다.
+
+사이트 설정 (환경변수):
+    EOTS_SITE_LAT / EOTS_SITE_LON / EOTS_SITE_HEIGHT_M   카메라 위치와 해수면 기준 높이
+    EOTS_PAN_ZERO_DEG                                    pan=0 이 가리키는 방위 (기본 0=북)
+    EOTS_HFOV_1X_DEG / EOTS_MAX_ZOOM                     1배 수평화각, 최대 배율
+    EOTS_FRAME_WIDTH_M / EOTS_FRAME_FILL                 기본 목표 폭, 화면 채움 비율
+"""
+from __future__ import annotations
+
+import math
+import os
+from functools import lru_cache
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+# 표준 대기 굴절을 반영한 유효 지구 반경
+EFFECTIVE_RADIUS_M = EARTH_RADIUS_M * 4.0 / 3.0
+
+
+class PointingSolution(NamedTuple):
+    lat: float
+    lon: float
+    bearing_deg: float
+    pan_deg: float
+    tilt_deg: float
+    range_m: float
+    zoom: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+class PointingSolver:
+
+    def __init__(
+        self,
+        site_lat: float,
+        site_lon: float,
+        site_height_m: float,
+        *,
+        pan_zero_deg: float = 0.0,
+        hfov_1x_deg: float = 60.0,
+        max_zoom: int = 30,
+        frame_width_m: float = 200.0,
+        frame_fill: float = 0.8,
+        aspect: float = 16 / 9,
+    ):
+        self.site_lat, self.site_lon, self.site_height_m = site_lat, site_lon, site_height_m
+        self.pan_zero_deg = pan_zero_deg
+        self.max_zoom = max_zoom
+        self.frame_width_m = frame_width_m
+        self.frame_fill = frame_fill
+        self.aspect = aspect
+        self._tan_half_1x = math.tan(math.radians(hfov_1x_deg) / 2)
+        self._phi1 = math.radians(site_lat)
+        self._cos_phi1 = math.cos(self._phi1)
+        self._sin_phi1 = math.sin(self._phi1)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "PointingSolver":
+        return cls(
+            float(env.get("EOTS_SITE_LAT", "37.2200")),
+            float(env.get("EOTS_SITE_LON", "129.3400")),
+            float(env.get("EOTS_SITE_HEIGHT_M", "30")),
+            pan_zero_deg=float(env.get("EOTS_PAN_ZERO_DEG", "0")),
+            hfov_1x_deg=float(env.get("EOTS_HFOV_1X_DEG", "60")),
+            max_zoom=int(env.get("EOTS_MAX_ZOOM", "30")),
+            frame_width_m=float(env.get("EOTS_FRAME_WIDTH_M", "200")),
+            frame_fill=float(env.get("EOTS_FRAME_FILL", "0.8")),
+            aspect=float(env.get("EOTS_ASPECT", str(16 / 9))),
+        )
+
+    def solve(self, lat: float, lon: float, extent_m: Optional[float] = None) -> PointingSolution:
+        phi2 = math.radians(lat)
+        dlam = math.radians(lon - self.site_lon)
+        cos_phi2 = math.cos(phi2)
+
+        # 거리: haversine
+        a = (math.sin((phi2 - self._phi1) / 2) ** 2
+             + self._cos_phi1 * cos_phi2 * math.sin(dlam / 2) ** 2)
+        range_m = 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+        # 초기 방위
+        y = math.sin(dlam) * cos_phi2
+        x = self._cos_phi1 * math.sin(phi2) - self._sin_phi1 * cos_phi2 * math.cos(dlam)
+        bearing = math.degrees(math.atan2(y, x)) % 360.0
+
+        # 부각: 목표점(해수면)이 곡률만큼 내려가 보이는 효과 포함
+        drop_m = range_m * range_m / (2 * EFFECTIVE_RADIUS_M)
+        tilt = -math.degrees(math.atan2(self.site_height_m + drop_m, max(range_m, 1.0)))
+
+        pan = (bearing - self.pan_zero_deg + 180.0) % 360.0 - 180.0
+        return PointingSolution(lat, lon, bearing, pan, tilt, range_m, self._zoom_for(range_m, extent_m))
+
+    def solve_many(self, lat: np.ndarray, lon: np.ndarray) -> tuple:
+        """solve() 의 pan/tilt 만 배열로 계산 (커버리지 격자 등 대량 변환용)."""
+        phi2 = np.radians(lat)
+        dlam = np.radians(lon - self.site_lon)
+        cos_phi2 = np.cos(phi2)
+        a = np.sin((phi2 - self._phi1) / 2) ** 2 + self._cos_phi1 * cos_phi2 * np.sin(dlam / 2) ** 2
+        range_m = 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+        bearing = np.degrees(np.arctan2(
+            np.sin(dlam) * cos_phi2,
+            self._cos_phi1 * np.sin(phi2) - self._sin_phi1 * cos_phi2 * np.cos(dlam),
+        )) % 360.0
+        drop_m = range_m * range_m / (2 * EFFECTIVE_RADIUS_M)
+        tilt = -np.degrees(np.arctan2(self.site_height_m + drop_m, np.maximum(range_m, 1.0)))
+        pan = (bearing - self.pan_zero_deg + 180.0) % 360.0 - 180.0
+        return pan, tilt
+
+    def fov_deg(self, zoom: float) -> tuple:
+        """zoom 배율에서의 (수평, 수직) 화각."""
+        th = self._tan_half_1x / zoom
+        return 2 * math.degrees(math.atan(th)), 2 * math.degrees(math.atan(th / self.aspect))
+
+    def solve_polygon(self, vlat: np.ndarray, vlon: np.ndarray) -> PointingSolution:
+        """폴리곤 꼭짓점 평균점을 조준하고, bbox 대각선을 화면에 담는 배율로 계산."""
+        clat, clon = float(vlat.mean()), float(vlon.mean())
+        dy = (vlat.max() - vlat.min()) * math.radians(1) * EARTH_RADIUS_M
+        dx = (vlon.max() - vlon.min()) * math.radians(1) * EARTH_RADIUS_M * math.cos(math.radians(clat))
+        return self.solve(clat, clon, math.hypot(dx, dy))
+
+    def _zoom_for(self, range_m: float, extent_m: Optional[float]) -> int:
+        width = (extent_m or self.frame_width_m) / self.frame_fill
+        tan_half = width / 2 / max(range_m, 1.0)
+        z = self._tan_half_1x / tan_half if tan_half > 0 else self.max_zoom
+        return int(min(self.max_zoom, max(1, math.floor(z))))
+
+
+class PointingCache:
+    """(kind, name) -> PointingSolution. kind 는 'preset' / 'zone'."""
+
+    def __init__(self):
+        self._items: Dict[Tuple[str, str], PointingSolution] = {}
+
+    def get(self, kind: str, name: str) -> Optional[PointingSolution]:
+        return self._items.get((kind, name))
+
+    def put(self, kind: str, name: str, sol: PointingSolution) -> PointingSolution:
+        self._items[(kind, name)] = sol
+        return sol
+
+    def invalidate(self, kind: str, name: str) -> None:
+        self._items.pop((kind, name), None)
+
+    def names(self, kind: str) -> list:
+        return [n for k, n in self._items if k == kind]
+
+
+SOLVER = PointingSolver.from_env(os.environ)
+CACHE = PointingCache()
+
+
+@lru_cache(maxsize=1024)
+def solve_latlon(lat: float, lon: float, extent_m: Optional[float] = None) -> PointingSolution:
+    """eots.goto_latlon 용: 같은 좌표 반복 요청은 LRU 로 처리."""
+    return SOLVER.solve(lat, lon, extent_m)
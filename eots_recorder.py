@@ -0,0 +1,359 @@
+# eots_recorder.py
+"""
+사전 이벤트(pre-event) 녹화 파이프라인
+
+    FrameSource --(capture 스레드)--> PreEventBuffer (고정 크기 링, 항상 최근 N초 유지)
+                                   \\-> 녹화 중이면 SegmentWriter 큐 (상한, 가득 차면 프레임 드롭)
+
+- 녹화 시작: 링에 남아 있는 최근 프레임부터 파일로 내보낸 뒤 실시간 프레임을 이어 쓴다.
+  시작/중지 호출은 플래그와 큐 조작만 하므로 바로 반환되고, 파일 생성/기록은 writer 스레드가 한다.
+- 세그먼트: 프레임 segment_frames 장 단위의 고정 크기 .npy (np.lib.format.open_memmap) 파일.
+  세그먼트마다 타임스탬프 파일(seg_XXXXX.ts.npy)을 같이 쓰고, 녹화 디렉터리의 manifest.json 에 목록을 남긴다.
+  마지막 세그먼트는 ts 길이만큼만 유효하다.
+- 메모리 상한: 링(pre_event 프레임 수) + writer 큐(queue_frames) 만큼만 프레임을 잡고 있는다.
+  링 크기는 pre_event_s * fps 와 max_buffer_mb 중 작은 쪽으로 정해진다.
+
+프레임 소스는 read() -> (timestamp, ndarray) 와 shape/dtype/fps 속성만 있으면 된다.
+EOTS_FRAME_SOURCE=synthetic (기본, 테스트용 합성 영상) 또는 "모듈:팩토리" 로 교체한다.
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Protocol, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("eots_recorder")
+
+
+class FrameSource(Protocol):
+    shape: Tuple[int, ...]
+    dtype: np.dtype
+    fps: float
+
+    def read(self) -> Tuple[float, np.ndarray]:
+        """다음 프레임이 준비될 때까지 블로킹하고 (타임스탬프, 프레임)을 반환."""
+        ...
+
+
+class SyntheticSource:
+    """움직이는 막대 + 프레임 번호(첫 행 8바이트)가 찍힌 회색조 합성 영상."""
+
+    def __init__(self, width: int = 640, height: int = 360, fps: float = 25.0):
+        self.shape = (height, width)
+        self.dtype = np.dtype(np.uint8)
+        self.fps = fps
+        self._n = 0
+        self._next = time.monotonic()
+        self._ramp = np.tile(np.linspace(0, 127, width, dtype=np.uint8), (height, 1))
+
+    def read(self) -> Tuple[float, np.ndarray]:
+        self._next += 1.0 / self.fps
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            self._next = time.monotonic()  # 밀렸으면 따라잡지 않고 현재부터 다시
+        frame = self._ramp.copy()
+        x = (self._n * 4) % self.shape[1]
+        frame[:, x:x + 8] = 255
+        frame[0, :8] = np.frombuffer(np.int64(self._n).tobytes(), dtype=np.uint8)
+        self._n += 1
+        return time.time(), frame
+
+
+def source_from_env(env: Mapping[str, str]) -> FrameSource:
+    spec = env.get("EOTS_FRAME_SOURCE", "synthetic")
+    if spec == "synthetic":
+        return SyntheticSource(
+            int(env.get("EOTS_FRAME_WIDTH", "640")),
+            int(env.get("EOTS_FRAME_HEIGHT", "360")),
+            float(env.get("EOTS_FRAME_FPS", "25")),
+        )
+    mod, _, fn = spec.partition(":")
+    return getattr(importlib.import_module(mod), fn)()
+
+
+class PreEventBuffer:
+    """프레임 링버퍼 (사전 할당). 슬롯마다 seq 를 같이 적어 덮어쓰기 여부를 확인할 수 있다."""
+
+    def __init__(self, capacity: int, shape: Tuple[int, ...], dtype: np.dtype):
+        self.capacity = max(1, capacity)
+        self.frames = np.zeros((self.capacity, *shape), dtype=dtype)
+        self.ts = np.zeros(self.capacity, dtype=np.float64)
+        self.seqs = np.full(self.capacity, -1, dtype=np.int64)
+        self.seq = -1  # 마지막으로 넣은 프레임 seq
+        self.lock = threading.Lock()
+
+    def push(self, ts: float, frame: np.ndarray) -> int:
+        with self.lock:
+            self.seq += 1
+            i = self.seq % self.capacity
+            self.frames[i] = frame
+            self.ts[i] = ts
+            self.seqs[i] = self.seq
+            return self.seq
+
+    def oldest(self) -> int:
+        return max(0, self.seq - self.capacity + 1)
+
+    def copy_into(self, seq: int, out: np.ndarray) -> Optional[float]:
+        """seq 프레임을 out 에 복사. 이미 덮어써졌으면 None."""
+        with self.lock:
+            i = seq % self.capacity
+            if self.seqs[i] != seq:
+                return None
+            out[...] = self.frames[i]
+            return float(self.ts[i])
+
+
+class SegmentWriter(threading.Thread):
+    """녹화 1건: pre-event 구간을 링에서 내보낸 뒤 큐의 실시간 프레임을 세그먼트 파일로 기록."""
+
+    def __init__(self, rec_dir: str, ring: PreEventBuffer, pre_from: int, pre_to: int,
+                 segment_frames: int, queue_frames: int, meta: Dict[str, Any]):
+        super().__init__(name=f"rec-writer:{os.path.basename(rec_dir)}", daemon=True)
+        self.rec_dir = rec_dir
+        self.ring = ring
+        self.pre_range = (pre_from, pre_to)
+        self.segment_frames = segment_frames
+        self.q: queue.Queue = queue.Queue(maxsize=queue_frames)
+        self.meta = meta
+        self.frames = 0
+        self.pre_event_frames = 0
+        self.pre_event_lost = 0
+        self.dropped = 0
+        self.segments: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+        self._seg = None
+        self._seg_ts: Optional[np.ndarray] = None
+        self._seg_n = 0
+
+    # ---- capture 스레드 / 툴 핸들러 쪽 ----
+    def offer(self, seq: int, ts: float, frame: np.ndarray) -> None:
+        if seq <= self.pre_range[1]:
+            return  # 시작 직전에 링에 들어간 프레임: pre-event 구간에서 기록됨
+        try:
+            self.q.put_nowait((ts, frame))
+        except queue.Full:
+            self.dropped += 1
+
+    def finish(self) -> None:
+        # 종료 표시만 남긴다. writer 는 큐에 남은 프레임까지 기록하고 끝난다.
+        self._done.set()
+
+    # ---- writer 스레드 ----
+    def run(self) -> None:
+        try:
+            os.makedirs(self.rec_dir, exist_ok=True)
+            lo, hi = self.pre_range
+            for seq in range(lo, hi + 1):
+                slot = self._slot()
+                ts = self.ring.copy_into(seq, slot)
+                if ts is None:  # 기록보다 캡처가 빨라 이미 덮어써진 프레임
+                    self.pre_event_lost += 1
+                    continue
+                self._commit(ts)
+                self.pre_event_frames += 1
+            while True:
+                try:
+                    ts, frame = self.q.get(timeout=0.1)
+                except queue.Empty:
+                    if self._done.is_set():
+                        break
+                    continue
+                self._slot()[...] = frame
+                self._commit(ts)
+        except Exception as e:  # 디스크 오류 등: 상태에 남기고 종료
+            self.error = str(e)
+            logger.exception("recording %s failed", self.rec_dir)
+        finally:
+            self._close_segment()
+            self._write_manifest(final=True)
+
+    def _slot(self) -> np.ndarray:
+        if self._seg is None:
+            k = len(self.segments)
+            path = os.path.join(self.rec_dir, f"seg_{k:05d}.npy")
+            shape = self.ring.frames.shape[1:]
+            self._seg = np.lib.format.open_memmap(path, mode="w+", dtype=self.ring.frames.dtype,
+                                                  shape=(self.segment_frames, *shape))
+            self._seg_ts = np.zeros(self.segment_frames, dtype=np.float64)
+            self._seg_n = 0
+            self.segments.append({"file": os.path.basename(path), "frames": 0})
+        return self._seg[self._seg_n]
+
+    def _commit(self, ts: float) -> None:
+        self._seg_ts[self._seg_n] = ts
+        self._seg_n += 1
+        self.frames += 1
+        self.segments[-1]["frames"] = self._seg_n
+        if self._seg_n == self.segment_frames:
+            self._close_segment()
+            self._write_manifest(final=False)
+
+    def _close_segment(self) -> None:
+        if self._seg is None:
+            return
+        self._seg.flush()
+        ts = self._seg_ts[: self._seg_n]
+        np.save(os.path.join(self.rec_dir, self.segments[-1]["file"][:-4] + ".ts.npy"), ts)
+        if self._seg_n:
+            self.segments[-1].update(t0=float(ts[0]), t1=float(ts[-1]))
+        del self._seg
+        self._seg = None
+
+    def _write_manifest(self, final: bool) -> None:
+        if not os.path.isdir(self.rec_dir):
+            return
+        doc = {**self.meta, **self.stats(), "complete": final}
+        tmp = os.path.join(self.rec_dir, "manifest.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(doc, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, os.path.join(self.rec_dir, "manifest.json"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "pre_event_frames": self.pre_event_frames,
+            "pre_event_lost": self.pre_event_lost,
+            "dropped": self.dropped,
+            "queued": self.q.qsize(),
+            "segments": list(self.segments),
+            "error": self.error,
+        }
+
+
+class Recorder:
+    """
+    상시 capture 스레드 + pre-event 링 + 녹화별 SegmentWriter.
+    mode="track_session" 녹화는 추적이 켜질 때 시작하고 꺼질 때 멈춘다 (on_tracking).
+    """
+
+    def __init__(self, source: FrameSource, out_dir: str, *, pre_event_s: float = 10.0,
+                 max_buffer_mb: float = 256.0, segment_frames: int = 250, queue_frames: int = 64):
+        self.source = source
+        self.out_dir = out_dir
+        self.segment_frames = segment_frames
+        self.queue_frames = queue_frames
+        frame_bytes = int(np.prod(source.shape)) * np.dtype(source.dtype).itemsize
+        cap = min(int(pre_event_s * source.fps), int(max_buffer_mb * 2**20) // max(1, frame_bytes))
+        self.ring = PreEventBuffer(cap, source.shape, source.dtype)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._writer: Optional[SegmentWriter] = None
+        self._last: Optional[SegmentWriter] = None
+        self._rec_id: Optional[str] = None
+        self._count = 0
+        self.armed: Optional[Dict[str, Any]] = None  # track_session 대기 (추적 시작 시 녹화)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Recorder":
+        return cls(
+            source_from_env(env),
+            env.get("EOTS_RECORD_DIR", "recordings"),
+            pre_event_s=float(env.get("EOTS_PRE_EVENT_S", "10")),
+            max_buffer_mb=float(env.get("EOTS_PRE_EVENT_MAX_MB", "256")),
+            segment_frames=int(env.get("EOTS_SEGMENT_FRAMES", "250")),
+            queue_frames=int(env.get("EOTS_RECORD_QUEUE_FRAMES", "64")),
+        )
+
+    @property
+    def writer_queued(self) -> int:
+        w = self._writer
+        return w.q.qsize() if w is not None else 0
+
+    @property
+    def buffer_bytes(self) -> int:
+        return self.ring.frames.nbytes
+
+    # ---- capture ----
+    def start_pipeline(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._capture, name="rec-capture", daemon=True)
+        self._thread.start()
+
+    def _capture(self) -> None:
+        while True:
+            try:
+                ts, frame = self.source.read()
+            except Exception:
+                logger.exception("frame source failed")
+                time.sleep(1.0)
+                continue
+            seq = self.ring.push(ts, frame)
+            w = self._writer
+            if w is not None:
+                w.offer(seq, ts, frame)
+
+    # ---- 녹화 제어 (바로 반환) ----
+    @property
+    def recording(self) -> bool:
+        return self._writer is not None
+
+    def start(self, mode: str = "manual", filename_hint: Optional[str] = None) -> str:
+        self.start_pipeline()
+        with self._lock:
+            if self._writer is not None:
+                return self._rec_id
+            self._count += 1
+            hint = re.sub(r"[^\w.-]+", "_", filename_hint or "")[:40]
+            rec_id = f"rec_{time.strftime('%Y%m%d_%H%M%S')}_{self._count:03d}" + (f"_{hint}" if hint else "")
+            meta = {"recording_id": rec_id, "mode": mode, "filename_hint": filename_hint, "started_at": time.time(),
+                    "fps": self.source.fps, "shape": list(self.source.shape), "dtype": str(np.dtype(self.source.dtype))}
+            # 링의 마지막 seq 확인과 writer 등록을 같은 락 안에서: 이후 프레임은 모두 offer 로 들어온다
+            with self.ring.lock:
+                hi = self.ring.seq
+                w = SegmentWriter(os.path.join(self.out_dir, rec_id), self.ring, self.ring.oldest(), hi,
+                                  self.segment_frames, self.queue_frames, meta)
+                self._writer, self._rec_id = w, rec_id
+            w.start()
+            return rec_id
+
+    def stop(self) -> Optional[str]:
+        with self._lock:
+            w, rec_id = self._writer, self._rec_id
+            self.armed = None
+            if w is None:
+                return None
+            self._writer = None
+            self._last = w
+        w.finish()  # 큐에 종료 표시만 넣고 기록 마무리는 writer 스레드가 한다
+        return rec_id
+
+    def arm(self, filename_hint: Optional[str]) -> None:
+        self.start_pipeline()
+        self.armed = {"filename_hint": filename_hint}
+
+    def on_tracking(self, active: bool) -> None:
+        if active and self.armed is not None and self._writer is None:
+            self.start("track_session", self.armed.get("filename_hint"))
+        elif not active and self.armed is not None and self._writer is not None:
+            armed = self.armed
+            self.stop()
+            self.armed = armed  # 다음 추적 세션도 계속 녹화
+
+    def status(self) -> Dict[str, Any]:
+        w = self._writer or self._last
+        return {
+            "pipeline": self._thread is not None,
+            "recording": self.recording,
+            "recording_id": self._rec_id if self._writer is not None else None,
+            "armed_track_session": self.armed is not None,
+            "pre_event": {
+                "capacity_frames": self.ring.capacity,
+                "seconds": round(self.ring.capacity / self.source.fps, 2),
+                "buffered_frames": min(self.ring.seq + 1, self.ring.capacity),
+                "buffer_mb": round(self.buffer_bytes / 2**20, 1),
+            },
+            "writer": None if w is None else {"recording_id": os.path.basename(w.rec_dir), "alive": w.is_alive(), **w.stats()},
+        }
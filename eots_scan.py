@@ -0,0 +1,242 @@
+# eots_scan.py
+"""
+오토스캔 패턴 엔진
+
+- 패턴 정의: 섹터(sector: pan 범위를 step 간격으로 왕복/순환) 또는 waypoint 목록
+- 컴파일: 정의를 NumPy 배열(pan/tilt/zoom/dwell + 직전 지점에서의 예상 슬루 시간)로 변환.
+  스케줄러는 배열 인덱스만 돌며, 각 지점의 예정 시각은 사이클 시작 기준 누적 오프셋(offset)으로 미리 계산.
+- 스케줄러: asyncio 백그라운드 태스크. 예정 시각을 절대 시각(monotonic)으로 잡아 sleep 하므로
+  명령 지연이 누적되지 않는다. 예정보다 overrun_tol_s 이상 늦으면 overrun 으로 세고 일정을 현재 시각에 맞춘다.
+- 상태: 달성 재방문 주기(사이클 시작 간격), 체류 시간 지터(실제-계획), overrun 횟수
+
+슬루 속도: EOTS_PAN_RATE_DPS / EOTS_TILT_RATE_DPS (최대 각속도) x 속도 배율.
+속도 배율은 _STATE 의 pan_speed / tilt_speed(eots.pan_speed 등으로 누적되는 증감값)를 1.0 에 더해
+[0.1, 1.0] 로 자른 값이다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field, model_validator
+
+logger = logging.getLogger("eots_scan")
+
+PAN_RATE_DPS = float(os.getenv("EOTS_PAN_RATE_DPS", "60"))
+TILT_RATE_DPS = float(os.getenv("EOTS_TILT_RATE_DPS", "30"))
+# 통계 창 크기 (최근 N 사이클 / N 지점)
+_STATS_WINDOW = int(os.getenv("EOTS_SCAN_STATS_WINDOW", "256"))
+
+
+def slew_rates(state: Mapping[str, Any]) -> Tuple[float, float]:
+    """현재 상태 기준 (pan, tilt) 최대 각속도 (deg/s)."""
+    pf = min(1.0, max(0.1, 1.0 + float(state.get("pan_speed", 0.0))))
+    tf = min(1.0, max(0.1, 1.0 + float(state.get("tilt_speed", 0.0))))
+    return PAN_RATE_DPS * pf, TILT_RATE_DPS * tf
+
+
+def pan_delta(a, b):
+    """pan a -> b 최단 회전각 (deg, 절대값). 배열 브로드캐스트 가능."""
+    d = np.abs((np.asarray(b) - np.asarray(a) + 180.0) % 360.0 - 180.0)
+    return d
+
+
+def slew_time(pan0, tilt0, pan1, tilt1, rates: Tuple[float, float]):
+    """팬/틸트 축은 동시에 움직이므로 느린 축이 슬루 시간을 결정."""
+    return np.maximum(pan_delta(pan0, pan1) / rates[0], np.abs(np.asarray(tilt1) - np.asarray(tilt0)) / rates[1])
+
+
+# =========================
+# 패턴 정의
+# =========================
+class ScanSector(BaseModel):
+    pan_start: float = Field(..., ge=-180, le=180)
+    pan_end: float = Field(..., ge=-180, le=180, description="pan_start 에서 시계방향으로 pan_end 까지 (같으면 360도)")
+    step_deg: float = Field(20.0, gt=0, le=180)
+    tilt: float = Field(0.0, ge=-90, le=90)
+    zoom: int = Field(1, ge=1, le=30)
+    dwell_s: float = Field(1.0, gt=0)
+
+
+class ScanWaypoint(BaseModel):
+    pan: float = Field(..., ge=-180, le=180)
+    tilt: float = Field(0.0, ge=-90, le=90)
+    zoom: int = Field(1, ge=1, le=30)
+    dwell_s: float = Field(1.0, gt=0)
+
+
+class ScanPatternSpec(BaseModel):
+    name: str
+    sectors: List[ScanSector] = Field(default_factory=list)
+    waypoints: List[ScanWaypoint] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        if not self.sectors and not self.waypoints:
+            raise ValueError("pattern needs at least one sector or waypoint")
+        return self
+
+
+class CompiledPattern:
+    """waypoint 단위 평행 배열. i 번째 지점의 사이클 내 도착 예정 시각 = offset[i]."""
+
+    __slots__ = ("name", "pan", "tilt", "zoom", "dwell", "slew", "offset", "period_s")
+
+    def __init__(self, name: str, pan, tilt, zoom, dwell, rates: Tuple[float, float]):
+        self.name = name
+        self.pan = np.asarray(pan, dtype=np.float64)
+        self.tilt = np.asarray(tilt, dtype=np.float64)
+        self.zoom = np.asarray(zoom, dtype=np.int64)
+        self.dwell = np.asarray(dwell, dtype=np.float64)
+        # slew[i]: 직전 지점(i-1, 순환)에서 i 로 가는 시간
+        self.slew = slew_time(np.roll(self.pan, 1), np.roll(self.tilt, 1), self.pan, self.tilt, rates)
+        step = self.slew + self.dwell
+        self.offset = np.cumsum(step) - self.dwell
+        self.period_s = float(step.sum())
+
+    def __len__(self) -> int:
+        return len(self.pan)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "waypoints": len(self),
+            "period_s": round(self.period_s, 3),
+            "dwell_s": round(float(self.dwell.sum()), 3),
+            "slew_s": round(float(self.slew.sum()), 3),
+        }
+
+
+def _sector_points(s: ScanSector) -> np.ndarray:
+    span = (s.pan_end - s.pan_start) % 360.0 or 360.0
+    full = span == 360.0
+    n = max(1, int(np.ceil(span / s.step_deg - 1e-9)) + (0 if full else 1))
+    pans = s.pan_start + np.linspace(0.0, span, n, endpoint=not full)
+    return (pans + 180.0) % 360.0 - 180.0
+
+
+def compile_pattern(spec: ScanPatternSpec, rates: Tuple[float, float]) -> CompiledPattern:
+    pan, tilt, zoom, dwell = [], [], [], []
+    for s in spec.sectors:
+        p = _sector_points(s)
+        pan.append(p)
+        tilt.append(np.full(len(p), s.tilt))
+        zoom.append(np.full(len(p), s.zoom))
+        dwell.append(np.full(len(p), s.dwell_s))
+    if spec.waypoints:
+        pan.append([w.pan for w in spec.waypoints])
+        tilt.append([w.tilt for w in spec.waypoints])
+        zoom.append([w.zoom for w in spec.waypoints])
+        dwell.append([w.dwell_s for w in spec.waypoints])
+    return CompiledPattern(spec.name, np.concatenate(pan), np.concatenate(tilt),
+                           np.concatenate(zoom), np.concatenate(dwell), rates)
+
+
+# =========================
+# 스케줄러
+# =========================
+GotoFn = Callable[[float, float, int], Awaitable[Any]]
+
+
+class ScanScheduler:
+
+    def __init__(self, goto: GotoFn, overrun_tol_s: float = 0.05):
+        self._goto = goto
+        self.overrun_tol_s = overrun_tol_s
+        self._task: Optional[asyncio.Task] = None
+        self.pattern: Optional[CompiledPattern] = None
+        self._reset_stats()
+
+    def _reset_stats(self) -> None:
+        self.cycles = 0
+        self.index = 0
+        self.overruns = 0
+        self.errors = 0
+        self.started_at: Optional[float] = None
+        self._revisit: deque = deque(maxlen=_STATS_WINDOW)  # 사이클 시작 간격 (s)
+        self._jitter: deque = deque(maxlen=_STATS_WINDOW)   # 실제 체류 - 계획 체류 (s)
+        self._late: deque = deque(maxlen=_STATS_WINDOW)     # 예정 시각 대비 명령 시작 지연 (s)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, pattern: CompiledPattern) -> None:
+        self.stop()
+        self.pattern = pattern
+        self._reset_stats()
+        self._task = asyncio.get_running_loop().create_task(self._run(pattern), name=f"auto_scan:{pattern.name}")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, pat: CompiledPattern) -> None:
+        loop = asyncio.get_running_loop()
+        n = len(pat)
+        cycle_t0 = self.started_at = loop.time()
+        last_cycle_start: Optional[float] = None
+        prev_arrive: Optional[float] = None
+        i = 0
+        while True:
+            due = cycle_t0 + pat.offset[i] - pat.slew[i]  # 슬루 시작 예정 시각
+            now = loop.time()
+            if now < due:
+                await asyncio.sleep(due - now)
+            elif now - due > self.overrun_tol_s:
+                # 이전 명령/체류가 밀려 예정을 놓침: 일정을 현재 시각 기준으로 다시 잡는다
+                self.overruns += 1
+                cycle_t0 += now - due
+            start = loop.time()
+            self._late.append(start - due)
+
+            if prev_arrive is not None:
+                prev = (i - 1) % n
+                self._jitter.append((start - prev_arrive) - pat.dwell[prev])
+            if i == 0:
+                if last_cycle_start is not None:
+                    self._revisit.append(start - last_cycle_start)
+                    self.cycles += 1
+                last_cycle_start = start
+
+            self.index = i
+            try:
+                await self._goto(float(pat.pan[i]), float(pat.tilt[i]), int(pat.zoom[i]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # 장비 오류 1건으로 스캔을 멈추지 않음
+                self.errors += 1
+                logger.warning("auto_scan %s[%d] failed: %s", pat.name, i, e)
+            prev_arrive = max(loop.time(), start + pat.slew[i])
+
+            i += 1
+            if i == n:
+                i = 0
+                cycle_t0 += pat.period_s
+
+    def status(self) -> Dict[str, Any]:
+        def _stats(xs, scale=1.0):
+            if not xs:
+                return None
+            a = np.asarray(xs) * scale
+            return {"last": round(float(a[-1]), 3), "mean": round(float(a.mean()), 3),
+                    "max_abs": round(float(np.abs(a).max()), 3), "std": round(float(a.std()), 3)}
+
+        pat = self.pattern
+        return {
+            "running": self.running,
+            "pattern": pat.summary() if pat is not None else None,
+            "waypoint": self.index,
+            "cycles": self.cycles,
+            "planned_revisit_s": round(pat.period_s, 3) if pat is not None else None,
+            "revisit_s": _stats(self._revisit),
+            "dwell_jitter_ms": _stats(self._jitter, 1000.0),
+            "start_late_ms": _stats(self._late, 1000.0),
+            "overruns": self.overruns,
+            "errors": self.errors,
+        }
@@ -0,0 +1,141 @@
+# eots_scan_plan.py
+"""
+구역 커버리지 기반 오토스캔 경로 계획
+
+1) 커버리지 격자: 각 구역 bbox 안을 격자 샘플링(+ 꼭짓점)해 폴리곤 내부 점만 남기고,
+   사이트 기준 pan/tilt 로 변환한 뒤 화각(FOV) 크기 셀로 묶는다. 점이 하나라도 있는 셀이 관측 지점.
+2) 순서: 셀 조준점 사이의 슬루 시간 행렬(팬/틸트 중 느린 축)로 최근접 이웃 순회를 만들고
+   2-opt(구간 뒤집기)로 전체 슬루 시간을 줄인다 (pan 순 스윕에서 출발한 2-opt 결과와 비교해 짧은 쪽).
+   순회는 닫힌 경로(마지막 -> 처음)로 본다.
+3) 결과는 eots_scan.ScanPatternSpec(waypoints) 로 돌려주므로 eots.auto_scan 에서 그대로 실행된다.
+
+zones 인자는 vlat/vlon/bbox/contains() 를 가진 컴파일된 구역(zone_tools._CompiledZone) 목록이다.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from eots_pointing import PointingSolver
+from eots_scan import ScanPatternSpec, ScanWaypoint, slew_time
+
+# 구역당 bbox 격자 샘플 수 (한 변)
+_SAMPLES_PER_SIDE = 12
+# 2-opt 최대 반복 (개선이 없으면 그 전에 끝남)
+_TWO_OPT_MAX_PASSES = 50
+
+
+def coverage_cells(zones: Sequence[Any], solver: PointingSolver, zoom: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    관측 셀별 조준점 (pan, tilt) 배열. 셀 크기는 zoom 에서의 수평/수직 화각이고,
+    조준점은 셀에 들어온 샘플들의 평균 (셀 중심 대신 실제 구역 쪽으로 치우친 위치).
+    """
+    hfov, vfov = solver.fov_deg(zoom)
+    g = np.linspace(0.0, 1.0, _SAMPLES_PER_SIDE)
+    lats, lons = [], []
+    for z in zones:
+        b = z.bbox
+        lat = (b[0] + (b[2] - b[0]) * g)[:, None].repeat(len(g), 1).ravel()
+        lon = (b[1] + (b[3] - b[1]) * g)[None, :].repeat(len(g), 0).ravel()
+        inside = z.contains(lat, lon)
+        lats += [lat[inside], z.vlat, [z.vlat.mean()]]
+        lons += [lon[inside], z.vlon, [z.vlon.mean()]]
+    if not lats:
+        return np.empty(0), np.empty(0)
+    pan, tilt = solver.solve_many(np.concatenate(lats), np.concatenate(lons))
+    # pan 셀 경계가 -180 에서 시작하므로 한 셀이 ±180 을 넘나들지 않아 단순 평균이 가능
+    keys = np.stack((np.floor((pan + 180.0) / hfov), np.floor(tilt / vfov)), axis=1)
+    _, inv, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    inv = inv.ravel()
+    return np.bincount(inv, pan) / counts, np.bincount(inv, tilt) / counts
+
+
+def _tour_cost(order: np.ndarray, d: np.ndarray) -> float:
+    return float(d[order, np.roll(order, -1)].sum())
+
+
+def nearest_neighbour(d: np.ndarray, start: int) -> np.ndarray:
+    n = len(d)
+    order = np.empty(n, dtype=np.int64)
+    free = np.ones(n, dtype=bool)
+    cur = start
+    for k in range(n):
+        order[k] = cur
+        free[cur] = False
+        if k == n - 1:
+            break
+        row = np.where(free, d[cur], np.inf)
+        cur = int(np.argmin(row))
+    return order
+
+
+def two_opt(order: np.ndarray, d: np.ndarray, max_passes: int = _TWO_OPT_MAX_PASSES) -> np.ndarray:
+    """닫힌 순회에 대한 2-opt. i 마다 모든 j 의 이득을 한 번에 계산하고 가장 큰 것을 적용."""
+    order = order.copy()
+    n = len(order)
+    if n < 4:
+        return order
+    for _ in range(max_passes):
+        improved = False
+        for i in range(n - 2):
+            a, b = order[i], order[i + 1]
+            j = np.arange(i + 2, n if i > 0 else n - 1)
+            c, e = order[j], order[(j + 1) % n]
+            gain = d[a, b] + d[c, e] - d[a, c] - d[b, e]
+            k = int(np.argmax(gain))
+            if gain[k] > 1e-9:
+                jj = j[k]
+                order[i + 1:jj + 1] = order[i + 1:jj + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return order
+
+
+def plan_route(
+    zones: Sequence[Any],
+    solver: PointingSolver,
+    rates: Tuple[float, float],
+    *,
+    name: str = "planned",
+    zoom: float = 4.0,
+    dwell_s: float = 1.0,
+    start: Optional[Tuple[float, float]] = None,
+) -> Tuple[Optional[ScanPatternSpec], Dict[str, Any]]:
+    """구역 목록 -> (오토스캔 패턴, 계획 통계). 구역이 없으면 (None, 통계)."""
+    pan, tilt = coverage_cells(zones, solver, zoom)
+    n = len(pan)
+    stats: Dict[str, Any] = {"zones": len(zones), "cells": n, "zoom": zoom}
+    if n == 0:
+        return None, stats
+
+    d = slew_time(pan[:, None], tilt[:, None], pan[None, :], tilt[None, :], rates)
+    first = 0
+    if start is not None:
+        first = int(np.argmin(slew_time(start[0], start[1], pan, tilt, rates)))
+    # 셀은 pan 셀 순으로 정렬되어 있으므로 arange 가 단순 좌->우 스윕 순서.
+    # NN 순회와 스윕 각각에 2-opt 를 돌려 더 짧은 쪽을 쓴다 (수평선 근처 한 줄 배치에선 스윕이 유리한 경우가 많음).
+    sweep = np.arange(n)
+    nn = nearest_neighbour(d, first)
+    order = min((two_opt(nn, d), two_opt(sweep, d)), key=lambda o: _tour_cost(o, d))
+    # 시작 셀이 첫 waypoint 가 되도록 회전
+    order = np.roll(order, -int(np.flatnonzero(order == first)[0]))
+
+    slew_total = _tour_cost(order, d)
+    period = slew_total + dwell_s * n
+    stats.update({
+        "slew_s": {
+            "sweep": round(_tour_cost(sweep, d), 3),
+            "nearest_neighbour": round(_tour_cost(nn, d), 3),
+            "two_opt": round(slew_total, 3),
+        },
+        "period_s": round(period, 3),
+        "cells_per_min": round(n * 60.0 / period, 3),
+        "zones_per_min": round(len(zones) * 60.0 / period, 3),
+    })
+    spec = ScanPatternSpec(name=name, waypoints=[
+        ScanWaypoint(pan=float(pan[i]), tilt=float(tilt[i]), zoom=int(round(zoom)), dwell_s=dwell_s)
+        for i in order.tolist()
+    ])
+    return spec, stats
@@ -0,0 +1,102 @@
+# eots_simulator.py
+"""
+EOTS 장비 TCP 시뮬레이터 (eots_driver 와이어 프로토콜 대역)
+
+실장비 없이 드라이버 계층의 지연/처리량을 측정하기 위한 로컬 서버.
+- 줄 단위 JSON 요청을 받아 명령별 상태를 갱신하고 응답
+- --latency-ms 로 장비 응답 지연을 흉내 (요청마다 독립 태스크로 처리하므로
+  응답 순서가 요청 순서와 다를 수 있음 -> 드라이버의 id 매칭 검증용)
+- --fail-rate 로 일정 비율의 오류 응답 주입
+
+    python eots_simulator.py --port 9100 --latency-ms 5
+    EOTS_DRIVER_ADDR=127.0.0.1:9100 python server_main.py
+    # 카메라 여러 대: 시뮬레이터를 포트별로 띄우고 EOTS_CAMERAS 로 추가 (eots_fleet 참고)
+    EOTS_DRIVER_ADDR=127.0.0.1:9100 EOTS_CAMERAS=cam2=127.0.0.1:9101 python server_main.py
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+from typing import Any, Dict
+
+logger = logging.getLogger("eots_simulator")
+
+
+class EotsSimulator:
+
+    def __init__(self, latency_ms: float = 5.0, jitter_ms: float = 0.0, fail_rate: float = 0.0):
+        self.latency_s = latency_ms / 1000.0
+        self.jitter_s = jitter_ms / 1000.0
+        self.fail_rate = fail_rate
+        self.state: Dict[str, Any] = {"mode": "eo", "zoom": 1, "pan": 0.0, "tilt": 0.0}
+        self.commands = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """서버 시작 후 실제 바인딩된 포트를 반환 (port=0 이면 임의 포트)."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                t = asyncio.create_task(self._reply(json.loads(line), writer, lock))
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            logger.info("simulator: client dropped: %s", e)
+        finally:
+            for t in tasks:
+                t.cancel()
+            writer.close()
+
+    async def _reply(self, req: Dict[str, Any], writer: asyncio.StreamWriter, lock: asyncio.Lock) -> None:
+        delay = self.latency_s + (random.uniform(0, self.jitter_s) if self.jitter_s else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        self.commands += 1
+        if self.fail_rate and random.random() < self.fail_rate:
+            msg = {"id": req.get("id"), "ok": False, "error": "simulated device fault"}
+        else:
+            msg = {"id": req.get("id"), "ok": True, "result": self._execute(req.get("cmd", ""), req.get("args") or {})}
+        async with lock:
+            writer.write(json.dumps(msg).encode() + b"\n")
+            await writer.drain()
+
+    def _execute(self, cmd: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        if cmd == "lrf_fire":
+            return {"distance_m": round(random.uniform(200, 8000), 1),
+                    "target_coord": {"lat": 37.2322, "lon": 129.5403}}
+        if cmd == "apply":
+            self.state.update(args.get("changes") or {})
+        else:
+            self.state.update(args)
+        return {"cmd": cmd, "state": dict(self.state)}
+
+
+async def _main(args: argparse.Namespace) -> None:
+    sim = EotsSimulator(args.latency_ms, args.jitter_ms, args.fail_rate)
+    port = await sim.start(args.host, args.port)
+    logger.info("EOTS simulator listening on %s:%d (latency %.1f ms)", args.host, port, args.latency_ms)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=9100)
+    ap.add_argument("--latency-ms", type=float, default=5.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    asyncio.run(_main(ap.parse_args()))
@@ -0,0 +1,186 @@
+# eots_state.py
+"""
+EOTS 상태 저장소: 불변 스냅샷 + 원자적 교체 (copy-on-write)
+
+- 읽기: 현재 스냅샷 참조 1회로 끝 (락 없음, 쓰기와 서로 막지 않음)
+- 쓰기: 변경분을 합친 새 스냅샷을 만들어 한 번에 교체, 교체마다 version +1
+- 세션 뷰: 세션이 begin 하면 그 시점 스냅샷을 고정하고, 이후 쓰기는 세션 안에만 쌓였다가
+  commit 시 한 번에 반영된다. 고정 시점 이후 다른 세션이 같은 키를 바꿨으면 StateConflict.
+
+eots_tools_core 의 _STATE 는 StateView 로, 기존 dict 스타일 코드(_STATE["pan"] = ...)를
+그대로 쓰면서 위 규칙을 따른다. 여러 키를 함께 바꿀 때는 _STATE.update({...}) 로 한 번에 쓴다.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+
+class StateConflict(RuntimeError):
+    def __init__(self, keys: Iterable[str]):
+        self.keys = sorted(keys)
+        super().__init__(f"state changed concurrently: {', '.join(self.keys)}")
+
+
+class _Deleted:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "DELETED"
+
+
+# 변경분의 값으로 쓰면 그 키를 지운다 (revert: 세션 전에 없던 키). 리스너도 이 값을 그대로 받는다.
+DELETED: Any = _Deleted()
+
+
+class Snapshot(NamedTuple):
+    version: int
+    data: Mapping[str, Any]
+    key_versions: Mapping[str, int]  # 키별 마지막 변경 version (세션 충돌 검사용)
+
+
+class StateStore:
+
+    def __init__(self, initial: Dict[str, Any]):
+        self._snap = Snapshot(0, MappingProxyType(dict(initial)), MappingProxyType(dict.fromkeys(initial, 0)))
+        self._lock = threading.Lock()  # 쓰기끼리만 직렬화
+        # 반영된 변경분마다 쓰기 락 안에서 호출 (version 순서 그대로: persist 저널, notify 푸시)
+        self.listeners: List[Callable[[Mapping[str, Any]], None]] = []
+
+    @property
+    def snapshot(self) -> Snapshot:
+        return self._snap
+
+    def check(self, keys: Iterable[str], base: Snapshot) -> None:
+        kv = self._snap.key_versions
+        clash = [k for k in keys if kv.get(k, 0) > base.version]
+        if clash:
+            raise StateConflict(clash)
+
+    def commit(self, changes: Mapping[str, Any], base: Optional[Snapshot] = None) -> Snapshot:
+        """changes 를 원자적으로 반영. base 가 있으면 그 이후 같은 키가 바뀐 경우 StateConflict."""
+        with self._lock:
+            if base is not None:
+                self.check(changes, base)
+            return self._swap(changes)
+
+    def revert(self, done: Snapshot, previous: Mapping[str, Any], keys: Iterable[str]) -> Snapshot:
+        """
+        done 커밋으로 바뀐 keys 를 previous(커밋 전 데이터)의 값으로 되돌린다 (장비가 거부한 세션 반영 취소용).
+        previous 에 없던 키는 지우고, 그 뒤 다른 쓰기가 다시 바꾼 키는 그대로 둔다.
+        """
+        with self._lock:
+            kv = self._snap.key_versions
+            return self._swap({k: previous.get(k, DELETED) for k in keys if kv.get(k) == done.version})
+
+    def modify(self, fn: Callable[[Mapping[str, Any]], Mapping[str, Any]]) -> Snapshot:
+        """현재 값에서 변경분을 계산하는 read-modify-write 를 쓰기 락 안에서 수행."""
+        with self._lock:
+            return self._swap(fn(self._snap.data))
+
+    def _swap(self, changes: Mapping[str, Any]) -> Snapshot:
+        cur = self._snap
+        if not changes:
+            return cur
+        v = cur.version + 1
+        data = dict(cur.data)
+        data.update(changes)
+        for k in [k for k, val in changes.items() if val is DELETED]:
+            del data[k]
+        kv = dict(cur.key_versions)
+        kv.update(dict.fromkeys(changes, v))
+        self._snap = Snapshot(v, MappingProxyType(data), MappingProxyType(kv))
+        for fn in self.listeners:
+            fn(changes)
+        return self._snap
+
+
+class SessionView:
+    """세션 1개의 스테이징 영역: 고정 스냅샷(base) + 아직 반영하지 않은 변경분."""
+
+    def __init__(self, base: Snapshot):
+        self.base = base
+        self.staged: Dict[str, Any] = {}
+        self.opened_at = time.monotonic()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.staged:
+            return self.staged[key]
+        return self.base.data.get(key, default)
+
+
+class StateView:
+    """
+    dict 호환 상태 뷰. 호출 세션에 열린 SessionView 가 있으면 그 세션 안에서 읽고 쓰고,
+    없으면 저장소의 최신 스냅샷을 읽고 바로 반영한다.
+    """
+
+    def __init__(self, store: StateStore, session_id: Callable[[], Optional[str]], session_ttl_s: float = 60.0):
+        self.store = store
+        self._session_id = session_id
+        self._sessions: Dict[str, SessionView] = {}
+        self._ttl = session_ttl_s
+
+    # ---------------- 읽기 ----------------
+    def _view(self) -> Optional[SessionView]:
+        if not self._sessions:
+            return None
+        sid = self._session_id()
+        return self._sessions.get(sid) if sid is not None else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        view = self._view()
+        if view is not None:
+            return view.get(key, default)
+        return self.store.snapshot.data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        missing = object()
+        v = self.get(key, missing)
+        if v is missing:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key: str) -> bool:
+        missing = object()
+        return self.get(key, missing) is not missing
+
+    @property
+    def version(self) -> int:
+        return self.store.snapshot.version
+
+    # ---------------- 쓰기 ----------------
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.update({key: value})
+
+    def update(self, changes: Mapping[str, Any]) -> None:
+        view = self._view()
+        if view is not None:
+            view.staged.update(changes)
+        else:
+            self.store.commit(changes)
+
+    def modify(self, fn: Callable[[Mapping[str, Any]], Mapping[str, Any]]) -> None:
+        view = self._view()
+        if view is not None:
+            merged = {**view.base.data, **view.staged}
+            view.staged.update(fn(merged))
+        else:
+            self.store.modify(fn)
+
+    # ---------------- 세션 ----------------
+    @property
+    def in_session(self) -> bool:
+        return self._view() is not None
+
+    def begin(self, sid: str) -> SessionView:
+        now = time.monotonic()
+        for k in [k for k, v in self._sessions.items() if now - v.opened_at > self._ttl]:
+            del self._sessions[k]  # commit 없이 버려진 세션 정리
+        view = self._sessions[sid] = SessionView(self.store.snapshot)
+        return view
+
+    def end(self, sid: str) -> Optional[SessionView]:
+        return self._sessions.pop(sid, None)
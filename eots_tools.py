@@ -8,78 +8,6 @@ from server_main import app  # 기존 구조 유지
 _STATE: dict[str, Any] = {"mode": "eo", "zoom": 1, "pan": 0.0, "tilt": 0.0, "tracking": False}
 
 
-
-# =========================
-# 추가 도구: 특정 객체 존재 여부 확인 (탐지 결과 기반)
-# =========================
-@app.tool(
-    name="eots.detection_object_exists",
-    description=(
-        "[SIDE-EFFECT FREE] Check whether the *current* EOTS detection results already contain "
-        "any object with the given label (e.g. 'ship', 'boat', 'person'). "
-        "Use this when the user asks yes/no style questions such as:\n"
-        "- \"현재 화면에 선박 있냐?\"\n"
-        "- \"지금 시야에 사람 있어?\"\n"
-        "- \"이 구역에 보트가 한 척이라도 있으면 알려줘\"\n"
-        "또한 한국어로 \"탐지\"/\"발견\"/\"포착\"/\"잡히다\" 같은 표현을 쓰면서\n"
-        "단순히 '선박이 탐지되었는지', '사람이 발견되었는지'를 물어볼 때\n"
-        "가장 먼저 사용해야 하는 도구이다. 예:\n"
-        "- \"지금 선박 탐지된 거 있어?\"\n"
-        "- \"이 화면에 사람 발견된 거 있냐?\"\n"
-        "- \"현재 시야에 보트가 하나라도 잡혔어?\"\n"
-        "This tool NEVER moves the camera and NEVER starts a new detection; "
-        "it only inspects the latest detection results stored in _STATE['objects'] and "
-        "returns exists/count/matched_objects. "
-        "If the user instead requests detailed target information or coordinates "
-        "(예: \"어디에 있는지 좌표를 알려줘\"), prefer using 'eots.objects_list' "
-        "after detection is available."
-    ),
-)
-def eots_detection_object_exists(
-    object_name: str,
-):
-    """
-    현재 화면(EO/IR 등)에서 **이미 수행된 탐지 결과**
-    (_STATE['objects'])를 조회하여,
-    주어진 이름(object_name)을 가진 객체가 존재하는지 여부를 반환하는 도구.
-
-    _STATE['objects'] 예시:
-    [
-        {
-            "id": "trk_001",
-            "label": "ship",
-            "confidence": 0.91,
-            "bbox": [x_min, y_min, x_max, y_max],
-            "distance_m": 1234.5
-        },
-        ...
-    ]
-
-    - object_name: "ship", "boat", "person" 등 label 이름
-    - label 비교는 소문자로 변환하여 대소문자 무시하고 수행
-    - 새로운 탐지를 수행하지 않고, 이미 저장된 탐지 결과만 조회한다.
-    - 사용자의 발화에 '탐지', '발견', '포착', '잡히다' 등의 표현이 포함되어 있고
-      단순히 존재 여부(있냐/없냐)를 묻는다면 이 도구 사용을 우선 고려한다.
-    """
-    objects: List[Dict[str, Any]] = _STATE.get("objects", [])
-    q = (object_name or "").strip().lower()
-
-    matched = [
-        obj for obj in objects
-        if str(obj.get("label", "")).lower() == q
-    ]
-    exists = len(matched) > 0
-
-    return {
-        "ok": True,
-        "query": object_name,
-        "exists": exists,
-        "count": len(matched),
-        "matched_objects": matched,
-    }
-
-
-
 @app.tool(name="eots.set_mode", description="Set EO/IR/auto mode")
 def eots_set_mode(
     mode: Literal["eo", "ir", "auto"]
@@ -1,34 +1,360 @@
 # eots_tools_core.py
 from __future__ import annotations
 
+import asyncio
+import json
+import os
+import time
+from bisect import bisect_right
+from collections import deque
 from typing import Dict, Any, List, Optional, Literal, Annotated
-from pydantic import Field
+from pydantic import Field, WithJsonSchema
+from fastmcp.server.dependencies import get_context
+from fastmcp.tools.tool import Tool, ToolResult
+from fastmcp.tools.tool_transform import forward
 from server_main import app  # fastmcp 앱 인스턴스
 
-# 내부 상태: 단일 클라이언트 데모용
-_STATE: Dict[str, Any] = {
-    "mode": "eo",
-    "zoom": 1,
-    "pan": 0.0,
-    "tilt": 0.0,
-    "tracking": False,
-}
+import eots_fleet
+import eots_pointing
+import eots_scan
+import eots_scan_plan
+from eots_driver import DeviceDriver
+from eots_capture import CaptureManager
+from eots_recorder import Recorder
+from eots_state import DELETED, StateConflict, StateStore
+from system_monitor import SAMPLER
+import notify
+import persist
+
+
+def _session_id() -> Optional[str]:
+    # MCP 요청 밖(내부 호출, 벤치마크 등)에서는 세션 없음
+    try:
+        return get_context().session_id
+    except RuntimeError:
+        return None
+
+
+# 카메라별 상태(불변 스냅샷 저장소 + dict 호환 뷰, eots_state 참고)와 장비 드라이버, 명령 큐 (eots_fleet 참고)
+_FLEET = eots_fleet.CameraFleet.from_env(
+    os.environ,
+    {"mode": "eo", "zoom": 1, "pan": 0.0, "tilt": 0.0, "tracking": False},
+    _session_id,
+    float(os.getenv("EOTS_SESSION_TTL_S", "60")),
+)
+# 툴 본문은 호출 중인 카메라(camera_id, 생략 시 기본 카메라)의 상태를 읽고 쓴다
+_STORE = eots_fleet.CurrentStore(_FLEET)
+_STATE = eots_fleet.CurrentState(_FLEET)
+
+# 재시작 후 되살리지 않는 키: 탐지 결과, 진행 중이던 이동/녹화/자동 스캔 (프로세스와 함께 끝난 작업)
+_TRANSIENT_KEYS = frozenset({
+    "objects", "moving", "recording", "recording_mode", "recording_filename_hint",
+    "auto_scan", "auto_scan_pattern",
+})
+
+
+def _durable(store: StateStore) -> Dict[str, Any]:
+    return {k: v for k, v in store.snapshot.data.items() if k not in _TRANSIENT_KEYS}
+
+
+def _persist_state() -> None:
+    # 기본 카메라 상태는 그대로 최상위에, 추가 카메라는 "__cameras__" 아래 camera_id 별로 둔다.
+    # 저널 STATE_SET 레코드는 추가 카메라일 때만 "__camera__" 키로 대상을 표시한다.
+    p = persist.PERSIST
+    if p is None:
+        return
+    default = _FLEET.default
+
+    def dump():
+        meta = _durable(default.store)
+        others = {cam.camera_id: _durable(cam.store) for cam in _FLEET if cam is not default}
+        if others:
+            meta["__cameras__"] = others
+        return {}, meta
+
+    def load(arrays, meta):
+        meta = dict(meta)
+        for camera_id, data in meta.pop("__cameras__", {}).items():
+            cam = _FLEET.get(camera_id)
+            if cam is not None:  # 설정에서 빠진 카메라는 버린다
+                cam.store.commit(data)
+        default.store.commit(meta)
+
+    def replay(kind, payload):
+        if kind == persist.STATE_SET:
+            changes = json.loads(payload)
+            cam = _FLEET.get(changes.pop("__camera__", None))
+            changes.update(dict.fromkeys(changes.pop("__deleted__", ()), DELETED))
+            if cam is not None:
+                cam.store.commit(changes)
+
+    def listener(cam):
+        tag = {} if cam is default else {"__camera__": cam.camera_id}
+
+        def on_commit(changes):
+            # 지운 키(DELETED)는 "__deleted__" 목록으로 기록
+            rec, deleted = {}, []
+            for k, v in changes.items():
+                if k in _TRANSIENT_KEYS:
+                    continue
+                if v is DELETED:
+                    deleted.append(k)
+                else:
+                    rec[k] = v
+            if deleted:
+                rec["__deleted__"] = deleted
+            if rec:
+                p.log_json(persist.STATE_SET, {**rec, **tag})
+        return on_commit
+
+    p.register(persist.Domain("state", dump, load, replay))
+    for cam in _FLEET:
+        cam.store.listeners.append(listener(cam))
+
+
+_persist_state()
+
+
+# 탐지 이력 링버퍼 용량(프레임 수)
+_DETECTION_HISTORY = int(os.getenv("EOTS_DETECTION_HISTORY", "256"))
+
+# 개별 툴과 eots.apply 가 공유하는 값 범위
+ZoomLevel = Annotated[int, Field(ge=1, le=30)]
+PanDeg = Annotated[float, Field(ge=-180, le=180)]
+TiltDeg = Annotated[float, Field(ge=-90, le=90)]
+
+# eots.apply 응답에 담는 PTZ/영상 상태 키
+_APPLY_KEYS = (
+    "mode", "zoom", "pan", "tilt", "ir_polarity",
+    "eo_stab", "ir_stab", "enhance_eo", "enhance_ir",
+)
+
+
+# 기본 카메라 장비 드라이버: EOTS_DRIVER_ADDR 미설정 시 None (상태만 갱신하는 데모 모드)
+_DRIVER: Optional[DeviceDriver] = _FLEET.default.driver
+
+# 영상 녹화: 프레임 소스 + pre-event 링버퍼 + 세그먼트 writer (eots_recorder 참고)
+_RECORDER = Recorder.from_env(os.environ)
+# 정지 영상 캡처: 녹화 링버퍼의 최신 프레임 -> 공유 메모리 슬롯 -> 인코딩 풀 (eots_capture 참고)
+_CAPTURES = CaptureManager.from_env(_RECORDER.ring, _RECORDER.source.fps, os.environ)
+_BURST_TASKS: set = set()  # 실행 중인 버스트 태스크 (GC 방지용 참조)
+
+# system.status 에 실을 큐 깊이 (샘플러 스레드가 주기적으로 읽는다)
+# 카메라별 명령 큐/드라이버 큐 (기본 카메라는 접미사 없이, 추가 카메라는 ':<camera_id>')
+for _cam in _FLEET:
+    _sfx = "" if _cam is _FLEET.default else f":{_cam.camera_id}"
+    SAMPLER.add_gauge(f"camera_queue{_sfx}", lambda cam=_cam: cam.queue_depth)
+    if _cam.driver is not None:
+        SAMPLER.add_gauge(f"driver_queue{_sfx}", lambda drv=_cam.driver: drv.queue_depth)
+        SAMPLER.add_gauge(f"driver_in_flight{_sfx}", lambda drv=_cam.driver: drv.in_flight)
+SAMPLER.add_gauge("record_writer_queue", lambda: _RECORDER.writer_queued)
+SAMPLER.add_gauge("capture_busy_slots", lambda: _CAPTURES.busy_slots)
+SAMPLER.add_gauge("capture_bursts", lambda: len(_BURST_TASKS))
 
 
 # =========================
 # 공통 유틸
 # =========================
+async def _command(cmd: str, immediate: bool = False, **args: Any) -> Dict[str, Any]:
+    """
+    현재 카메라의 장비로 명령을 보내고 응답(result)을 기다린다. 상태(_STATE)는 장비가 성공 응답한 뒤에만 갱신한다.
+    실패 시 eots_driver.DriverError 가 그대로 올라가 툴 오류로 보고된다.
+    세션(eots.session_begin)이 열려 있으면 상태 변경 명령은 보내지 않고, commit 때
+    스테이징된 상태를 'apply' 1건으로 보낸다. immediate=True(정지, LRF 등 동작 명령)는 항상 즉시 전송.
+    """
+    driver = _FLEET.current().driver
+    if driver is None or (not immediate and _STATE.in_session):
+        return {}
+    return await driver.send(cmd, **args)
+
+
+def _on_tracking(enable: bool) -> None:
+    # track_session 녹화는 기본 카메라 영상 파이프라인에만 붙어 있다
+    if _FLEET.current() is _FLEET.default:
+        _RECORDER.on_tracking(enable)
+
+
 def _set_mode_internal(mode: Literal["eo", "ir", "swir"]) -> Dict[str, Any]:
     _STATE["mode"] = mode
     return {"ok": True, "mode": _STATE["mode"]}
 
 
 def _set_zoom_internal(sensor: Literal["eo", "ir"], level: int) -> Dict[str, Any]:
-    _STATE["mode"] = sensor  # 센서 모드도 같이 갱신(EO/IR 줌질의용)
-    _STATE["zoom"] = level
+    _STATE.update({"mode": sensor, "zoom": level})  # 센서 모드도 같이 갱신(EO/IR 줌질의용)
     return {"ok": True, "mode": _STATE["mode"], "zoom": _STATE["zoom"]}
 
 
+# =========================
+# 탐지 이력 링버퍼
+# =========================
+class _DetectionHistory:
+    """
+    고정 용량 탐지 프레임 링버퍼.
+    - 프레임마다 1부터 단조 증가하는 seq 부여
+    - 용량을 넘으면 가장 오래된 프레임부터 자동 폐기 (deque maxlen)
+    """
+
+    def __init__(self, capacity: int):
+        self._frames: deque = deque(maxlen=capacity)  # (seq, ts, objects)
+        self.seq = 0
+
+    def push(self, objects: List[Dict[str, Any]]) -> int:
+        self.seq += 1
+        self._frames.append((self.seq, time.time(), objects))
+        return self.seq
+
+    @property
+    def oldest(self) -> int:
+        return self._frames[0][0] if self._frames else self.seq + 1
+
+    def frame(self, seq: int):
+        # seq 는 연속이므로 위치 계산으로 바로 찾는다
+        i = seq - self.oldest
+        return self._frames[i] if 0 <= i < len(self._frames) else None
+
+    def since(self, cursor: int, max_frames: int) -> List[tuple]:
+        start = max(cursor + 1, self.oldest)
+        return [self._frames[i - self.oldest] for i in range(start, min(self.seq, start + max_frames - 1) + 1)]
+
+
+_HISTORY = _DetectionHistory(_DETECTION_HISTORY)
+
+
+# =========================
+# 탐지 결과 라벨 인덱스
+# =========================
+class _DetectionIndex:
+    """
+    탐지 결과 1프레임(상태의 'objects')에 대한 라벨 인덱스.
+    게시 시점에 한 번만 만들고, 이후 존재 여부/개수 조회는 dict 조회로 끝난다.
+
+    - rows[label] : 해당 라벨 객체들 (confidence 내림차순)
+    - neg_conf[label] : -confidence 오름차순 (min_confidence 개수 계산용 bisect)
+    """
+
+    def __init__(self, objects: List[Dict[str, Any]]):
+        self.objects = objects
+        self.rows: Dict[str, List[Dict[str, Any]]] = {}
+        for obj in objects:
+            self.rows.setdefault(str(obj.get("label", "")).lower(), []).append(obj)
+        self.neg_conf: Dict[str, List[float]] = {}
+        for label, rows in self.rows.items():
+            rows.sort(key=lambda o: -float(o.get("confidence") or 0.0))
+            self.neg_conf[label] = [-float(o.get("confidence") or 0.0) for o in rows]
+
+    def count(self, label: str, min_confidence: Optional[float] = None) -> int:
+        neg = self.neg_conf.get(label)
+        if not neg:
+            return 0
+        if min_confidence is None:
+            return len(neg)
+        return bisect_right(neg, -min_confidence)
+
+
+# camera_id -> 그 카메라 상태의 objects 에 대한 인덱스
+_DET_INDEX: Dict[str, _DetectionIndex] = {}
+
+
+def _publish_objects(objects: List[Dict[str, Any]], camera_id: Optional[str] = None) -> int:
+    """
+    탐지 파이프라인이 새 결과를 게시할 때 호출: 최신 스냅샷 + 라벨 인덱스 1회 생성 + 이력 프레임 추가.
+    이력 링버퍼(eots.objects_since)는 기본 카메라 영상 파이프라인 것이라 기본 카메라 게시만 쌓는다.
+    """
+    cam = _FLEET.get(camera_id) or _FLEET.default
+    # 서버 내부 게시: 세션 스테이징과 무관하게 바로 반영
+    cam.store.commit({"objects": objects})
+    _DET_INDEX[cam.camera_id] = _DetectionIndex(objects)
+    return _HISTORY.push(objects) if cam is _FLEET.default else _HISTORY.seq
+
+
+def _detection_index() -> _DetectionIndex:
+    # 현재 카메라 상태의 objects 가 다른 경로로 교체된 경우에도 인덱스가 따라가도록 객체 동일성으로 확인
+    cam = _FLEET.current()
+    objects = cam.store.snapshot.data.get("objects", [])
+    index = _DET_INDEX.get(cam.camera_id)
+    if index is None or index.objects is not objects:
+        index = _DET_INDEX[cam.camera_id] = _DetectionIndex(objects)
+    return index
+
+
+def _object_key(obj: Dict[str, Any], i: int) -> str:
+    return str(obj.get("id", f"#{i}"))
+
+
+def _diff_objects(base: List[Dict[str, Any]], cur: List[Dict[str, Any]]) -> Dict[str, Any]:
+    old = {_object_key(o, i): o for i, o in enumerate(base)}
+    new = {_object_key(o, i): o for i, o in enumerate(cur)}
+    return {
+        "added": [o for k, o in new.items() if k not in old],
+        "changed": [o for k, o in new.items() if k in old and old[k] != o],
+        "removed": [k for k in old if k not in new],
+    }
+
+
+# 상태 키 -> notify 토픽 (나머지 키는 ptz). objects 는 detections 토픽에 객체 단위 델타로 나간다.
+_RECORDING_KEYS = frozenset({
+    "recording", "recording_mode", "recording_filename_hint", "last_capture_id", "last_capture_timestamp",
+})
+
+
+def _object_items(objects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {_object_key(o, i): o for i, o in enumerate(objects or [])}
+
+
+def _notify_state() -> None:
+    # 기본 카메라 키는 그대로, 추가 카메라 키는 '<camera_id>.<key>' 로 같은 ptz/recording 토픽에 싣는다
+    hub = notify.HUB
+    default = _FLEET.default
+    last_objects = [_object_items(default.store.snapshot.data.get("objects"))]
+
+    def prefix(cam):
+        return "" if cam is default else f"{cam.camera_id}."
+
+    def topic_items(topic):
+        if topic == "detections":
+            return _object_items(default.store.snapshot.data.get("objects"))
+        out = {}
+        for cam in _FLEET:
+            pre = prefix(cam)
+            for k, v in cam.store.snapshot.data.items():
+                if k != "objects" and (k in _RECORDING_KEYS) == (topic == "recording"):
+                    out[pre + k] = v
+        return out
+
+    def listener(cam):
+        pre = prefix(cam)
+
+        def on_commit(changes):
+            ptz, rec = {}, {}
+            for k, v in changes.items():
+                if v is DELETED:
+                    v = None  # notify 델타에서 None 은 삭제
+                if k == "objects":
+                    if cam is not default:
+                        continue
+                    cur = _object_items(v)
+                    prev, last_objects[0] = last_objects[0], cur
+                    if hub.wants("detections"):
+                        delta = {k2: o for k2, o in cur.items() if prev.get(k2) != o}
+                        delta.update({k2: None for k2 in prev if k2 not in cur})
+                        hub.publish("detections", delta)
+                elif k in _RECORDING_KEYS:
+                    rec[pre + k] = v
+                else:
+                    ptz[pre + k] = v
+            hub.publish("ptz", ptz)
+            hub.publish("recording", rec)
+        return on_commit
+
+    for topic in ("ptz", "detections", "recording"):
+        hub.source(topic, lambda topic=topic: topic_items(topic))
+    for cam in _FLEET:
+        cam.store.listeners.append(listener(cam))
+
+
+_notify_state()
+
+
 # =========================
 # 모드 / 줌 / 폴라리티
 # =========================
@@ -37,7 +363,7 @@ def _set_zoom_internal(sensor: Literal["eo", "ir"], level: int) -> Dict[str, Any
     name="eots.set_mode",
     description="Set EO/IR/SWIR sensor mode. (core logic only, see ko/en files for localized descriptions.)",
 )
-def eots_set_mode(
+async def eots_set_mode(
     mode: Literal["eo", "ir", "swir"]
 ):
     """
@@ -48,6 +374,7 @@ def eots_set_mode(
       - 주간 모드로 전환
       - SWIR 모드로 전환
     """
+    await _command("set_mode", mode=mode)
     return _set_mode_internal(mode)
 
 
@@ -55,15 +382,16 @@ def eots_set_mode(
     name="eots.zoom",
     description="Change zoom level on EO/IR sensor.",
 )
-def eots_zoom(
+async def eots_zoom(
     sensor: Literal["eo", "ir"],
-    level: Annotated[int, Field(ge=1, le=30)],
+    level: ZoomLevel,
 ):
     """
     PRESET: 1, 2
       - EO 카메라 3배 확대
       - IR 카메라 5배 확대
     """
+    await _command("zoom", sensor=sensor, level=level)
     return _set_zoom_internal(sensor, level)
 
 
@@ -71,7 +399,7 @@ def eots_zoom(
     name="eots.set_ir_polarity",
     description="Set IR polarity: black-hot / white-hot.",
 )
-def eots_set_ir_polarity(
+async def eots_set_ir_polarity(
     polarity: Literal["black_hot", "white_hot"]
 ):
     """
@@ -79,10 +407,79 @@ def eots_set_ir_polarity(
       - IR 카메라 흑상 전환
       - IR 카메라 백상 전환
     """
+    await _command("set_ir_polarity", polarity=polarity)
     _STATE["ir_polarity"] = polarity
     return {"ok": True, "ir_polarity": _STATE["ir_polarity"]}
 
 
+# =========================
+# 일괄 적용 (모드/줌/팬/틸트/폴라리티/보정/향상)
+# =========================
+
+def _apply_internal(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    검증이 끝난 변경분(상태 키 -> 값)을 한 번에 반영하고 변경 내역을 돌려준다.
+    값 계산을 모두 끝낸 뒤 _STATE.update 한 번으로 반영하므로 중간 상태가 노출되지 않는다.
+    """
+    deltas = {
+        k: {"from": _STATE.get(k), "to": v}
+        for k, v in changes.items()
+        if _STATE.get(k) != v
+    }
+    _STATE.update(changes)
+    return {
+        "ok": True,
+        "version": _STATE.version,
+        "state": {k: _STATE.get(k) for k in _APPLY_KEYS},
+        "deltas": deltas,
+    }
+
+
+@app.tool(
+    name="eots.apply",
+    description=(
+        "Apply several camera settings atomically in ONE call: mode, zoom, pan_deg, tilt_deg, "
+        "ir_polarity, stabilization ({eo|ir: bool}) and enhance ({eo|ir: bool}). "
+        "Only the given fields change; bounds are the same as the individual eots.* tools. "
+        "Prefer this over chaining set_mode/zoom/set_pan/set_tilt calls, "
+        "e.g. 'IR 카메라 5배 확대' -> mode='ir', zoom=5. Returns the resulting state and per-field deltas."
+    ),
+)
+async def eots_apply(
+    mode: Optional[Literal["eo", "ir", "swir"]] = None,
+    zoom: Optional[ZoomLevel] = None,
+    pan_deg: Optional[PanDeg] = None,
+    tilt_deg: Optional[TiltDeg] = None,
+    ir_polarity: Optional[Literal["black_hot", "white_hot"]] = None,
+    stabilization: Optional[Dict[Literal["eo", "ir"], bool]] = None,
+    enhance: Optional[Dict[Literal["eo", "ir"], bool]] = None,
+):
+    """
+    PRESET: 1, 2, 5~8, 13~15, 21~24, 34~37 을 한 번의 호출로 묶어서 처리
+      - 예: EO 카메라 3배 확대 -> mode="eo", zoom=3
+      - 예: 열상 전환 + 백상 + 흔들림 보정 -> mode="ir", ir_polarity="white_hot", stabilization={"ir": true}
+    모든 인자는 fastmcp 가 호출 전에 검증하므로, 하나라도 범위를 벗어나면 아무것도 반영되지 않는다.
+    """
+    changes: Dict[str, Any] = {}
+    if mode is not None:
+        changes["mode"] = mode
+    if zoom is not None:
+        changes["zoom"] = zoom
+    if pan_deg is not None:
+        changes["pan"] = pan_deg
+    if tilt_deg is not None:
+        changes["tilt"] = tilt_deg
+    if ir_polarity is not None:
+        changes["ir_polarity"] = ir_polarity
+    for sensor, enable in (stabilization or {}).items():
+        changes[f"{sensor}_stab"] = enable
+    for sensor, enable in (enhance or {}).items():
+        changes[f"enhance_{sensor}"] = enable
+    if changes:
+        await _command("apply", changes=changes)
+    return _apply_internal(changes)
+
+
 # =========================
 # 팬 / 틸트 / 방위각
 # =========================
@@ -91,8 +488,8 @@ def eots_set_ir_polarity(
     name="eots.set_pan",
     description="Set pan angle in degrees (-180 ~ 180).",
 )
-def eots_set_pan(
-    pan_deg: Annotated[float, Field(ge=-180, le=180)]
+async def eots_set_pan(
+    pan_deg: PanDeg
 ):
     """
     PRESET: 5, 6
@@ -100,6 +497,7 @@ def eots_set_pan(
       - 우로 30도 회전
     PRESET(연계): 9 (방위각 30도로 이동 시 내부적으로 pan과 매핑될 수 있음)
     """
+    await _command("set_pan", pan_deg=pan_deg)
     _STATE["pan"] = pan_deg
     return {"ok": True, "pan_deg": _STATE["pan"]}
 
@@ -108,8 +506,8 @@ def eots_set_pan(
     name="eots.set_tilt",
     description="Set tilt angle in degrees (-90 ~ 90).",
 )
-def eots_set_tilt(
-    tilt_deg: Annotated[float, Field(ge=-90, le=90)]
+async def eots_set_tilt(
+    tilt_deg: TiltDeg
 ):
     """
     PRESET: 7, 8, 10
@@ -117,6 +515,7 @@ def eots_set_tilt(
       - 하로 3도 회전
       - 고저각 3도로 이동
     """
+    await _command("set_tilt", tilt_deg=tilt_deg)
     _STATE["tilt"] = tilt_deg
     return {"ok": True, "tilt_deg": _STATE["tilt"]}
 
@@ -125,17 +524,17 @@ def eots_set_tilt(
     name="eots.set_azimuth",
     description="Set absolute azimuth/bearing (0~360 degrees).",
 )
-def eots_set_azimuth(
+async def eots_set_azimuth(
     bearing_deg: Annotated[float, Field(ge=0, le=360)]
 ):
     """
     PRESET: 9
       - 방위각 30도로 이동
     """
-    _STATE["bearing"] = bearing_deg
+    await _command("set_azimuth", bearing_deg=bearing_deg)
     # 0~360 -> -180~180 pan 매핑
     pan_deg = bearing_deg if bearing_deg <= 180 else bearing_deg - 360
-    _STATE["pan"] = pan_deg
+    _STATE.update({"bearing": bearing_deg, "pan": pan_deg})
     return {"ok": True, "bearing_deg": _STATE["bearing"], "pan_deg": _STATE["pan"]}
 
 
@@ -143,14 +542,18 @@ def eots_set_azimuth(
     name="eots.stop",
     description="Stop camera motion and tracking.",
 )
-def eots_stop():
+async def eots_stop():
     """
     PRESET: 12
       - 정지
     """
-    _STATE["moving"] = False
-    _STATE["tracking"] = False
-    return {"ok": True, "stopped": True, "moving": False, "tracking": False}
+    # 오토 스캔부터 멈춰야 다음 웨이포인트로 다시 슬루하지 않는다 (스캐너 상태는 세션과 무관하게 바로 반영)
+    _scanner().stop()
+    _STORE.commit({"auto_scan": False})
+    await _command("stop", immediate=True)
+    _STATE.update({"moving": False, "tracking": False})
+    _on_tracking(False)
+    return {"ok": True, "stopped": True, "moving": False, "tracking": False, "auto_scan": False}
 
 
 # =========================
@@ -161,7 +564,7 @@ def eots_stop():
     name="eots.stabilization",
     description="Enable or disable image stabilization for EO/IR.",
 )
-def eots_stabilization(
+async def eots_stabilization(
     sensor: Literal["eo", "ir"],
     enable: bool,
 ):
@@ -170,6 +573,7 @@ def eots_stabilization(
       - 주간 카메라 흔들림 보정 시작/종료
       - 열상 카메라 흔들림 보정 시작/종료
     """
+    await _command("stabilization", sensor=sensor, enable=enable)
     key = f"{sensor}_stab"
     _STATE[key] = enable
     return {"ok": True, "sensor": sensor, "stabilization": enable}
@@ -179,7 +583,7 @@ def eots_stabilization(
     name="eots.pan_speed",
     description="Increase or decrease pan speed.",
 )
-def eots_pan_speed(
+async def eots_pan_speed(
     delta: Annotated[float, Field(ge=-1.0, le=1.0)]
 ):
     """
@@ -187,8 +591,8 @@ def eots_pan_speed(
       - 팬 속도 증가 (양수)
       - 팬 속도 감소 (음수)
     """
-    cur = _STATE.get("pan_speed", 0.0)
-    _STATE["pan_speed"] = cur + delta
+    await _command("pan_speed", delta=delta)
+    _STATE.modify(lambda st: {"pan_speed": st.get("pan_speed", 0.0) + delta})
     return {"ok": True, "pan_speed": _STATE["pan_speed"]}
 
 
@@ -196,7 +600,7 @@ def eots_pan_speed(
     name="eots.tilt_speed",
     description="Increase or decrease tilt speed.",
 )
-def eots_tilt_speed(
+async def eots_tilt_speed(
     delta: Annotated[float, Field(ge=-1.0, le=1.0)]
 ):
     """
@@ -204,8 +608,8 @@ def eots_tilt_speed(
       - 틸트 속도 증가 (양수)
       - 틸트 속도 감소 (음수)
     """
-    cur = _STATE.get("tilt_speed", 0.0)
-    _STATE["tilt_speed"] = cur + delta
+    await _command("tilt_speed", delta=delta)
+    _STATE.modify(lambda st: {"tilt_speed": st.get("tilt_speed", 0.0) + delta})
     return {"ok": True, "tilt_speed": _STATE["tilt_speed"]}
 
 
@@ -217,7 +621,7 @@ def eots_tilt_speed(
     name="eots.power",
     description="Power on/off EO/IR sensors and LRF.",
 )
-def eots_power(
+async def eots_power(
     target: Literal["eo", "ir", "lrf"],
     on: bool,
 ):
@@ -227,6 +631,7 @@ def eots_power(
       - 주간 카메라 전원 켜기/끄기
       - LRF 켜기/끄기 (필요시)
     """
+    await _command("power", target=target, on=on)
     key = f"power_{target}"
     _STATE[key] = on
     return {"ok": True, "target": target, "on": on}
@@ -241,14 +646,17 @@ def eots_power(
         "e.g. 'Show target position', 'Measure the current target', 'Give me the range to the target'."
     ),
 )
-def eots_lrf_fire():
+async def eots_lrf_fire():
     """
     PRESET: 33, 32 (예: 거리 측정 시작, 타겟 위치 알려줘)
     """
-    _STATE["lrf_fired"] = True
-    # 실제 시스템에서는 측정 거리/좌표를 채워 넣으면 됨
-    _STATE["lrf_last_distance_m"] = 1234.5
-    _STATE["lrf_last_target_coord"] = {"lat": 37.2322, "lon": 129.5403}
+    res = await _command("lrf_fire", immediate=True)
+    # 드라이버가 없으면(데모 모드) 고정 측정값 사용
+    _STATE.update({
+        "lrf_fired": True,
+        "lrf_last_distance_m": res.get("distance_m", 1234.5),
+        "lrf_last_target_coord": res.get("target_coord", {"lat": 37.2322, "lon": 129.5403}),
+    })
     return {
         "ok": True,
         "fired": True,
@@ -265,15 +673,15 @@ def eots_lrf_fire():
     name="eots.autofocus",
     description="Run autofocus on selected sensor.",
 )
-def eots_autofocus(
+async def eots_autofocus(
     sensor: Literal["eo", "ir"]
 ):
     """
     PRESET: 11
       - 열상 자동초점 / 주간 자동초점
     """
-    _STATE["autofocus_fired"] = True
-    _STATE["autofocus_sensor"] = sensor
+    await _command("autofocus", immediate=True, sensor=sensor)
+    _STATE.update({"autofocus_fired": True, "autofocus_sensor": sensor})
     return {"ok": True, "sensor": sensor, "autofocus_fired": True}
 
 
@@ -281,7 +689,7 @@ def eots_autofocus(
     name="eots.enhance",
     description="Start or stop image enhancement on EO/IR.",
 )
-def eots_enhance(
+async def eots_enhance(
     sensor: Literal["eo", "ir"],
     action: Literal["start", "stop"],
 ):
@@ -289,6 +697,7 @@ def eots_enhance(
     PRESET: 34, 35, 36, 37
       - 열상/주간 카메라 영상 개선 시작/종료
     """
+    await _command("enhance", sensor=sensor, action=action)
     key = f"enhance_{sensor}"
     _STATE[key] = (action == "start")
     return {"ok": True, "sensor": sensor, "enhance": _STATE[key]}
@@ -298,28 +707,74 @@ def eots_enhance(
 # 위치 이동 / 프리셋 이동
 # =========================
 
+async def _point_internal(sol: eots_pointing.PointingSolution, **extra: Any) -> Dict[str, Any]:
+    """지향 해(PointingSolution)를 pan/tilt/zoom 1건의 apply 명령으로 보내고 상태를 한 번에 갱신."""
+    changes = {
+        "pan": sol.pan_deg, "tilt": sol.tilt_deg, "zoom": sol.zoom, "bearing": sol.bearing_deg,
+        "target_lat": sol.lat, "target_lon": sol.lon, **extra,
+    }
+    await _command("apply", changes=changes)
+    _STATE.update(changes)
+    return {"ok": True, "solution": sol.as_dict()}
+
+
+async def point_default_camera(sol: eots_pointing.PointingSolution, **extra: Any) -> Dict[str, Any]:
+    """
+    eots.* 밖의 툴(zone.move_camera 등)이 지향 해를 적용할 때 쓰는 공개 진입점.
+    지향 해는 기본 카메라 설치 위치 기준이므로 기본 카메라를 현재 카메라로 두고, 그 명령 큐 차례에 적용한다.
+    """
+    cam = _FLEET.default
+    token = _FLEET.bind(cam)
+    try:
+        return await cam.run(lambda: _point_internal(sol, **extra))
+    finally:
+        _FLEET.unbind(token)
+
+
 @app.tool(
     name="eots.goto_latlon",
-    description="Move sensor to given latitude/longitude (if supported by system).",
+    description=(
+        "Move sensor to given latitude/longitude. Pan/tilt/zoom are solved from the camera site "
+        "(bearing, depression angle incl. earth curvature, zoom framing extent_m)."
+    ),
 )
-def eots_goto_latlon(
-    lat: float,
-    lon: float,
+async def eots_goto_latlon(
+    lat: Annotated[float, Field(ge=-90, le=90)],
+    lon: Annotated[float, Field(ge=-180, le=180)],
+    extent_m: Annotated[Optional[float], Field(gt=0)] = None,
 ):
     """
     PRESET: 38
       - 위도 37°13'56\"N 경도 129°32'25\"E 위치로 이동
+    extent_m: 화면에 담을 대상 폭(m). 생략 시 EOTS_FRAME_WIDTH_M 기준으로 줌 계산
     """
-    _STATE["target_lat"] = lat
-    _STATE["target_lon"] = lon
-    return {"ok": True, "lat": lat, "lon": lon}
+    out = await _point_internal(eots_pointing.solve_latlon(lat, lon, extent_m))
+    out.update(lat=lat, lon=lon)
+    return out
+
+
+@app.tool(
+    name="eots.preset_define",
+    description="Define/update a named preset by lat/lon (pointing solution is precomputed for eots.goto_preset).",
+)
+def eots_preset_define(
+    name: str,
+    lat: Annotated[float, Field(ge=-90, le=90)],
+    lon: Annotated[float, Field(ge=-180, le=180)],
+    extent_m: Annotated[Optional[float], Field(gt=0)] = None,
+):
+    sol = eots_pointing.CACHE.put("preset", name, eots_pointing.SOLVER.solve(lat, lon, extent_m))
+    return {"ok": True, "preset": name, "solution": sol.as_dict()}
 
 
 @app.tool(
     name="eots.goto_preset",
-    description="Move sensor to named preset position.",
+    description=(
+        "Move sensor to named preset position. Presets defined with eots.preset_define use the "
+        "cached pan/tilt/zoom solution; other names are passed to the device's own preset table."
+    ),
 )
-def eots_goto_preset(
+async def eots_goto_preset(
     name: str,
 ):
     """
@@ -327,8 +782,14 @@ def eots_goto_preset(
       - 좌측 빨간 등대 위치로 이동
       - 우측 방파제 프리셋 위치로 이동
     """
+    sol = eots_pointing.CACHE.get("preset", name)
+    if sol is not None:
+        out = await _point_internal(sol, last_preset=name)
+        out["preset"] = name
+        return out
+    await _command("goto_preset", name=name)
     _STATE["last_preset"] = name
-    return {"ok": True, "preset": name}
+    return {"ok": True, "preset": name, "solution": None}
 
 
 # =========================
@@ -344,21 +805,130 @@ def eots_objects_list():
     PRESET: 41
       - 탐지 객체 목록 가져오기
     """
-    objects: List[Dict[str, Any]] = _STATE.get("objects", [])
-    return {"ok": True, "objects": objects}
+    snap = _STORE.snapshot  # 스냅샷 1회 참조: 쓰기와 서로 막지 않음
+    objects: List[Dict[str, Any]] = snap.data.get("objects", [])
+    return {"ok": True, "seq": _HISTORY.seq, "version": snap.version, "objects": objects}
+
+
+@app.tool(
+    name="eots.detection_object_exists",
+    description=(
+        "[SIDE-EFFECT FREE] Check whether the *current* EOTS detection results already contain "
+        "any object with the given label (e.g. 'ship', 'boat', 'person'). "
+        "Use this when the user asks yes/no style questions such as:\n"
+        "- \"현재 화면에 선박 있냐?\"\n"
+        "- \"지금 시야에 사람 있어?\"\n"
+        "- \"이 구역에 보트가 한 척이라도 있으면 알려줘\"\n"
+        "또한 한국어로 \"탐지\"/\"발견\"/\"포착\"/\"잡히다\" 같은 표현을 쓰면서\n"
+        "단순히 '선박이 탐지되었는지', '사람이 발견되었는지'를 물어볼 때\n"
+        "가장 먼저 사용해야 하는 도구이다. 예:\n"
+        "- \"지금 선박 탐지된 거 있어?\"\n"
+        "- \"이 화면에 사람 발견된 거 있냐?\"\n"
+        "- \"현재 시야에 보트가 하나라도 잡혔어?\"\n"
+        "This tool NEVER moves the camera and NEVER starts a new detection; "
+        "it only inspects the latest detection results (state 'objects') and "
+        "returns exists/count/matched_objects (highest confidence first). "
+        "Optional min_confidence / limit / fields keep the response small; "
+        "use limit=0 when only exists/count are needed. "
+        "If the user instead requests detailed target information or coordinates "
+        "(예: \"어디에 있는지 좌표를 알려줘\"), prefer using 'eots.objects_list' "
+        "after detection is available."
+    ),
+)
+def eots_detection_object_exists(
+    object_name: str,
+    min_confidence: Annotated[Optional[float], Field(ge=0.0, le=1.0)] = None,
+    limit: Annotated[Optional[int], Field(ge=0, le=500)] = None,
+    fields: Optional[List[str]] = None,
+):
+    """
+    현재 화면(EO/IR 등)에서 **이미 수행된 탐지 결과**(상태의 'objects')를 조회하여,
+    주어진 이름(object_name)을 가진 객체가 존재하는지 여부를 반환하는 도구.
+
+    - object_name: "ship", "boat", "person" 등 label 이름 (대소문자 무시)
+    - 새로운 탐지를 수행하지 않고, 이미 저장된 탐지 결과만 조회한다.
+    - min_confidence: 이 값 이상인 객체만 센다/반환한다
+    - limit: matched_objects 최대 개수 (0 이면 exists/count 만 반환, None 이면 전체)
+    - fields: matched_objects 에 담을 키 목록 (예: ["id", "confidence"]), None 이면 전체
+    - 조회는 게시 시점에 만들어 둔 라벨 인덱스(_DetectionIndex)를 사용한다.
+    """
+    index = _detection_index()
+    q = (object_name or "").strip().lower()
+
+    count = index.count(q, min_confidence)
+    n = count if limit is None else min(count, limit)
+    matched = index.rows.get(q, [])[:n]
+    if fields is not None:
+        matched = [{k: obj[k] for k in fields if k in obj} for obj in matched]
+
+    return {
+        "ok": True,
+        "query": object_name,
+        "exists": count > 0,
+        "count": count,
+        "matched_objects": matched,
+    }
+
+
+@app.tool(
+    name="eots.objects_since",
+    description=(
+        "Return detection frames newer than a cursor (seq from a previous objects_list/objects_since). "
+        "mode='frames' returns the buffered frames; mode='diff' returns added/changed/removed objects "
+        "between the cursor frame and the latest one. Use the returned cursor for the next call."
+    ),
+)
+def eots_objects_since(
+    cursor: Annotated[int, Field(ge=0)] = 0,
+    mode: Literal["frames", "diff"] = "frames",
+    max_frames: Annotated[int, Field(ge=1, le=256)] = 32,
+):
+    """
+    PRESET: 41 (폴링 클라이언트용 증분 조회)
+      - 링버퍼에 남아 있지 않은 구간을 요청하면 gap=True (frames) 또는 reset=True (diff)
+    """
+    latest = _HISTORY.seq
+    cursor = min(cursor, latest)  # 서버 재시작 등으로 앞선 커서는 최신으로 맞춤
+
+    if mode == "frames":
+        frames = _HISTORY.since(cursor, max_frames)
+        next_cursor = frames[-1][0] if frames else cursor
+        return {
+            "ok": True,
+            "cursor": next_cursor,
+            "latest": latest,
+            "gap": cursor < latest and cursor + 1 < _HISTORY.oldest,
+            "more": next_cursor < latest,
+            "frames": [{"seq": q, "ts": ts, "objects": objs} for q, ts, objs in frames],
+        }
+
+    if cursor == latest:
+        return {"ok": True, "cursor": latest, "reset": False, "added": [], "changed": [], "removed": []}
+    # 비교 대상은 링버퍼의 최신 프레임: 돌려주는 cursor(latest)와 같은 프레임이어야 다음 호출에서 빠지는 변경이 없다
+    # (_STATE 는 세션이 열려 있으면 세션 시작 시점 스냅샷을 보고, objects 가 다른 경로로 바뀌었을 수도 있다)
+    cur = _HISTORY.frame(latest)[2]
+    if cursor == 0:
+        base = []
+    else:
+        frame = _HISTORY.frame(cursor)
+        if frame is None:
+            return {"ok": True, "cursor": latest, "reset": True, "objects": cur}
+        base = frame[2]
+    return {"ok": True, "cursor": latest, "reset": False, **_diff_objects(base, cur)}
 
 
 @app.tool(
     name="eots.auto_detect",
     description="Enable/disable automatic detection.",
 )
-def eots_auto_detect(
+async def eots_auto_detect(
     enable: bool,
 ):
     """
     PRESET: 42, 43
       - 자동탐지 시작/종료
     """
+    await _command("auto_detect", enable=enable)
     _STATE["auto_detect"] = enable
     return {"ok": True, "auto_detect": enable}
 
@@ -367,17 +937,93 @@ def eots_auto_detect(
     name="eots.auto_track",
     description="Enable/disable automatic tracking.",
 )
-def eots_auto_track(
+async def eots_auto_track(
     enable: bool,
 ):
     """
     PRESET: 44, 45
       - 자동추적 시작/종료
     """
+    await _command("auto_track", enable=enable)
     _STATE["auto_track_mode"] = enable
+    _on_tracking(enable)
     return {"ok": True, "auto_track_mode": enable}
 
 
+# 오토스캔 패턴: 이름 -> 정의. 시작할 때 현재 슬루 속도로 컴파일한다.
+_SCAN_SPECS: Dict[str, eots_scan.ScanPatternSpec] = {
+    "pattern_A": eots_scan.ScanPatternSpec(
+        name="pattern_A", sectors=[eots_scan.ScanSector(pan_start=-180, pan_end=-180, step_deg=20)]),
+    "pattern_B": eots_scan.ScanPatternSpec(
+        name="pattern_B", sectors=[eots_scan.ScanSector(pan_start=-60, pan_end=60, step_deg=15)]),
+}
+
+
+async def _scan_goto(pan: float, tilt: float, zoom: int) -> None:
+    # 스캐너는 서버 백그라운드 동작이므로 세션 스테이징과 무관하게 즉시 전송/반영
+    changes = {"pan": pan, "tilt": tilt, "zoom": zoom}
+    await _command("apply", immediate=True, changes=changes)
+    _STORE.commit(changes)
+
+
+# 카메라별 스캐너 (스캔 태스크는 시작한 툴 호출의 컨텍스트를 복사하므로 그 카메라로만 명령을 보낸다)
+_SCANNERS: Dict[str, eots_scan.ScanScheduler] = {}
+
+
+def _scanner() -> eots_scan.ScanScheduler:
+    camera_id = _FLEET.current().camera_id
+    scanner = _SCANNERS.get(camera_id)
+    if scanner is None:
+        scanner = _SCANNERS[camera_id] = eots_scan.ScanScheduler(_scan_goto)
+    return scanner
+
+
+def _compile_scan(name: str) -> eots_scan.CompiledPattern:
+    return eots_scan.compile_pattern(_SCAN_SPECS[name], eots_scan.slew_rates(_STATE))
+
+
+@app.tool(
+    name="eots.auto_scan_define",
+    description=(
+        "Define/update an auto-scan pattern from sectors (pan range swept in step_deg) and/or "
+        "explicit waypoints, each with tilt/zoom/dwell_s."
+    ),
+)
+def eots_auto_scan_define(
+    pattern: eots_scan.ScanPatternSpec,
+):
+    compiled = eots_scan.compile_pattern(pattern, eots_scan.slew_rates(_STATE))
+    _SCAN_SPECS[pattern.name] = pattern
+    return {"ok": True, "pattern": compiled.summary()}
+
+
+@app.tool(
+    name="eots.auto_scan_plan",
+    description=(
+        "Plan an auto-scan pattern that covers every defined zone: zones are gridded into "
+        "FOV-sized pan/tilt cells at the given zoom and ordered to minimize slew time "
+        "(nearest-neighbour tour + 2-opt) under the current pan/tilt speed limits. "
+        "The result is saved as an auto-scan pattern (start it with eots.auto_scan)."
+    ),
+)
+def eots_auto_scan_plan(
+    name: str = "planned",
+    zoom: ZoomLevel = 4,
+    dwell_s: Annotated[float, Field(gt=0, le=60)] = 1.0,
+):
+    import zone_tools  # zone_tools 가 이 모듈을 import 하므로 호출 시점에 참조
+
+    rates = eots_scan.slew_rates(_STATE)
+    spec, stats = eots_scan_plan.plan_route(
+        zone_tools._INDEX.zones, eots_pointing.SOLVER, rates,
+        name=name, zoom=zoom, dwell_s=dwell_s, start=(_STATE.get("pan", 0.0), _STATE.get("tilt", 0.0)),
+    )
+    if spec is None:
+        return {"ok": False, "error": "no_zones", "plan": stats}
+    _SCAN_SPECS[name] = spec
+    return {"ok": True, "pattern": name, "plan": stats}
+
+
 @app.tool(
     name="eots.auto_scan_list",
     description="Return list of available auto-scan patterns.",
@@ -387,24 +1033,49 @@ def eots_auto_scan_list():
     PRESET: 46
       - 오토 스캔 목록 보여줘
     """
-    patterns = _STATE.get("auto_scan_patterns", ["pattern_A", "pattern_B"])
-    return {"ok": True, "patterns": patterns}
+    return {
+        "ok": True,
+        "patterns": list(_SCAN_SPECS),
+        "details": [_compile_scan(n).summary() for n in _SCAN_SPECS],
+    }
 
 
 @app.tool(
     name="eots.auto_scan",
-    description="Start or stop auto scan / surveillance.",
+    description="Start or stop auto scan / surveillance. pattern defaults to the last used (or first) pattern.",
 )
-def eots_auto_scan(
+async def eots_auto_scan(
     enable: bool,
+    pattern: Optional[str] = None,
 ):
     """
     PRESET: 47, 48, 49, 50 (자동 감시/오토스캔 시작/중지 계열)
       - 오토 스캔 실행 / 오토 스캔 중지
       - 자동 감시 시작 / 자동 감시 중지
     """
-    _STATE["auto_scan"] = enable
-    return {"ok": True, "auto_scan": enable}
+    if not enable:
+        _scanner().stop()
+        _STORE.commit({"auto_scan": False})
+        return {"ok": True, "auto_scan": False}
+
+    name = pattern or _STATE.get("auto_scan_pattern") or next(iter(_SCAN_SPECS))
+    if name not in _SCAN_SPECS:
+        return {"ok": False, "error": "pattern_not_found", "patterns": list(_SCAN_SPECS)}
+    compiled = _compile_scan(name)
+    _scanner().start(compiled)
+    _STORE.commit({"auto_scan": True, "auto_scan_pattern": name})
+    return {"ok": True, "auto_scan": True, "pattern": compiled.summary()}
+
+
+@app.tool(
+    name="eots.auto_scan_status",
+    description=(
+        "Auto-scan scheduler status: current waypoint, completed cycles, planned vs achieved "
+        "revisit interval, dwell jitter, late starts and overrun/error counters."
+    ),
+)
+def eots_auto_scan_status():
+    return {"ok": True, **_scanner().status()}
 
 
 # =========================
@@ -413,7 +1084,10 @@ def eots_auto_scan(
 
 @app.tool(
     name="eots.record",
-    description="Start or stop video recording.",
+    description=(
+        "Start or stop video recording. Recordings include the pre-event buffer (last seconds before "
+        "the start). mode='track_session' records while auto tracking is on, starting/stopping with it."
+    ),
 )
 def eots_record(
     action: Literal["start", "stop"],
@@ -423,33 +1097,269 @@ def eots_record(
     """
     PRESET: 49, 50
       - 녹화 시작 / 녹화 중지
+    파일 기록은 writer 스레드가 하므로 시작/중지 모두 바로 반환한다.
     """
+    recording_id = None
+    if action == "stop":
+        recording_id = _RECORDER.stop()
+    elif mode == "track_session":
+        _RECORDER.arm(filename_hint)
+        if _STATE.get("auto_track_mode", False):
+            _RECORDER.on_tracking(True)
+    else:
+        recording_id = _RECORDER.start(mode, filename_hint)
+
     if action == "start":
-        _STATE["recording"] = True
-        _STATE["recording_mode"] = mode
-        _STATE["recording_filename_hint"] = filename_hint
+        _STORE.commit({"recording": _RECORDER.recording, "recording_mode": mode, "recording_filename_hint": filename_hint})
     else:
-        _STATE["recording"] = False
+        _STORE.commit({"recording": False})
 
     return {
         "ok": True,
         "action": action,
-        "recording": _STATE.get("recording", False),
+        "recording": _RECORDER.recording,
+        "recording_id": recording_id or _RECORDER.status()["recording_id"],
+        "armed_track_session": _RECORDER.armed is not None,
         "mode": _STATE.get("recording_mode"),
         "filename_hint": _STATE.get("recording_filename_hint"),
     }
 
 
+@app.tool(
+    name="eots.record_status",
+    description="Recording pipeline status: pre-event buffer fill, active/last recording frames, segments and drops.",
+)
+def eots_record_status():
+    return {"ok": True, **_RECORDER.status()}
+
+
 @app.tool(
     name="eots.capture",
     description="Capture a still image frame.",
 )
-def eots_capture():
+async def eots_capture():
     """
     PRESET: (예: 캡처 시작)
+    인코딩/저장은 풀에서 진행되므로 바로 반환한다. 완료 여부는 eots.capture_status 로 확인.
     """
-    import time as _time
-    capture_id = f"capture_{int(_time.time())}"
-    _STATE["last_capture_id"] = capture_id
-    _STATE["last_capture_timestamp"] = _time.time()
-    return {"ok": True, "capture_id": capture_id}
+    await _command("capture", immediate=True)
+    _RECORDER.start_pipeline()
+    capture_id = _CAPTURES.new_id()
+    if await _CAPTURES.wait_frame():
+        rec = _CAPTURES.grab(capture_id)
+    else:
+        rec = _CAPTURES.fail(capture_id, "no frames from source")
+    _STORE.commit({"last_capture_id": capture_id, "last_capture_timestamp": time.time()})
+    return {"ok": rec["status"] == "queued", "capture_id": capture_id, "status": rec["status"]}
+
+
+@app.tool(
+    name="eots.capture_burst",
+    description=(
+        "Capture `count` still frames every `interval_ms`. Returns the burst_id and capture_ids at once; "
+        "frames are grabbed and encoded in the background (poll eots.capture_status)."
+    ),
+)
+async def eots_capture_burst(
+    count: Annotated[int, Field(ge=1, le=100)],
+    interval_ms: Annotated[float, Field(ge=0, le=10000)] = 100.0,
+):
+    await _command("capture_burst", immediate=True, count=count, interval_ms=interval_ms)
+    _RECORDER.start_pipeline()
+    burst_id, ids = _CAPTURES.schedule(count)
+    task = asyncio.get_running_loop().create_task(_CAPTURES.run_burst(ids, interval_ms))
+    _BURST_TASKS.add(task)
+    task.add_done_callback(_BURST_TASKS.discard)
+    _STORE.commit({"last_capture_id": ids[-1], "last_capture_timestamp": time.time()})
+    return {"ok": True, "burst_id": burst_id, "capture_ids": ids, "interval_ms": interval_ms}
+
+
+@app.tool(
+    name="eots.capture_status",
+    description=(
+        "Look up capture status (scheduled/queued/done/error/dropped, file path, size) by capture_ids "
+        "and/or burst_id. With neither, returns encoder pool/slot counters."
+    ),
+)
+def eots_capture_status(
+    capture_ids: Optional[List[str]] = None,
+    burst_id: Optional[str] = None,
+):
+    ids = list(capture_ids or [])
+    if burst_id:
+        ids += [i for i in _CAPTURES.burst_members(burst_id) if i not in ids]
+    items = _CAPTURES.lookup(ids)
+    return {
+        "ok": True,
+        "captures": items,
+        "pending": sum(1 for i in items if i["status"] in ("scheduled", "queued")),
+        "pool": _CAPTURES.status(),
+    }
+
+
+# =========================
+# 세션 단위 일괄 반영 (여러 콘솔/에이전트 동시 사용)
+# =========================
+
+@app.tool(
+    name="eots.session_begin",
+    description=(
+        "Start a staged session for THIS client: following eots.* setting calls are kept private "
+        "to the session (nothing moves) until eots.session_commit applies them all at once. "
+        "Use when several calls must not interleave with other operators' commands."
+    ),
+)
+def eots_session_begin():
+    sid = _session_id()
+    if sid is None:
+        return {"ok": False, "error": "no_session"}
+    view = _STATE.begin(sid)
+    return {"ok": True, "base_version": view.base.version}
+
+
+@app.tool(
+    name="eots.session_commit",
+    description=(
+        "Apply everything staged since eots.session_begin atomically. Fails with error='conflict' "
+        "(and applies nothing) if another client changed the same settings in the meantime."
+    ),
+)
+async def eots_session_commit():
+    sid = _session_id()
+    view = _STATE.end(sid) if sid is not None else None
+    if view is None:
+        return {"ok": False, "error": "no_open_session"}
+    # 충돌 검사와 반영을 쓰기 락 안에서 한 번에 끝내(예약) 장비 응답을 기다리는 동안 끼어든 쓰기와 어긋나지 않게 하고,
+    # 장비가 거부하면 그 사이 다시 바뀌지 않은 키만 세션 시작 시점 값으로 되돌린다 (그때 없던 키는 지운다)
+    try:
+        snap = _STORE.commit(view.staged, base=view.base)
+    except StateConflict as e:
+        return {"ok": False, "error": "conflict", "keys": e.keys}
+    if view.staged:
+        try:
+            await _command("apply", changes=view.staged)
+        except BaseException:
+            _STORE.revert(snap, view.base.data, view.staged)
+            raise
+    return {"ok": True, "version": snap.version, "applied": view.staged}
+
+
+@app.tool(
+    name="eots.session_abort",
+    description="Discard everything staged since eots.session_begin.",
+)
+def eots_session_abort():
+    sid = _session_id()
+    view = _STATE.end(sid) if sid is not None else None
+    return {"ok": True, "discarded": list(view.staged) if view is not None else []}
+
+
+# =========================
+# 다중 카메라 (camera_id 라우팅 / 일괄 명령)
+# =========================
+
+# 영상 파이프라인(녹화/캡처/탐지)은 기본 카메라에만 있다
+_DEFAULT_CAMERA_TOOLS = frozenset({
+    "eots.record", "eots.record_status", "eots.capture", "eots.capture_burst", "eots.capture_status",
+    "eots.objects_list", "eots.objects_since",
+})
+# 스키마는 단순 string 으로 둔다 (Optional 의 anyOf 는 호출마다 하는 스키마 검증 비용을 2배 가까이 늘린다)
+CameraId = Annotated[Optional[str], WithJsonSchema({
+    "type": "string", "description": "Camera to control (see eots.cameras); default camera if omitted",
+})]
+# 툴 이름 -> (camera_id 를 붙이기 전 원래 툴, 명령 큐를 거치는지)
+_ROUTED: Dict[str, tuple] = {}
+
+
+def _unknown_camera(camera_id: Optional[str]) -> Dict[str, Any]:
+    return {"ok": False, "error": "unknown_camera", "camera_id": camera_id, "cameras": _FLEET.ids}
+
+
+async def _dispatch(cam: eots_fleet.CameraController, name: str, call) -> Any:
+    """
+    call 을 cam 을 현재 카메라로 두고 실행. 비동기 툴(장비 명령)은 그 카메라 명령 큐의 차례에
+    하나씩 실행하고, 동기 툴(조회/로컬 설정)은 이벤트 루프에서 원자적으로 끝나므로 바로 실행한다.
+    """
+    if cam is not _FLEET.default and name in _DEFAULT_CAMERA_TOOLS:
+        return {"ok": False, "error": "default_camera_only", "camera_id": cam.camera_id,
+                "default_camera": _FLEET.default.camera_id}
+    token = _FLEET.bind(cam)
+    try:
+        return await (cam.run(call) if _ROUTED[name][1] else call())
+    finally:
+        _FLEET.unbind(token)
+
+
+def _route(tool: Tool) -> Tool:
+    name = tool.name
+    _ROUTED[name] = (tool, asyncio.iscoroutinefunction(tool.fn))
+
+    async def routed(camera_id: CameraId = None, **kwargs: Any):
+        cam = _FLEET.get(camera_id)
+        if cam is None:
+            return _unknown_camera(camera_id)
+        return await _dispatch(cam, name, lambda: forward(**kwargs))
+
+    routed_tool = Tool.from_tool(tool, transform_fn=routed)
+    # from_tool 은 required 를 set 으로 모아서 순서가 PYTHONHASHSEED 마다 바뀐다 (카탈로그 ETag / 매니페스트가 흔들림).
+    # 원래 툴의 순서를 유지하고, 새로 생긴 필수 인자가 있으면 이름순으로 뒤에 붙인다.
+    required = set(routed_tool.parameters.get("required", ()))
+    order = [k for k in tool.parameters.get("required", ()) if k in required]
+    routed_tool.parameters["required"] = order + sorted(required.difference(order))
+    return routed_tool
+
+
+@app.tool(
+    name="eots.cameras",
+    description=(
+        "List the cameras of this fleet (camera_id, driver address/connection, command queue depth, "
+        "key PTZ state). Pass camera_id to any eots.* tool to control that camera."
+    ),
+)
+def eots_cameras():
+    return {"ok": True, "default_camera": _FLEET.default.camera_id, "cameras": [cam.status() for cam in _FLEET]}
+
+
+@app.tool(
+    name="eots.broadcast",
+    description=(
+        "Run one eots.* tool with the same args on several cameras at once (all cameras if camera_ids is "
+        "omitted), e.g. 'all cameras stop' -> tool='eots.stop'. Cameras run in parallel; on each camera the "
+        "call is queued behind that camera's pending commands. Returns the result (or error) per camera."
+    ),
+)
+async def eots_broadcast(
+    tool: str,
+    args: Optional[Dict[str, Any]] = None,
+    camera_ids: Optional[List[str]] = None,
+):
+    if tool not in _ROUTED:
+        return {"ok": False, "error": "unknown_tool", "tools": sorted(_ROUTED)}
+    missing = [c for c in camera_ids or () if _FLEET.get(c) is None]
+    if missing:
+        return _unknown_camera(missing[0])
+    cams = list(_FLEET) if camera_ids is None else [_FLEET.get(c) for c in dict.fromkeys(camera_ids)]
+    target = _ROUTED[tool][0]
+
+    async def one(cam):
+        try:
+            res = await _dispatch(cam, tool, lambda: target.run(dict(args or {})))
+        except Exception as e:  # 카메라 1대의 실패(타임아웃, 큐 가득 참 등)가 나머지 결과를 막지 않도록
+            return {"ok": False, "error": type(e).__name__, "detail": str(e)}
+        return res.structured_content if isinstance(res, ToolResult) else res
+
+    results = await asyncio.gather(*(one(cam) for cam in cams))
+    by_camera = {cam.camera_id: res for cam, res in zip(cams, results)}
+    return {
+        "ok": all(r.get("ok", False) for r in results),
+        "tool": tool,
+        "results": by_camera,
+        "failed": [cid for cid, r in by_camera.items() if not r.get("ok", False)],
+    }
+
+
+# 위에서 정의한 모든 eots.* 툴에 camera_id 인자를 붙인다 (플릿 전체를 다루는 툴 제외)
+for _tool in [t for t in app._tool_manager._tools.values() if getattr(t, "fn", None) is not None
+              and t.fn.__module__ == __name__ and t.name.startswith("eots.")]:
+    if _tool.name not in ("eots.cameras", "eots.broadcast"):
+        app.add_tool(_route(_tool))
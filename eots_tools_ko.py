@@ -8,6 +8,7 @@ TOOL_DESCRIPTIONS_KO: Dict[str, str] = {
     "eots.set_mode": "EO / IR / SWIR 모드를 전환합니다.",
     "eots.zoom": "EO/IR 카메라의 줌 배율을 조정합니다.",
     "eots.set_ir_polarity": "IR 카메라의 흑상/백상 모드를 전환합니다.",
+    "eots.apply": "모드/줌/팬/틸트/폴라리티/흔들림 보정/영상 개선을 한 번에 적용합니다.",
     "eots.set_pan": "카메라의 수평(Pan) 각도를 설정합니다.",
     "eots.set_tilt": "카메라의 수직(Tilt) 각도를 설정합니다.",
     "eots.set_azimuth": "카메라의 절대 방위각(0~360도)을 설정합니다.",
@@ -21,13 +22,26 @@ TOOL_DESCRIPTIONS_KO: Dict[str, str] = {
     "eots.enhance": "주간/열상 카메라 영상 개선 기능을 시작/종료합니다.",
     "eots.goto_latlon": "지정된 위도/경도로 카메라 조준점을 이동합니다.",
     "eots.goto_preset": "지정된 이름의 프리셋 위치로 카메라를 이동합니다.",
+    "eots.preset_define": "위도/경도로 이름 있는 프리셋을 정의하고 팬/틸트/줌 지향 값을 미리 계산해 둡니다.",
+    "eots.auto_scan_define": "섹터/웨이포인트로 오토 스캔 패턴을 정의합니다.",
+    "eots.auto_scan_plan": "정의된 구역을 모두 커버하면서 슬루 시간이 최소가 되는 오토 스캔 경로를 계획해 패턴으로 저장합니다.",
+    "eots.auto_scan_status": "오토 스캔 진행 상태와 재방문 주기, 체류 지터, 지연(overrun) 통계를 반환합니다.",
     "eots.objects_list": "최근 탐지된 객체 목록을 반환합니다.",
+    "eots.objects_since": "커서 이후에 추가된 탐지 프레임 또는 객체 변경분만 반환합니다.",
     "eots.auto_detect": "자동 탐지 모드를 시작/종료합니다.",
     "eots.auto_track": "자동 추적 모드를 시작/종료합니다.",
     "eots.auto_scan_list": "오토 스캔 패턴 목록을 반환합니다.",
     "eots.auto_scan": "오토 스캔/자동 감시 모드를 시작/종료합니다.",
     "eots.record": "영상 녹화를 시작/종료합니다.",
+    "eots.record_status": "녹화 파이프라인 상태(사전 이벤트 버퍼, 기록 중인 세그먼트, 드롭 프레임)를 반환합니다.",
     "eots.capture": "현재 화면을 스냅샷(정지 영상)으로 캡처합니다.",
+    "eots.capture_burst": "지정한 간격으로 여러 장을 연속 캡처합니다. 인코딩은 백그라운드에서 진행됩니다.",
+    "eots.capture_status": "캡처 ID 또는 버스트 ID 로 인코딩/저장 완료 여부를 조회합니다.",
+    "eots.session_begin": "이 클라이언트 전용 세션을 열어 이후 설정 변경을 모아 둡니다.",
+    "eots.session_commit": "세션에 모아 둔 설정 변경을 한 번에 적용합니다.",
+    "eots.session_abort": "세션에 모아 둔 설정 변경을 취소합니다.",
+    "eots.cameras": "연결된 카메라 목록(camera_id, 장비 연결, 명령 큐 깊이, 주요 PTZ 상태)을 반환합니다.",
+    "eots.broadcast": "같은 eots.* 명령을 여러 카메라(생략 시 전체)에 동시에 보냅니다. 예: 전체 카메라 정지.",
 }
 
 
@@ -36,6 +50,7 @@ def get_tool_description_ko(tool_name: str) -> str:
     BridgeSession.build_tools_block 에서,
     language == 'ko' 인 경우 이 함수를 사용해서
     description(한국어)을 끌어다 쓰는 용도로 사용할 수 있습니다.
+    툴 목록 전체가 필요하면 tool_catalog.CATALOG.get("ko") 가 한 번 만들어 둔 목록을 쓰십시오.
     """
     return TOOL_DESCRIPTIONS_KO.get(
         tool_name,
@@ -0,0 +1,115 @@
+# geofence.py (Incremental geofence rule evaluation)
+"""
+Keeps each target's current zone membership and turns target moves into
+enter/exit transitions for the zone rules set by zone.set_rule:
+
+- no_entry:    critical alert on enter, info alert on exit
+- speed_limit: warning alert when a target inside the zone goes over
+               `value` knots, info alert when it is back under (or leaves)
+
+Only zones whose bbox overlaps the segment between a target's old and new
+position are re-tested; a zone the target was inside always overlaps that
+segment, so exits are never missed.
+
+The evaluator only holds membership state. The zone index, the rule table
+and the alert sink are passed in by target_tools, which keeps this module
+free of tool-module imports (and of their import cycles through server_main).
+"""
+import numpy as np
+
+
+class GeofenceEvaluator:
+
+    def __init__(self, alert):
+        self.alert = alert        # fn(level, message, zone_id, target_id) -> alert dict (+ delivered)
+        self.inside: dict = {}    # target_id -> set of zone_ids containing it
+        self.speeding: dict = {}  # target_id -> set of speed_limit zone_ids it is over
+
+    def evaluate(self, index, rules: dict, ids: list, old_lat, old_lon, new_lat, new_lon, speed) -> list:
+        """
+        Process a batch of moves (arrays aligned with `ids`; old == new for a
+        fresh registration or a speed-only update) against a zone_tools
+        _ZoneIndex and its rule table. Returns the raised alerts.
+        """
+        box = (np.minimum(old_lat, new_lat), np.minimum(old_lon, new_lon),
+               np.maximum(old_lat, new_lat), np.maximum(old_lon, new_lon))
+        if len(ids) == 1:
+            # single update_track: skip the (N x leaves) broadcast
+            slots = index.query_bbox(*(float(b[0]) for b in box))
+            qi = np.zeros(slots.size, dtype=np.intp)
+        else:
+            qi, slots = index.query_boxes(*box)
+        if qi.size == 0:
+            return []
+
+        # one polygon test per candidate zone, over all its candidate targets
+        order = np.argsort(slots, kind="stable")
+        qi, slots = qi[order], slots[order]
+        hit = np.zeros(qi.size, dtype=bool)
+        starts = np.flatnonzero(np.r_[True, slots[1:] != slots[:-1]])
+        for a, b in zip(starts, np.r_[starts[1:], slots.size]):
+            q = qi[a:b]
+            hit[a:b] = index.zones[slots[a]].contains(new_lat[q], new_lon[q])
+
+        tested: dict = {}
+        now_in: dict = {}
+        for q, s, h in zip(qi.tolist(), slots.tolist(), hit.tolist()):
+            zid = index.zones[s].zone_id
+            tested.setdefault(q, set()).add(zid)
+            if h:
+                now_in.setdefault(q, set()).add(zid)
+
+        events = []
+        for q, zs in tested.items():
+            tid = ids[q]
+            before = self.inside.get(tid, set())
+            after = (before - zs) | now_in.get(q, set())
+            over_before = self.speeding.get(tid, set())
+            over_after = over_before - zs
+            for zid in after & zs:
+                r = rules.get(zid)
+                if r and r["rule"] == "speed_limit" and r["value"] is not None and speed[q] > r["value"]:
+                    over_after.add(zid)
+
+            for zid in after - before:
+                if rules.get(zid, {}).get("rule") == "no_entry":
+                    events.append(self.alert("critical", f"{tid} entered no_entry zone {zid}", zid, tid))
+            for zid in before - after:
+                if rules.get(zid, {}).get("rule") == "no_entry":
+                    events.append(self.alert("info", f"{tid} left no_entry zone {zid}", zid, tid))
+            for zid in over_after - over_before:
+                limit = rules[zid]["value"]
+                events.append(self.alert(
+                    "warning", f"{tid} over speed_limit {limit:g} kn in zone {zid} ({float(speed[q]):.1f} kn)", zid, tid))
+            for zid in over_before - over_after:
+                events.append(self.alert("info", f"{tid} no longer over speed_limit in zone {zid}", zid, tid))
+
+            self._store(self.inside, tid, after)
+            self._store(self.speeding, tid, over_after)
+        return events
+
+    def resync_zone(self, index, zone_id: str, ids: list, lat, lon) -> None:
+        """
+        A zone was (re)defined: recompute which targets it contains without
+        raising alerts, since no target actually moved.
+        """
+        s = index.slot.get(zone_id)
+        if s is None or not ids:
+            return
+        inside = index.zones[s].contains(lat, lon)
+        for tid, h in zip(ids, inside.tolist()):
+            cur = self.inside.get(tid, set())
+            if h:
+                cur.add(zone_id)
+            else:
+                cur.discard(zone_id)
+                if tid in self.speeding:
+                    self._store(self.speeding, tid, self.speeding[tid] - {zone_id})
+            self._store(self.inside, tid, cur)
+
+    @staticmethod
+    def _store(d: dict, tid: str, zs: set) -> None:
+        if zs:
+            d[tid] = zs
+        else:
+            d.pop(tid, None)
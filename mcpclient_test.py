@@ -11,6 +11,14 @@ from fastmcp.client.transports import StreamableHttpTransport
 MCP_URL = os.getenv("MCP_URL", "https://distributors-fy-dome-bosnia.trycloudflare.com/mcp")
 
 
+def make_client(url: Optional[str] = None) -> Client:
+    """url 이 있으면 Streamable-HTTP, 없으면 같은 프로세스의 server_main.app 에 in-memory 로 연결."""
+    if url:
+        return Client(StreamableHttpTransport(url=url))
+    import server_main  # in-memory 일 때만 서버 모듈(툴 전체)을 불러온다
+    return Client(server_main.app)
+
+
 # ---------- 유틸 ----------
 def pretty(obj: Any) -> str:
     try:
@@ -56,8 +64,7 @@ def to_schema_json(schema_obj: Any) -> Optional[dict]:
 
 
 async def main():
-    transport = StreamableHttpTransport(url=MCP_URL)
-    client = Client(transport)
+    client = make_client(MCP_URL)
 
     async with client:
         # 연결 확인
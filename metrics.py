@@ -0,0 +1,174 @@
+# metrics.py
+"""
+툴 호출 계측: 호출 수 / 오류 수 / 지연 히스토그램
+
+- 집계: 스레드마다 자기 샤드(dict)에만 쓰므로 기록 경로에 락이 없다.
+  샤드 목록 등록(스레드당 1회)과 읽기(병합)만 락을 쓴다.
+- 히스토그램: 고정 경계(초) 누적 없는 버킷 카운트. Prometheus 출력 시 누적으로 변환.
+- MetricsMiddleware: FastMCP 미들웨어로 모든 등록 툴의 tools/call 을 감싼다.
+  on_call_tool 체인을 만들지 않고 __call__ 을 직접 구현해 호출당 부가 비용을 줄였다.
+- render_prometheus(): /metrics 라우트용 text exposition (version 0.0.4)
+- in_flight / loop: 실행 중인 툴 호출 수와 실행 루프. system_monitor 샘플러가 읽는다.
+
+오버헤드 측정: python bench_metrics.py
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+# 버킷 상한 (초)
+BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# 샤드 항목 레이아웃: [calls, errors, sum_s, bucket_0, ..., bucket_n(+Inf)]
+_CALLS, _ERRORS, _SUM, _B0 = 0, 1, 2, 3
+
+
+class ToolMetrics:
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._width = _B0 + len(buckets) + 1
+        self._local = threading.local()
+        self._shards: List[Dict[str, list]] = []
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.in_flight = 0  # 실행 중인 툴 호출 수 (이벤트 루프 스레드에서만 증감)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None  # 툴을 실행하는 루프 (system_monitor 지연 측정용)
+
+    def _shard(self) -> Dict[str, list]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._shard()
+        row = shard.get(name)
+        if row is None:
+            row = shard[name] = [0] * self._width
+            row[_SUM] = 0.0
+        row[_CALLS] += 1
+        if error:
+            row[_ERRORS] += 1
+        row[_SUM] += seconds
+        row[_B0 + bisect_left(self.buckets, seconds)] += 1
+
+    def merged(self) -> Dict[str, list]:
+        """모든 스레드 샤드를 합친 tool -> row."""
+        with self._lock:
+            shards = list(self._shards)
+        out: Dict[str, list] = {}
+        for shard in shards:
+            for name, row in list(shard.items()):
+                acc = out.get(name)
+                if acc is None:
+                    out[name] = list(row)
+                else:
+                    for i, v in enumerate(row):
+                        acc[i] += v
+        return out
+
+    def _quantile(self, row: list, q: float) -> Optional[float]:
+        """버킷 상한 기준 근사 분위수 (초)."""
+        n = row[_CALLS]
+        if not n:
+            return None
+        rank, seen = q * n, 0
+        for i, c in enumerate(row[_B0:]):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+    def snapshot(self, tool: Optional[str] = None) -> Dict[str, Any]:
+        tools = {}
+        for name, row in sorted(self.merged().items()):
+            if tool is not None and name != tool:
+                continue
+            n = row[_CALLS]
+            tools[name] = {
+                "calls": n,
+                "errors": row[_ERRORS],
+                "mean_ms": round(row[_SUM] / n * 1000, 3) if n else None,
+                "p50_ms_le": _ms(self._quantile(row, 0.50)),
+                "p95_ms_le": _ms(self._quantile(row, 0.95)),
+                "p99_ms_le": _ms(self._quantile(row, 0.99)),
+            }
+        return {"since": self.started_at, "tools": tools}
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP mcp_tool_calls_total MCP tool calls.",
+            "# TYPE mcp_tool_calls_total counter",
+        ]
+        rows = sorted(self.merged().items())
+        lines += [f'mcp_tool_calls_total{{tool="{_esc(n)}"}} {r[_CALLS]}' for n, r in rows]
+        lines += ["# HELP mcp_tool_errors_total MCP tool calls that raised.",
+                  "# TYPE mcp_tool_errors_total counter"]
+        lines += [f'mcp_tool_errors_total{{tool="{_esc(n)}"}} {r[_ERRORS]}' for n, r in rows]
+        lines += ["# HELP mcp_tool_latency_seconds MCP tool call latency.",
+                  "# TYPE mcp_tool_latency_seconds histogram"]
+        for n, r in rows:
+            t = _esc(n)
+            cum = 0
+            for le, c in zip(self.buckets, r[_B0:]):
+                cum += c
+                lines.append(f'mcp_tool_latency_seconds_bucket{{tool="{t}",le="{le}"}} {cum}')
+            lines.append(f'mcp_tool_latency_seconds_bucket{{tool="{t}",le="+Inf"}} {r[_CALLS]}')
+            lines.append(f'mcp_tool_latency_seconds_sum{{tool="{t}"}} {r[_SUM]:.9f}')
+            lines.append(f'mcp_tool_latency_seconds_count{{tool="{t}"}} {r[_CALLS]}')
+        lines += ["# HELP mcp_tool_calls_in_flight MCP tool calls currently executing.",
+                  "# TYPE mcp_tool_calls_in_flight gauge",
+                  f"mcp_tool_calls_in_flight {self.in_flight}"]
+        return "\n".join(lines) + "\n"
+
+
+def _ms(s: Optional[float]) -> Optional[float]:
+    return None if s is None else round(s * 1000, 3)
+
+
+def _esc(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsMiddleware(Middleware):
+
+    def __init__(self, metrics: ToolMetrics):
+        self.metrics = metrics
+
+    async def __call__(self, context: MiddlewareContext, call_next):
+        if context.method != "tools/call":
+            return await call_next(context)
+        name = context.message.name
+        m = self.metrics
+        if m.loop is None:
+            m.loop = asyncio.get_running_loop()
+        m.in_flight += 1
+        t0 = time.perf_counter()
+        try:
+            result = await call_next(context)
+        except BaseException:
+            m.observe(name, time.perf_counter() - t0, True)
+            raise
+        else:
+            m.observe(name, time.perf_counter() - t0)
+        finally:
+            m.in_flight -= 1
+        return result
+
+
+METRICS = ToolMetrics()
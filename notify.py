@@ -0,0 +1,308 @@
+# notify.py
+"""
+상태 변경 푸시 (폴링 대체)
+
+콘솔이 eots.objects_list / system.status / 녹화 상태를 수백 ms 마다 툴 호출로 폴링하던 것을,
+서버가 상태가 바뀔 때 같은 Streamable-HTTP 세션(SSE)으로 알림을 밀어 주는 방식으로 바꾼다.
+
+- 토픽: ptz, detections, recording, targets, zones, alerts, system (TOPICS)
+- 구독: notify.subscribe 툴 (notify_tools). 구독은 MCP 세션 단위이며 세션이 닫히면 바로 정리된다
+  (세션 종료 훅). 훅을 걸 수 없는 세션은 전송 실패 시, 또는 subscribe/status 때의 점검에서 정리된다.
+- 초기 상태 소스: 상태 소유 모듈이 source(topic, fn) 으로 등록한다. 모듈 이름으로 등록해 두면
+  그 토픽을 처음 구독할 때 import 한다 (import 중에 모듈이 fn 을 등록하고 publish 훅을 건다).
+- 델타: 모든 토픽이 {key: value} 형태. value=None 은 삭제. 상태 소유 모듈이 변경 시점에 publish 한다.
+    ptz/recording : 상태 키 -> 값        detections : 객체 id -> 객체
+    targets       : target_id -> 레코드   zones      : zone_id -> {"zone", "rule"}
+    system        : system.status 필드    alerts     : 알림 순번 -> 알림 (이벤트 토픽)
+- 병합(coalescing): 구독자마다 max_rate_hz 이상으로는 보내지 않는다. 그 사이 들어온 델타는
+  토픽별로 dict.update 로 합쳐 마지막 값만 남는다 (같은 표적이 10번 움직이면 1건).
+  이벤트 토픽(alerts)은 키가 모두 달라 합쳐지지 않으므로 대기 건수를 max_pending 으로 제한하고
+  넘친 만큼 오래된 것부터 버린 뒤 'dropped' 로 알린다.
+- 전송: 표준 notifications/resources/updated (uri = notify://<topic>), 내용은 params._meta:
+    {"topic", "seq", "delta", "merged", "dropped", "ts"}
+  seq 는 구독자별/토픽별 1씩 증가. merged 는 이 알림에 합쳐진 publish 횟수.
+- 스레드: publish 는 어느 스레드에서 불러도 된다 (이벤트 루프로 넘겨서 처리).
+  구독자가 없는 토픽은 wants() 가 False 라서 델타를 만들지 않는다.
+
+설정: NOTIFY_RATE_HZ (기본 구독 속도, 5), NOTIFY_MAX_RATE_HZ (상한, 50),
+      NOTIFY_MAX_PENDING (이벤트 토픽 대기 상한, 1000), NOTIFY_SNAPSHOT_MAX (구독 시 초기 상태 항목 상한, 1000)
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import os
+import time
+from collections import defaultdict
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Union
+
+import mcp.types as mt
+
+logger = logging.getLogger("notify")
+
+TOPICS = ("ptz", "detections", "recording", "targets", "zones", "alerts", "system")
+EVENT_TOPICS = frozenset({"alerts"})
+
+
+class Subscriber:
+    """MCP 세션 1개의 구독 상태: 토픽, 전송 간격, 토픽별 대기 델타."""
+
+    def __init__(self, session, topics: Iterable[str], rate_hz: float):
+        self.session = session
+        self.topics = set(topics)
+        self.min_interval = 1.0 / rate_hz
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.merged: Dict[str, int] = defaultdict(int)
+        self.dropped: Dict[str, int] = defaultdict(int)
+        self.seq: Dict[str, int] = defaultdict(int)
+        self.last_sent = 0.0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.sending = False
+        # 통계
+        self.published = 0
+        self.notifications = 0
+
+    @property
+    def rate_hz(self) -> float:
+        return 1.0 / self.min_interval
+
+    def add(self, topic: str, delta: Mapping[str, Any], max_pending: int) -> None:
+        cur = self.pending.setdefault(topic, {})
+        cur.update(delta)
+        self.merged[topic] += 1
+        self.published += 1
+        if topic in EVENT_TOPICS and len(cur) > max_pending:
+            for k in list(cur)[: len(cur) - max_pending]:
+                del cur[k]
+                self.dropped[topic] += 1
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "topics": sorted(self.topics),
+            "max_rate_hz": round(self.rate_hz, 3),
+            "published": self.published,
+            "notifications": self.notifications,
+            "seq": dict(self.seq),
+        }
+
+
+class NotifyHub:
+
+    def __init__(self, rate_hz: float = 5.0, max_rate_hz: float = 50.0, max_pending: int = 1000,
+                 snapshot_max: int = 1000):
+        self.rate_hz = rate_hz
+        self.max_rate_hz = max_rate_hz
+        self.max_pending = max_pending
+        self.snapshot_max = snapshot_max
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subs: Dict[int, Subscriber] = {}
+        self._by_topic: Dict[str, set] = {t: set() for t in TOPICS}
+        self._sources: Dict[str, Union[str, Callable[[], Mapping[str, Any]]]] = {}
+        self._hooked: set = set()  # 종료 훅을 건 세션 (id)
+        self.dropped_subscribers = 0
+        self.closed_subscribers = 0
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "NotifyHub":
+        return cls(
+            rate_hz=float(env.get("NOTIFY_RATE_HZ", "5")),
+            max_rate_hz=float(env.get("NOTIFY_MAX_RATE_HZ", "50")),
+            max_pending=int(env.get("NOTIFY_MAX_PENDING", "1000")),
+            snapshot_max=int(env.get("NOTIFY_SNAPSHOT_MAX", "1000")),
+        )
+
+    # ---- 상태 소유 모듈 쪽 ----
+    def source(self, topic: str, fn: Union[str, Callable[[], Mapping[str, Any]]]) -> None:
+        """
+        구독 시 돌려줄 토픽 전체 상태 (델타와 같은 {key: value} 형태, len/items 만 쓴다).
+        fn 이 모듈 이름이면 첫 구독 때 import 한다. 이미 함수가 등록된 토픽은 모듈 이름으로 덮지 않는다.
+        """
+        if isinstance(fn, str):
+            self._sources.setdefault(topic, fn)
+        else:
+            self._sources[topic] = fn
+
+    def wants(self, topic: str) -> bool:
+        return bool(self._by_topic.get(topic))
+
+    def publish(self, topic: str, delta: Mapping[str, Any]) -> None:
+        """변경분 게시. 아무 스레드에서나 호출 가능. 구독자가 없으면 버린다."""
+        if not delta or not self._by_topic.get(topic):
+            return
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fanout(topic, delta)
+        else:
+            loop.call_soon_threadsafe(self._fanout, topic, dict(delta))
+
+    # ---- 구독 (이벤트 루프에서 호출) ----
+    def subscribe(self, session, topics: Iterable[str], rate_hz: Optional[float] = None) -> Subscriber:
+        self.loop = asyncio.get_running_loop()
+        self._sweep()
+        topics = list(topics)
+        for t in topics:
+            self._load_source(t)
+        rate = min(rate_hz or self.rate_hz, self.max_rate_hz)
+        key = id(session)
+        sub = self._subs.get(key)
+        if sub is None or sub.session is not session:
+            sub = self._subs[key] = Subscriber(session, (), rate)
+            self._hook_close(session)
+        sub.min_interval = 1.0 / rate
+        for t in topics:
+            sub.topics.add(t)
+            self._by_topic[t].add(key)
+        return sub
+
+    def unsubscribe(self, session, topics: Optional[Iterable[str]] = None) -> Optional[Subscriber]:
+        key = id(session)
+        sub = self._subs.get(key)
+        if sub is None or sub.session is not session:
+            return None
+        for t in list(sub.topics if topics is None else topics):
+            sub.topics.discard(t)
+            sub.pending.pop(t, None)
+            self._by_topic[t].discard(key)
+        if not sub.topics:
+            self._drop(key)
+        return sub
+
+    def subscriber(self, session) -> Optional[Subscriber]:
+        sub = self._subs.get(id(session))
+        return sub if sub is not None and sub.session is session else None
+
+    def snapshot(self, topic: str) -> Dict[str, Any]:
+        fn = self._load_source(topic)
+        items = fn() if fn is not None else {}
+        out: Dict[str, Any] = {"count": len(items)}
+        if len(items) > self.snapshot_max:
+            out["truncated"] = True
+        out["items"] = dict(islice(items.items(), self.snapshot_max))
+        return out
+
+    def status(self) -> Dict[str, Any]:
+        self._sweep()
+        return {
+            "subscribers": len(self._subs),
+            "by_topic": {t: len(s) for t, s in self._by_topic.items()},
+            "dropped_subscribers": self.dropped_subscribers,
+            "closed_subscribers": self.closed_subscribers,
+            "default_rate_hz": self.rate_hz,
+            "max_rate_hz": self.max_rate_hz,
+        }
+
+    def _load_source(self, topic: str) -> Optional[Callable[[], Mapping[str, Any]]]:
+        src = self._sources.get(topic)
+        if isinstance(src, str):
+            importlib.import_module(src)  # import 중에 모듈이 source(topic, fn) 으로 바꿔 등록한다
+            if self._sources.get(topic) is src:
+                del self._sources[topic]  # publish 훅만 거는 모듈 (alerts 등): 초기 상태 없음
+            src = self._sources.get(topic)
+        return src
+
+    # ---- 내부: 세션 종료 ----
+    def _hook_close(self, session) -> None:
+        # mcp BaseSession 의 비공개 속성 _exit_stack 에 의존한다: 세션 종료(__aexit__) 때 닫히는
+        # AsyncExitStack (requirements.txt 의 mcp 1.13 부터 1.30 까지 확인). 조용한 토픽만 구독한 세션은
+        # 보낼 일이 없어 전송 실패로는 정리되지 않으므로 여기서 정리한다.
+        # 속성이 없으면(mcp 내부 변경) _sweep 이 subscribe/status 때 닫힌 세션을 정리한다.
+        key = id(session)
+        if key in self._hooked:
+            return
+        stack = getattr(session, "_exit_stack", None)
+        if stack is None:
+            logger.warning("session %s has no _exit_stack; closed subscribers are swept on subscribe/status",
+                           type(session).__name__)
+            return
+        self._hooked.add(key)
+        stack.callback(self._session_closed, session)
+
+    @staticmethod
+    def _session_gone(session) -> bool:
+        # 세션 수신 루프가 끝나면 쓰기 스트림(anyio MemoryObjectSendStream)이 닫힌다
+        return bool(getattr(getattr(session, "_write_stream", None), "_closed", False))
+
+    def _sweep(self) -> None:
+        """종료 훅이 불리지 않은 닫힌 세션의 구독을 정리 (훅을 걸 수 없는 세션의 대비책)."""
+        for key, sub in list(self._subs.items()):
+            if self._session_gone(sub.session):
+                self._hooked.discard(key)
+                self.closed_subscribers += 1
+                self._drop(key)
+
+    def _session_closed(self, session) -> None:
+        key = id(session)
+        self._hooked.discard(key)
+        sub = self._subs.get(key)
+        if sub is not None and sub.session is session:
+            self.closed_subscribers += 1
+            self._drop(key)
+
+    # ---- 내부: 병합 + 속도 제한 ----
+    def _drop(self, key: int) -> None:
+        sub = self._subs.pop(key, None)
+        if sub is None:
+            return
+        for t in sub.topics:
+            self._by_topic[t].discard(key)
+        if sub.timer is not None:
+            sub.timer.cancel()
+
+    def _fanout(self, topic: str, delta: Mapping[str, Any]) -> None:
+        for key in list(self._by_topic.get(topic, ())):
+            sub = self._subs.get(key)
+            if sub is None:
+                continue
+            sub.add(topic, delta, self.max_pending)
+            self._schedule(sub)
+
+    def _schedule(self, sub: Subscriber) -> None:
+        if sub.timer is not None or sub.sending or self.loop is None:
+            return
+        delay = max(0.0, sub.last_sent + sub.min_interval - time.monotonic())
+        sub.timer = self.loop.call_later(delay, self._flush, sub)
+
+    def _flush(self, sub: Subscriber) -> None:
+        sub.timer = None
+        if not sub.pending or self._subs.get(id(sub.session)) is not sub:
+            return
+        batch, sub.pending = sub.pending, {}
+        merged = {t: sub.merged.pop(t, 0) for t in batch}
+        dropped = {t: sub.dropped.pop(t, 0) for t in batch}
+        sub.last_sent = time.monotonic()
+        sub.sending = True
+        self.loop.create_task(self._send(sub, batch, merged, dropped))
+
+    async def _send(self, sub: Subscriber, batch: dict, merged: dict, dropped: dict) -> None:
+        try:
+            for topic, delta in batch.items():
+                sub.seq[topic] += 1
+                meta = {"topic": topic, "seq": sub.seq[topic], "delta": delta, "merged": merged[topic], "ts": time.time()}
+                if dropped[topic]:
+                    meta["dropped"] = dropped[topic]
+                note = mt.ResourceUpdatedNotification(
+                    method="notifications/resources/updated",
+                    params=mt.ResourceUpdatedNotificationParams(uri=f"notify://{topic}", _meta=meta),
+                )
+                await sub.session.send_notification(mt.ServerNotification(note))
+                sub.notifications += 1
+        except Exception as e:  # 세션 종료/전송 실패: 구독 정리
+            logger.info("dropping subscriber (%s: %s)", type(e).__name__, e)
+            self.dropped_subscribers += 1
+            self._drop(id(sub.session))
+            return
+        finally:
+            sub.sending = False
+        if sub.pending:
+            self._schedule(sub)
+
+
+HUB = NotifyHub.from_env(os.environ)
@@ -0,0 +1,57 @@
+# notify_tools.py (State Change Subscriptions)
+from typing import Annotated, List, Literal, Optional
+
+from fastmcp.server.dependencies import get_context
+from pydantic import Field
+from server_main import app
+
+import notify
+from system_monitor import SAMPLER
+
+# 토픽을 게시하는 모듈: publish 훅과 초기 상태 소스를 등록하는 모듈을 그 토픽의 첫 구독 때 import 한다
+# (이 모듈을 불러오는 것만으로 eots/target 툴 모듈까지 로드하지 않도록)
+for _topic, _module in (
+    ("ptz", "eots_tools_core"), ("detections", "eots_tools_core"), ("recording", "eots_tools_core"),
+    ("targets", "target_tools"), ("zones", "zone_tools"), ("alerts", "alert_tools"),
+):
+    notify.HUB.source(_topic, _module)
+
+Topic = Literal["ptz", "detections", "recording", "targets", "zones", "alerts", "system"]
+
+
+@app.tool(
+    name="notify.subscribe",
+    description=(
+        "Subscribe this session to server-pushed state changes instead of polling. "
+        "Topics: ptz, detections, recording, targets, zones, alerts, system. Changes arrive as "
+        "notifications/resources/updated with uri notify://<topic>; params._meta carries "
+        "{topic, seq, delta, merged}. delta maps key -> new value (null = removed). "
+        "Bursts are merged so at most max_rate_hz notifications are sent. "
+        "Returns the current state of each topic (snapshot=true) to apply deltas onto."
+    ),
+)
+def notify_subscribe(
+    topics: List[Topic],
+    max_rate_hz: Annotated[Optional[float], Field(gt=0)] = None,
+    snapshot: bool = True,
+):
+    session = get_context().session
+    if "system" in topics and not SAMPLER.started:
+        SAMPLER.start()
+    sub = notify.HUB.subscribe(session, topics, max_rate_hz)
+    out = {"ok": True, "subscription": sub.info()}
+    if snapshot:
+        out["snapshot"] = {t: notify.HUB.snapshot(t) for t in topics}
+    return out
+
+
+@app.tool(name="notify.unsubscribe", description="Stop pushed notifications for the given topics (all if omitted)")
+def notify_unsubscribe(topics: Optional[List[Topic]] = None):
+    sub = notify.HUB.unsubscribe(get_context().session, topics)
+    return {"ok": True, "subscription": None if sub is None or not sub.topics else sub.info()}
+
+
+@app.tool(name="notify.status", description="This session's subscription and server-wide subscriber counts")
+def notify_status():
+    sub = notify.HUB.subscriber(get_context().session)
+    return {"ok": True, "subscription": None if sub is None else sub.info(), "hub": notify.HUB.status()}
@@ -0,0 +1,363 @@
+# persist.py
+"""
+상태 영속화: 스냅샷 + 추가 전용(append-only) 바이너리 저널
+
+재시작하면 _STATE / _TARGETS / _ZONES / _RULES 가 비어 버리고, 툴 호출을 다시 흘려 복구하면
+수 분이 걸린다. 여기서는 상태 변경을 저널에 남기고 주기적으로 스냅샷을 떠서, 기동 시
+최신 스냅샷 + 그 이후 저널 꼬리만 재생한다.
+
+- 도메인: 상태 소유 모듈이 Domain(name, dump, load, replay)을 register 한다.
+  eots_tools_core(state), zone_tools(zones), target_tools(targets). register 하는 순간 그 도메인만
+  복구되고 이후 변경이 저널에 기록된다 (모듈 import 중에 복구하므로 첫 툴 호출은 복구가 끝날 때까지 기다린다).
+- 저널 레코드: [len u32][crc32 u32][kind u8][payload]. 모든 레코드는 "값을 이 값으로 설정" 형태라
+  두 번 재생해도 결과가 같다 (멱등). 꼬리의 잘린/깨진 레코드에서 재생을 멈춘다.
+- 그룹 커밋: append 는 메모리 버퍼에 붙이고 바로 반환. writer 스레드가 commit_ms 동안 모인 레코드를
+  write 1회 + fsync 1회로 내린다. 전원 断 시 잃을 수 있는 구간은 최대 commit_ms.
+- 세그먼트: journal_<seg>.bin. 스냅샷은 먼저 새 세그먼트로 넘긴(rotate) 다음 상태를 복사한다.
+  변경은 항상 "상태 반영 -> append" 순서라서, 복사에 빠진 변경은 모두 새 세그먼트에 있다.
+  (복사에 이미 들어간 변경이 새 세그먼트에 또 있을 수 있지만 멱등이라 상관없다)
+- 스냅샷: snapshot_<seg>.npz (배열 + 도메인별 JSON 메타). 임시 파일 -> fsync -> rename.
+  성공하면 그 이전 스냅샷과 seg 미만 저널 세그먼트를 지운다. 모든 도메인(DOMAINS)이 등록된 뒤에만 뜬다.
+
+설정 (PERSIST_DIR 미설정 시 영속화 끔):
+    PERSIST_DIR, PERSIST_COMMIT_MS (기본 5), PERSIST_SNAPSHOT_S (기본 300),
+    PERSIST_SNAPSHOT_MB (저널이 이만큼 쌓이면 주기와 무관하게 스냅샷, 기본 64)
+측정: python bench_persist.py
+"""
+from __future__ import annotations
+
+import glob
+import io
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("persist")
+
+# 레코드 종류
+STATE_SET = 1      # JSON {key: value}
+TARGET_UPSERT = 2  # 바이너리 (id, cls, kinematics)
+TARGET_ASSIGN = 3  # 바이너리 (rows, 컬럼별 값, NaN = 변경 없음)
+ZONE_DEFINE = 4    # JSON ZoneDefineParams
+ZONE_RULE = 5      # JSON {zone_id, rule, value}
+
+# 스냅샷을 뜨려면 모두 등록되어 있어야 하는 도메인
+DOMAINS = ("state", "zones", "targets")
+
+_HDR = struct.Struct("<IIB")
+_SEG_RE = re.compile(r"journal_(\d+)\.bin$")
+_SNAP_RE = re.compile(r"snapshot_(\d+)\.npz$")
+
+
+class Domain(NamedTuple):
+    name: str
+    dump: Callable[[], Tuple[Dict[str, np.ndarray], Dict[str, Any]]]  # (배열, JSON 메타) 복사본
+    load: Callable[[Dict[str, np.ndarray], Dict[str, Any]], None]
+    replay: Callable[[int, bytes], None]  # 이 도메인 레코드가 아니면 무시
+    finish: Optional[Callable[[], None]] = None  # 복구 후 파생 인덱스 재구성
+
+
+def _fsync_dir(path: str) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Windows 등: 디렉터리 fsync 미지원
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# =========================
+# 저널
+# =========================
+class Journal:
+
+    def __init__(self, directory: str, segment: int, commit_ms: float = 5.0, fsync: bool = True):
+        self.dir = directory
+        self.segment = segment
+        self.commit_s = commit_ms / 1000.0
+        self.fsync = fsync
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[int, bytearray]] = []  # (segment, frames)
+        self._appended = 0
+        self._written = 0
+        self._file = None
+        self._file_seg = -1
+        self._stop = False
+        # 통계
+        self.records = 0
+        self.payload_bytes = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.segment_bytes = 0
+        self._thread = threading.Thread(target=self._run, name="persist-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, kind: int, payload: bytes) -> None:
+        crc = zlib.crc32(payload, kind) & 0xFFFFFFFF
+        frame = _HDR.pack(len(payload), crc, kind) + payload
+        with self._cond:
+            if not self._pending or self._pending[-1][0] != self.segment:
+                self._pending.append((self.segment, bytearray()))
+            self._pending[-1][1].extend(frame)
+            self._appended += 1
+            self.records += 1
+            self.payload_bytes += len(payload)
+            self.segment_bytes += len(frame)
+            self._cond.notify()
+
+    def rotate(self) -> int:
+        """이후 레코드를 새 세그먼트에 쓴다. 새 세그먼트 번호 반환."""
+        with self._cond:
+            self.segment += 1
+            self.segment_bytes = 0
+            return self.segment
+
+    def flush(self, timeout_s: float = 10.0) -> bool:
+        """지금까지 append 한 레코드가 디스크에 내려갈 때까지 대기."""
+        with self._cond:
+            target = self._appended
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target, timeout_s)
+
+    def close(self) -> None:
+        self.flush()
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+        if self._file is not None:
+            self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._stop)
+                if self._stop and not self._pending:
+                    return
+            time.sleep(self.commit_s)  # 그룹 커밋 창: 그동안 들어온 레코드를 함께 내린다
+            with self._cond:
+                batch, self._pending = self._pending, []
+                upto = self._appended
+            try:
+                self._write(batch)
+            except OSError:
+                logger.exception("journal write failed")
+            with self._cond:
+                self._written = upto
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Tuple[int, bytearray]]) -> None:
+        for seg, data in batch:
+            if seg != self._file_seg:
+                self._sync()
+                if self._file is not None:
+                    self._file.close()
+                self._file = open(os.path.join(self.dir, f"journal_{seg:08d}.bin"), "ab")
+                self._file_seg = seg
+            self._file.write(data)
+            self.bytes_written += len(data)
+        self._sync()
+
+    def _sync(self) -> None:
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+
+
+def read_frames(path: str) -> Iterator[Tuple[int, bytes]]:
+    """세그먼트 1개의 (kind, payload). 잘리거나 CRC 가 맞지 않는 레코드에서 멈춘다."""
+    with open(path, "rb") as f:
+        buf = f.read()
+    pos, n = 0, len(buf)
+    while pos + _HDR.size <= n:
+        length, crc, kind = _HDR.unpack_from(buf, pos)
+        end = pos + _HDR.size + length
+        if end > n:
+            logger.warning("%s: truncated record at %d (ignored)", path, pos)
+            return
+        payload = buf[pos + _HDR.size:end]
+        if zlib.crc32(payload, kind) & 0xFFFFFFFF != crc:
+            logger.warning("%s: bad checksum at %d (replay stops here)", path, pos)
+            return
+        yield kind, payload
+        pos = end
+
+
+# =========================
+# 스냅샷 + 복구
+# =========================
+class Persistence:
+
+    def __init__(self, directory: str, *, commit_ms: float = 5.0, snapshot_s: float = 300.0,
+                 snapshot_mb: float = 64.0, fsync: bool = True):
+        os.makedirs(directory, exist_ok=True)
+        self.dir = directory
+        self.snapshot_s = snapshot_s
+        self.snapshot_bytes = int(snapshot_mb * 2**20)
+        self.domains: Dict[str, Domain] = {}
+        self.snap_seg, self.snap_path = self._latest_snapshot()
+        # 복구용으로 읽어 둔 스냅샷 / 저널 레코드 (모든 도메인 복구 후 해제)
+        self._snap: Optional[Dict[str, np.ndarray]] = None
+        self._frames: Optional[List[Tuple[int, bytes]]] = None
+        segs = self._segments()
+        # 이번 실행의 레코드는 기존 세그먼트와 섞이지 않도록 새 세그먼트에서 시작
+        self.journal = Journal(directory, max([self.snap_seg, *segs], default=0) + 1, commit_ms, fsync)
+        self._replay_segs = [s for s in segs if s >= self.snap_seg]
+        self._lock = threading.Lock()  # register / snapshot 직렬화
+        self.snapshots = 0
+        self.snapshot_bytes_written = 0
+        self.last_snapshot: Optional[Dict[str, Any]] = None
+        self.restore_stats: Dict[str, Any] = {}
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="persist-snapshot", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> Optional["Persistence"]:
+        directory = env.get("PERSIST_DIR")
+        if not directory:
+            return None
+        return cls(
+            directory,
+            commit_ms=float(env.get("PERSIST_COMMIT_MS", "5")),
+            snapshot_s=float(env.get("PERSIST_SNAPSHOT_S", "300")),
+            snapshot_mb=float(env.get("PERSIST_SNAPSHOT_MB", "64")),
+        )
+
+    def _segments(self) -> List[int]:
+        return sorted(int(m.group(1)) for p in os.listdir(self.dir) if (m := _SEG_RE.search(p)))
+
+    def _latest_snapshot(self) -> Tuple[int, Optional[str]]:
+        snaps = sorted((int(m.group(1)), p) for p in glob.glob(os.path.join(self.dir, "snapshot_*.npz"))
+                       if (m := _SNAP_RE.search(p)))
+        return snaps[-1] if snaps else (0, None)
+
+    # ---- 도메인 등록 = 복구 + 기록 시작 ----
+    def register(self, domain: Domain) -> None:
+        t0 = time.perf_counter()
+        with self._lock:
+            if self.snap_path is not None:
+                if self._snap is None:
+                    with np.load(self.snap_path, allow_pickle=False) as z:
+                        self._snap = {k: z[k] for k in z.files}
+                prefix = domain.name + "/"
+                arrays = {k[len(prefix):]: v for k, v in self._snap.items() if k.startswith(prefix)}
+                meta_raw = arrays.pop("__meta__", None)
+                if meta_raw is not None:
+                    domain.load(arrays, json.loads(meta_raw.tobytes().decode("utf-8")))
+            if self._frames is None:
+                self._frames = [f for seg in self._replay_segs
+                                for f in read_frames(os.path.join(self.dir, f"journal_{seg:08d}.bin"))]
+            for kind, payload in self._frames:
+                domain.replay(kind, payload)
+            replayed = len(self._frames)
+            if domain.finish is not None:
+                domain.finish()
+            self.domains[domain.name] = domain
+            if all(d in self.domains for d in DOMAINS):
+                self._snap = self._frames = None
+        dt = time.perf_counter() - t0
+        self.restore_stats[domain.name] = {"seconds": round(dt, 4), "records_scanned": replayed}
+        logger.info("restored %s in %.3fs (%d journal records scanned)", domain.name, dt, replayed)
+
+    def log(self, kind: int, payload: bytes) -> None:
+        self.journal.append(kind, payload)
+        if self.journal.segment_bytes >= self.snapshot_bytes:
+            self._wake.set()
+
+    def log_json(self, kind: int, obj: Any) -> None:
+        self.log(kind, json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+    # ---- 스냅샷 ----
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.snapshot_s)
+            self._wake.clear()
+            if self.journal.segment_bytes == 0:
+                continue  # 마지막 스냅샷 이후 변경 없음
+            try:
+                self.snapshot()
+            except Exception:
+                logger.exception("snapshot failed")
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """스냅샷 1회 (모든 도메인이 등록되기 전이면 건너뜀)."""
+        with self._lock:
+            if not all(d in self.domains for d in DOMAINS):
+                return None
+            t0 = time.perf_counter()
+            seg = self.journal.rotate()  # 먼저 넘기고 복사 (모듈 설명 참고)
+            arrays: Dict[str, np.ndarray] = {}
+            for name, dom in self.domains.items():
+                arr, meta = dom.dump()
+                for k, v in arr.items():
+                    arrays[f"{name}/{k}"] = v
+                arrays[f"{name}/__meta__"] = np.frombuffer(
+                    json.dumps(meta, ensure_ascii=False, default=str).encode("utf-8"), dtype=np.uint8)
+            t_capture = time.perf_counter() - t0
+
+            path = os.path.join(self.dir, f"snapshot_{seg:08d}.npz")
+            tmp = path + ".tmp"
+            buf = io.BytesIO()
+            np.savez(buf, **arrays)
+            with open(tmp, "wb") as f:
+                f.write(buf.getbuffer())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+            _fsync_dir(self.dir)
+            size = buf.getbuffer().nbytes
+
+            # 새 스냅샷이 내려간 뒤에만 이전 것들을 지운다
+            self.journal.flush()
+            for p in glob.glob(os.path.join(self.dir, "snapshot_*.npz")):
+                m = _SNAP_RE.search(p)
+                if m and int(m.group(1)) < seg:
+                    os.remove(p)
+            for s in self._segments():
+                if s < seg:
+                    os.remove(os.path.join(self.dir, f"journal_{s:08d}.bin"))
+            self.snap_seg, self.snap_path = seg, path
+            self._replay_segs = [s for s in self._replay_segs if s >= seg]
+            self.snapshots += 1
+            self.snapshot_bytes_written += size
+            self.last_snapshot = {
+                "segment": seg, "bytes": size, "capture_s": round(t_capture, 4),
+                "total_s": round(time.perf_counter() - t0, 4), "at": time.time(),
+            }
+            return self.last_snapshot
+
+    def status(self) -> Dict[str, Any]:
+        j = self.journal
+        return {
+            "dir": self.dir,
+            "domains": sorted(self.domains),
+            "segment": j.segment,
+            "records": j.records,
+            "payload_bytes": j.payload_bytes,
+            "journal_bytes_written": j.bytes_written,
+            "fsyncs": j.fsyncs,
+            "snapshots": self.snapshots,
+            "snapshot_bytes_written": self.snapshot_bytes_written,
+            "last_snapshot": self.last_snapshot,
+            "restore": self.restore_stats,
+        }
+
+    def close(self) -> None:
+        self.journal.close()
+
+
+PERSIST: Optional[Persistence] = Persistence.from_env(os.environ)
@@ -10,6 +10,7 @@ from __future__ import annotations
 import os
 import sys
 import logging
+import threading
 from typing import Any
 
 # FastMCP 2.12.0 기준
@@ -26,8 +27,8 @@ def create_app() -> FastMCP:
     name = os.getenv("MCP_APP_NAME", "coastal-ptz-controller")
     version = os.getenv("MCP_APP_VERSION", "1.0.0")
     try:
-        # 신규 시그니처
-        return FastMCP(name=name, version=version)
+        # 신규 시그니처. 지연 로딩 자리표시자(tool_registry.LazyTool)를 실제 툴이 덮어쓰도록 replace
+        return FastMCP(name=name, version=version, on_duplicate_tools="replace")
     except TypeError:
         # 구버전 호환
         return FastMCP(app_name=name, version=version)
@@ -52,17 +53,17 @@ logger = logging.getLogger("server_main")
 
 
 # -----------------------------------------------------------------------------
-# 툴 모듈 import
-# - eots_tools_core 만 사용
+# 툴 모듈 등록
+# - eots_tools_core + target_tools + zone_tools + alert_tools + system_tools
+# - 스키마 매니페스트가 최신이면 자리표시자만 등록하고 모듈은 첫 호출 때 import (tool_registry 참고)
 # -----------------------------------------------------------------------------
-import eots_tools_core  # noqa: F401
+import tool_registry  # noqa: E402
 
-# 예전 구조 (여러 모듈 사용)는 전부 주석 처리
-# import alert_tools  # noqa: F401
+TOOL_MODULES = ["eots_tools_core", "target_tools", "zone_tools", "alert_tools", "system_tools", "notify_tools"]
+TOOL_LOADING = tool_registry.register(app, TOOL_MODULES, lazy=os.getenv("MCP_LAZY_TOOLS", "1") != "0")
+
+# 예전 구조 (여러 모듈 사용)는 주석 처리
 # import eots_tools   # noqa: F401
-# import target_tools # noqa: F401
-# import system_tools # noqa: F401
-# import zone_tools   # noqa: F401
 
 # register(app) 패턴도 현재는 사용하지 않음
 # for _mod in (alert_tools, eots_tools, target_tools, system_tools, zone_tools):
@@ -74,6 +75,46 @@ import eots_tools_core  # noqa: F401
 #             logger.warning("register(app) 호출 중 경고: %s: %s", _mod.__name__, ex)
 
 
+# -----------------------------------------------------------------------------
+# 툴 호출 계측: 모든 툴의 호출 수/오류 수/지연 히스토그램 (metrics.py)
+# - /metrics : Prometheus text exposition (/mcp 와 같은 HTTP 서버)
+# - system.metrics 툴 : 같은 값을 요약(JSON)으로 반환
+# -----------------------------------------------------------------------------
+from starlette.responses import PlainTextResponse, Response  # noqa: E402
+
+from metrics import METRICS, MetricsMiddleware  # noqa: E402
+from system_monitor import SAMPLER  # noqa: E402
+from tool_catalog import CATALOG, CatalogMiddleware  # noqa: E402
+
+app.add_middleware(MetricsMiddleware(METRICS))
+
+# -----------------------------------------------------------------------------
+# 툴 카탈로그 캐시 (tool_catalog.py)
+# - tools/list 는 툴 등록이 바뀔 때만 새로 만든다
+# - /catalog?lang=en|ko&compact=1 : 언어별 직렬화 목록, ETag / If-None-Match -> 304
+# -----------------------------------------------------------------------------
+CATALOG.attach(app)
+app.add_middleware(CatalogMiddleware(CATALOG))
+
+
+@app.custom_route("/catalog", methods=["GET"])
+async def catalog_route(request):
+    q = request.query_params
+    try:
+        entry = await CATALOG.get(q.get("lang", "en"), q.get("compact", "0") in ("1", "true"))
+    except ValueError as e:
+        return PlainTextResponse(str(e), status_code=400)
+    headers = {"ETag": entry.etag, "X-Catalog-Version": str(entry.version)}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+@app.custom_route("/metrics", methods=["GET"])
+async def metrics_route(request):
+    return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # -----------------------------------------------------------------------------
 # (옵션) 최소 헬스체크 툴 하나 등록해 두면 점검에 편리
 # -----------------------------------------------------------------------------
@@ -85,6 +126,15 @@ def health() -> dict[str, Any]:
 # -----------------------------------------------------------------------------
 # 서버 실행
 # -----------------------------------------------------------------------------
+def _preload() -> None:
+    import eots_tools_core
+    eots_tools_core._RECORDER.start_pipeline()
+    # 영속화가 켜져 있으면 상태 모듈을 모두 불러 복구를 끝낸다 (import 중 복구, 툴 호출은 import 락에서 대기)
+    # persist 는 numpy 를 끌고 오므로 여기서도 import 하지 않고 PERSIST_DIR 만 본다 (Persistence.from_env 와 같은 조건)
+    if os.getenv("PERSIST_DIR"):
+        import target_tools  # noqa: F401  (zone_tools 포함)
+
+
 def main() -> None:
     host = os.getenv("MCP_HOST", "0.0.0.0")
     port = int(os.getenv("MCP_PORT", "8000"))
@@ -92,6 +142,12 @@ def main() -> None:
 
     logger.info("Starting FastMCP (HTTP Streamable) on %s:%d%s", host, port, path)
 
+    # 사전 이벤트 녹화 버퍼는 서버 기동 시점부터 채워 둔다.
+    # 지연 로딩이면 eots_tools_core import(와 영속 상태 복구)가 HTTP 기동을 막지 않도록 백그라운드 스레드에서 한다.
+    threading.Thread(target=_preload, name="preload-eots", daemon=True).start()
+    # system.status 가 응답할 상태 샘플을 백그라운드에서 주기적으로 갱신
+    SAMPLER.start()
+
     # FastMCP 2.x 의 HTTP 실행 시그니처가 버전에 따라 path/route 명이 다를 수 있어 방어적으로 처리
     try:
         # 선호: transport 인자를 받는 런타임
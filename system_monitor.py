@@ -0,0 +1,237 @@
+# system_monitor.py
+"""
+시스템 상태 샘플러: system.status 가 요청 경로에서 I/O 없이 바로 응답하도록 미리 모아 둔다.
+
+- 샘플러 스레드가 interval_s 마다 /proc 를 읽어 한 장의 상태 dict 를 만들고 참조를 통째로 교체한다.
+  툴 핸들러는 마지막 dict 만 읽으므로 여러 콘솔이 자주 폴링해도 부하가 늘지 않는다.
+  * CPU: /proc/stat 첫 줄(시스템 전체), /proc/self/stat utime+stime(서버 프로세스). 직전 샘플과의 차이로 %.
+  * 메모리: /proc/meminfo (MemTotal - MemAvailable), /proc/self/statm RSS
+  * 업타임: /proc/uptime (시스템), ToolMetrics.started_at 기준 (서버)
+- 이벤트 루프 지연: 샘플마다 loop.call_soon_threadsafe 로 빈 콜백을 넣고 실행되기까지 걸린 시간을 잰다.
+  루프는 MetricsMiddleware 가 툴 호출 때 ToolMetrics.loop 에 기록해 둔다 (첫 호출 전에는 None).
+- 서버 카운터: 실행 중인 툴 호출 수(ToolMetrics.in_flight) + add_gauge 로 등록한 큐 깊이 함수들.
+- 샘플마다 바뀐 필드만 notify 'system' 토픽으로 푸시한다 (구독자가 없으면 아무것도 하지 않음).
+
+/proc 가 없는 환경(Windows 등)에서는 해당 값이 None 이다.
+주기: SYSTEM_STATUS_INTERVAL_S (기본 1.0초)
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import notify
+from metrics import METRICS, ToolMetrics
+
+logger = logging.getLogger("system_monitor")
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+# =========================
+# /proc 읽기 (샘플러 스레드에서만 호출)
+# =========================
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def read_cpu_ticks() -> Optional[Tuple[int, int]]:
+    """/proc/stat 의 (busy, total) jiffies."""
+    text = _read("/proc/stat")
+    if not text:
+        return None
+    vals = [int(v) for v in text.split("\n", 1)[0].split()[1:]]
+    idle = vals[3] + (vals[4] if len(vals) > 4 else 0)  # idle + iowait
+    total = sum(vals[:8])  # guest 는 user 에 이미 포함
+    return total - idle, total
+
+
+def read_proc_cpu_s() -> Optional[float]:
+    """이 프로세스의 누적 CPU 시간 (utime + stime, 초)."""
+    text = _read("/proc/self/stat")
+    if not text:
+        return None
+    fields = text.rsplit(")", 1)[1].split()  # comm 에 공백이 있을 수 있으므로 ')' 뒤부터
+    return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+
+
+def read_meminfo() -> Optional[Tuple[int, int]]:
+    """(total, available) 바이트."""
+    text = _read("/proc/meminfo")
+    if not text:
+        return None
+    kb: Dict[str, int] = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("MemTotal", "MemAvailable", "MemFree"):
+            kb[key] = int(rest.split()[0])
+    total = kb.get("MemTotal")
+    if not total:
+        return None
+    return total * 1024, kb.get("MemAvailable", kb.get("MemFree", 0)) * 1024
+
+
+def read_rss() -> Optional[int]:
+    text = _read("/proc/self/statm")
+    return int(text.split()[1]) * _PAGE if text else None
+
+
+def read_uptime() -> Optional[float]:
+    text = _read("/proc/uptime")
+    return float(text.split()[0]) if text else None
+
+
+def fmt_duration(seconds: Optional[float]) -> Optional[str]:
+    """'1h 12m' 형식 (기존 system.status 응답과 같은 모양)."""
+    if seconds is None:
+        return None
+    m = int(seconds // 60)
+    d, h, m = m // 1440, m // 60 % 24, m % 60
+    return f"{d}d {h}h {m}m" if d else f"{h}h {m}m"
+
+
+def _pct(v: Optional[float]) -> Optional[str]:
+    return None if v is None else f"{v:.0f}%"
+
+
+# =========================
+# 샘플러
+# =========================
+class StatusSampler:
+
+    def __init__(self, metrics: ToolMetrics = METRICS, interval_s: float = 1.0):
+        self.metrics = metrics
+        self.interval_s = interval_s
+        self._gauges: Dict[str, Callable[[], Optional[int]]] = {}
+        self._lag_s: Optional[float] = None
+        self._probe_t0: Optional[float] = None  # 아직 실행되지 않은 프로브를 넣은 시각
+        self._probe_on: Any = None  # 그 프로브를 넣은 루프
+        self._prev_cpu: Optional[Tuple[int, int]] = None
+        self._prev_proc: Optional[Tuple[float, float]] = None  # (monotonic, cpu_s)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.samples = 0
+        self.latest: Mapping[str, Any] = {"sampled_at": None}
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str], metrics: ToolMetrics = METRICS) -> "StatusSampler":
+        return cls(metrics, interval_s=float(env.get("SYSTEM_STATUS_INTERVAL_S", "1.0")))
+
+    def add_gauge(self, name: str, fn: Callable[[], Optional[int]]) -> None:
+        """큐 깊이 등 정수 카운터를 샘플에 포함 (샘플러 스레드에서 호출되므로 가볍고 스레드 안전해야 함)."""
+        self._gauges[name] = fn
+
+    # ---- 수명 주기 ----
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.sample()  # 첫 요청부터 값이 있도록 1회는 바로 채운다
+        self._thread = threading.Thread(target=self._run, name="status-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("status sample failed")
+
+    # ---- 이벤트 루프 지연 ----
+    def _loop_lag(self) -> Optional[float]:
+        """직전 프로브의 지연을 돌려주고 다음 프로브를 넣는다. 직전 프로브가 아직 안 돌았으면 그 경과 시간."""
+        loop = self.metrics.loop
+        t0 = self._probe_t0
+        if t0 is not None and self._probe_on is loop:
+            return time.perf_counter() - t0  # 루프가 한 주기 넘게 막혀 있음
+        if loop is None:
+            return None
+        lag = self._lag_s
+
+        def _arrived() -> None:
+            self._lag_s = time.perf_counter() - t
+            self._probe_t0 = None
+
+        self._probe_on = loop
+        t = self._probe_t0 = time.perf_counter()
+        try:
+            loop.call_soon_threadsafe(_arrived)
+        except RuntimeError:  # 루프 종료됨: 다음 툴 호출 때 다시 기록된다
+            self.metrics.loop, self._probe_t0, lag = None, None, None
+        return lag
+
+    # ---- 샘플 1회 ----
+    def sample(self) -> Mapping[str, Any]:
+        now, mono = time.time(), time.monotonic()
+
+        cpu_pct = None
+        ticks = read_cpu_ticks()
+        if ticks is not None and self._prev_cpu is not None:
+            busy, total = ticks[0] - self._prev_cpu[0], ticks[1] - self._prev_cpu[1]
+            cpu_pct = 100.0 * busy / total if total > 0 else 0.0
+        self._prev_cpu = ticks
+
+        proc_pct = None
+        proc_s = read_proc_cpu_s()
+        if proc_s is not None and self._prev_proc is not None and mono > self._prev_proc[0]:
+            proc_pct = 100.0 * (proc_s - self._prev_proc[1]) / (mono - self._prev_proc[0])
+        self._prev_proc = None if proc_s is None else (mono, proc_s)
+
+        mem = read_meminfo()
+        mem_pct = None if mem is None else 100.0 * (mem[0] - mem[1]) / mem[0]
+        rss = read_rss()
+        sys_up = read_uptime()
+        srv_up = now - self.metrics.started_at
+
+        lag = self._loop_lag()
+
+        queues: Dict[str, Optional[int]] = {}
+        for name, fn in self._gauges.items():
+            try:
+                queues[name] = fn()
+            except Exception:
+                queues[name] = None
+
+        self.samples += 1
+        prev = self.latest
+        self.latest = {
+            "cpu": _pct(cpu_pct),
+            "mem": _pct(mem_pct),
+            "uptime": fmt_duration(sys_up),
+            "server_uptime": fmt_duration(srv_up),
+            "sampled_at": now,
+            "interval_s": self.interval_s,
+            "detail": {
+                "cpu_pct": None if cpu_pct is None else round(cpu_pct, 1),
+                "process_cpu_pct": None if proc_pct is None else round(proc_pct, 1),
+                "mem_pct": None if mem_pct is None else round(mem_pct, 1),
+                "mem_total_mb": None if mem is None else round(mem[0] / 2**20, 1),
+                "mem_available_mb": None if mem is None else round(mem[1] / 2**20, 1),
+                "process_rss_mb": None if rss is None else round(rss / 2**20, 1),
+                "uptime_s": sys_up,
+                "server_uptime_s": round(srv_up, 1),
+                "loop_lag_ms": None if lag is None else round(lag * 1000, 3),
+                "in_flight_tools": self.metrics.in_flight,
+                "queues": queues,
+            },
+        }
+        notify.HUB.publish("system", {k: v for k, v in self.latest.items() if prev.get(k) != v})
+        return self.latest
+
+
+SAMPLER = StatusSampler.from_env(os.environ)
+notify.HUB.source("system", lambda: SAMPLER.latest)
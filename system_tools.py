@@ -1,10 +1,64 @@
 # system_tools.py (System Management)
+import sys
+import time
+from typing import Literal, Optional
+
 from server_main import app
 
-@app.tool(name="system.status", description="System/Camera status")
+from metrics import METRICS
+from system_monitor import SAMPLER
+from tool_catalog import CATALOG
+
+
+def _camera() -> str:
+    # 기본 카메라 드라이버는 호출 시점에 플릿에서 읽는다. eots 툴 모듈이 아직 로드되지 않았다면
+    # 드라이버도 시작 전이므로 그 때문에 모듈(NumPy, 녹화 파이프라인 등)을 불러오지 않는다.
+    core = sys.modules.get("eots_tools_core")
+    driver = core._FLEET.default.driver if core is not None else None
+    if driver is None or not driver.started:
+        return "ready"
+    return "ready" if driver.connected else "disconnected"
+
+
+@app.tool(
+    name="system.status",
+    description=(
+        "System/Camera status: CPU, memory, uptime, event-loop lag, in-flight tool calls and queue depths. "
+        "Served from the last background sample (see sampled_at / age_s), so frequent polling is cheap."
+    ),
+)
 def system_status():
-    return {"ok": True, "cpu":"9%","mem":"43%","uptime":"1h 12m","camera":"ready"}
+    if not SAMPLER.started:
+        SAMPLER.start()  # main() 밖에서 띄운 경우(in-memory 클라이언트 등) 첫 호출 때 시작
+    snap = SAMPLER.latest
+    return {"ok": True, **snap, "age_s": round(time.time() - snap["sampled_at"], 3), "camera": _camera()}
 
 @app.tool(name="system.reboot", description="Reboot system/camera")
 def system_reboot():
     return {"ok": True, "message": "rebooting..."}
+
+@app.tool(
+    name="system.metrics",
+    description="Per-tool call counts, error counts and latency (mean and histogram p50/p95/p99 upper bounds, ms)",
+)
+def system_metrics(tool: Optional[str] = None):
+    return {"ok": True, **METRICS.snapshot(tool)}
+
+@app.tool(
+    name="system.tool_catalog",
+    description=(
+        "Cached tool list (tools/list format) in English or Korean. Pass the etag from a previous call as "
+        "if_etag to get unchanged=True instead of the full list. compact=True shortens descriptions to a "
+        "token budget for prompt building."
+    ),
+)
+async def system_tool_catalog(
+    lang: Literal["en", "ko"] = "en",
+    compact: bool = False,
+    if_etag: Optional[str] = None,
+):
+    entry = await CATALOG.get(lang, compact)
+    out = {"ok": True, "version": entry.version, "etag": entry.etag, "tokens": entry.tokens}
+    if if_etag == entry.etag:
+        return {**out, "unchanged": True}
+    return {**out, "unchanged": False, "tools": entry.tools}
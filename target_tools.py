@@ -1,9 +1,35 @@
 # target_tools.py (Target Information Management)
-from typing import Optional
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from math import cos, floor, radians, sqrt
+from typing import Literal, Optional
+
+import numpy as np
 from pydantic import BaseModel, Field
 from server_main import app
 
-_TARGETS = {}
+import alert_tools
+import eots_pointing
+import notify
+import persist
+import zone_tools
+from geofence import GeofenceEvaluator
+
+# Grid bucket size (degrees) for the nearest/within-radius index
+_GRID_CELL_DEG = float(os.getenv("TARGET_GRID_CELL_DEG", "0.05"))
+# Max updates accepted by a single target.update_tracks_batch call
+_BATCH_MAX = int(os.getenv("TARGET_BATCH_MAX", "2000"))
+# Position fixes kept per target (ring buffer; memory is depth x 24 bytes per target)
+_HISTORY_DEPTH = int(os.getenv("TARGET_HISTORY_DEPTH", "16"))
+# Max targets in one pairwise target.cpa call (pairs grow as n^2 / 2)
+_CPA_PAIR_MAX = int(os.getenv("TARGET_CPA_PAIR_MAX", "2000"))
+_KN_TO_KMH = 1.852
+# Max targets listed by one target.predict call, and cached (state version, horizon) results
+_PREDICT_LIMIT_MAX = int(os.getenv("TARGET_PREDICT_LIMIT_MAX", "5000"))
+_PREDICT_CACHE = int(os.getenv("TARGET_PREDICT_CACHE", "16"))
 
 class TargetRegisterParams(BaseModel):
     target_id: str = Field(..., description="Unique target identifier")
@@ -20,39 +46,734 @@ class TargetUpdateParams(BaseModel):
     speed_kn: Optional[float] = None
     heading_deg: Optional[float] = None
 
+class TargetUpdateBatchParams(BaseModel):
+    updates: list[TargetUpdateParams] = Field(..., min_length=1, max_length=_BATCH_MAX)
+
 class TargetQueryNearestParams(BaseModel):
     lat: float
     lon: float
     radius_km: float = Field(5.0, gt=0)
     limit: int = Field(5, ge=1, le=50)
 
+class TargetHistoryParams(BaseModel):
+    target_id: str
+    limit: int = Field(_HISTORY_DEPTH, ge=1, le=_HISTORY_DEPTH)
+
+class TargetPredictParams(BaseModel):
+    t_offset_s: float = Field(..., ge=0, le=86400, description="Prediction horizon in seconds from now")
+    ids: Optional[list[str]] = Field(None, description="Restrict to these targets (default: all)")
+    bbox: Optional[tuple[float, float, float, float]] = Field(
+        None, description="[min_lat, min_lon, max_lat, max_lon]; selects targets by current position"
+    )
+    limit: int = Field(500, ge=1, le=_PREDICT_LIMIT_MAX)
+
+class TargetCpaParams(BaseModel):
+    mode: Literal["site", "pairwise"] = Field(
+        "site", description="site: each target vs a fixed point; pairwise: every pair of targets"
+    )
+    lat: Optional[float] = Field(None, ge=-90, le=90, description="Fixed point for mode=site (default: EOTS site)")
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+    target_ids: Optional[list[str]] = Field(None, description="Restrict to these targets (default: all)")
+    velocity: Literal["reported", "track"] = Field(
+        "reported", description="reported: speed_kn/heading_deg; track: fitted from the position history"
+    )
+    max_tcpa_min: float = Field(60.0, gt=0, description="Ignore approaches further ahead than this")
+    within_km: Optional[float] = Field(None, gt=0, description="Only return CPAs closer than this")
+    limit: int = Field(20, ge=1, le=500)
+
+_KM_PER_DEG = 111
+
+def _km(a_lat,a_lon,b_lat,b_lon):
+    kx = _KM_PER_DEG * cos(radians((a_lat+b_lat)/2))
+    ky = _KM_PER_DEG
+    return sqrt(((a_lon-b_lon)*kx)**2 + ((a_lat-b_lat)*ky)**2)
+
+def _km_np(a_lat, a_lon, b_lat, b_lon):
+    """Same equirectangular distance as _km, broadcast over NumPy arrays."""
+    kx = _KM_PER_DEG * np.cos(np.radians((a_lat + b_lat) / 2))
+    return np.hypot((a_lon - b_lon) * kx, (a_lat - b_lat) * _KM_PER_DEG)
+
+def _xy_km(lat, lon, lat0, lon0):
+    """East/north km from (lat0, lon0) on the same equirectangular plane as _km."""
+    return (lon - lon0) * (_KM_PER_DEG * np.cos(np.radians(lat0))), (lat - lat0) * _KM_PER_DEG
+
+def _offset_deg(lat, lon, dx_km, dy_km):
+    """
+    Inverse of _km: the point dx_km east / dy_km north of (lat, lon), using
+    the mid-latitude scale so _km_np(lat, lon, *result) == hypot(dx, dy).
+    """
+    lat1 = np.clip(lat + dy_km / _KM_PER_DEG, -90.0, 90.0)
+    lon1 = lon + dx_km / (_KM_PER_DEG * np.cos(np.radians((lat + lat1) / 2)))
+    return lat1, (lon1 + 180.0) % 360.0 - 180.0
+
+def _velocity_kmh(speed_kn, heading_deg):
+    """East/north velocity (km/h) from speed over ground and true heading."""
+    v, h = np.asarray(speed_kn) * _KN_TO_KMH, np.radians(heading_deg)
+    return v * np.sin(h), v * np.cos(h)
+
+
+class _TargetStore:
+    """
+    Struct-of-arrays target table: parallel NumPy columns for the kinematics,
+    plus an id -> row index. Rows are never reused, so a row number is a stable
+    handle for the spatial index. Supports the dict-style reads the tools
+    used before (`tid in store`, `store[tid]`, `store.values()`).
+    """
+
+    COLUMNS = ("lat", "lon", "speed_kn", "heading_deg")
+
+    def __init__(self, capacity: int = 1024):
+        self.n = 0
+        self.ids: list = []
+        self.cls: list = []
+        self.row: dict = {}
+        for c in self.COLUMNS:
+            setattr(self, "_" + c, np.zeros(capacity, dtype=np.float64))
+        # fn(kind, payload) for every write once persistence is on (see persist.py)
+        self.journal = None
+        # Bumped on every write; keys derived caches (target.predict)
+        self.version = 0
+        # Row appends vs. dump() on the persistence snapshot thread
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __contains__(self, target_id) -> bool:
+        return target_id in self.row
+
+    def __getitem__(self, target_id) -> dict:
+        return self.record(self.row[target_id])
+
+    def values(self):
+        return (self.record(r) for r in range(self.n))
+
+    def items(self):
+        return ((self.ids[r], self.record(r)) for r in range(self.n))
+
+    def col(self, name: str) -> np.ndarray:
+        return getattr(self, "_" + name)[: self.n]
+
+    def record(self, r: int) -> dict:
+        out = {"target_id": self.ids[r], "cls": self.cls[r]}
+        for c in self.COLUMNS:
+            out[c] = float(getattr(self, "_" + c)[r])
+        return out
+
+    def load(self, ids: list, cls: list, columns: dict) -> None:
+        """Replace the whole table (persistence restore); rows follow list order."""
+        n = len(ids)
+        cap = max(1024, 1 << max(n - 1, 0).bit_length())
+        cols = {}
+        for c in self.COLUMNS:
+            cols[c] = np.zeros(cap, dtype=np.float64)
+            cols[c][:n] = columns[c]
+        with self._lock:
+            self.n, self.ids, self.cls = n, list(ids), list(cls)
+            self.row = {tid: r for r, tid in enumerate(self.ids)}
+            self.version += 1
+            for c in self.COLUMNS:
+                setattr(self, "_" + c, cols[c])
+
+    def dump(self) -> tuple:
+        """
+        Copy of the table for a snapshot; safe to call from another thread.
+        Row count, ids and columns are taken together, so a concurrent upsert
+        is either wholly in the copy or not at all (its journal record covers
+        it). Values written in place during the copy are fine for the same reason.
+        """
+        with self._lock:
+            n = self.n
+            ids, cls = self.ids[:n], self.cls[:n]
+            arrays = {c: getattr(self, "_" + c)[:n].copy() for c in self.COLUMNS}
+        return arrays, ids, cls
+
+    def _grow(self) -> None:
+        cap = len(self._lat) * 2
+        for c in self.COLUMNS:
+            old = getattr(self, "_" + c)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[: self.n] = old[: self.n]
+            setattr(self, "_" + c, new)
+
+    def upsert(self, target_id: str, cls: str, **kin) -> int:
+        r = self.row.get(target_id)
+        if r is None:
+            with self._lock:
+                if self.n == len(self._lat):
+                    self._grow()
+                r = self.n
+                self.ids.append(target_id)
+                self.cls.append(cls)
+                self.row[target_id] = r
+                self.n += 1
+        else:
+            self.cls[r] = cls
+        self._write(r, kin)
+        if self.journal is not None:
+            self.journal(persist.TARGET_UPSERT, _pack_upsert(target_id, cls, kin))
+        return r
+
+    def set(self, r: int, **kin) -> None:
+        self._write(r, kin)
+        if self.journal is not None:
+            vals = {c: np.array([np.nan if kin.get(c) is None else kin[c]]) for c in self.COLUMNS}
+            self.journal(persist.TARGET_ASSIGN, _pack_assign(np.array([r]), vals))
+
+    def _write(self, r: int, kin: dict) -> None:
+        self.version += 1
+        for c, v in kin.items():
+            if v is not None:
+                getattr(self, "_" + c)[r] = v
+
+    def assign(self, rows: np.ndarray, values: dict) -> np.ndarray:
+        """
+        Scatter column updates. `values[c]` is aligned with `rows`; NaN means
+        "leave unchanged". A row repeated in one batch keeps its last value.
+        Returns the rows whose lat or lon was written.
+        """
+        moved = []
+        self.version += 1
+        for c, v in values.items():
+            keep = ~np.isnan(v)
+            r, v = rows[keep], v[keep]
+            if r.size == 0:
+                continue
+            # np.unique on the reversed batch picks each row's last occurrence
+            r, first = np.unique(r[::-1], return_index=True)
+            getattr(self, "_" + c)[r] = v[::-1][first]
+            if c in ("lat", "lon"):
+                moved.append(r)
+        if self.journal is not None and rows.size:
+            self.journal(persist.TARGET_ASSIGN, _pack_assign(rows, values))
+        if not moved:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate(moved))
+
+
+_TARGETS = _TargetStore()
+
+# Journal records (persist.py). Rows are stable across a restore because
+# upserts replay in their original order and rows are never reused.
+_UPSERT_KIN = struct.Struct("<4d")
+
+
+def _pack_upsert(target_id: str, cls: str, kin: dict) -> bytes:
+    tid, c = target_id.encode(), cls.encode()
+    head = struct.pack("<HH", len(tid), len(c)) + tid + c
+    return head + _UPSERT_KIN.pack(*(np.nan if kin.get(k) is None else kin[k] for k in _TargetStore.COLUMNS))
+
+
+def _unpack_upsert(payload: bytes) -> tuple:
+    nt, nc = struct.unpack_from("<HH", payload)
+    tid = payload[4:4 + nt].decode()
+    cls = payload[4 + nt:4 + nt + nc].decode()
+    kin = _UPSERT_KIN.unpack_from(payload, 4 + nt + nc)
+    return tid, cls, {k: (None if v != v else v) for k, v in zip(_TargetStore.COLUMNS, kin)}
+
+
+def _pack_assign(rows: np.ndarray, values: dict) -> bytes:
+    """n (u32), rows (i64[n]), then one f64[n] per column (NaN = unchanged)."""
+    n = rows.size
+    nan = np.full(n, np.nan)
+    cols = [np.asarray(values.get(c, nan), dtype="<f8") for c in _TargetStore.COLUMNS]
+    return struct.pack("<I", n) + np.asarray(rows, dtype="<i8").tobytes() + b"".join(v.tobytes() for v in cols)
+
+
+def _unpack_assign(payload: bytes) -> tuple:
+    (n,) = struct.unpack_from("<I", payload)
+    rows = np.frombuffer(payload, dtype="<i8", count=n, offset=4).astype(np.intp)
+    off = 4 + 8 * n
+    vals = {}
+    for i, c in enumerate(_TargetStore.COLUMNS):
+        vals[c] = np.frombuffer(payload, dtype="<f8", count=n, offset=off + 8 * n * i)
+    return rows, vals
+
+
+class _GridIndex:
+    """
+    Uniform lat/lon bucket index: cell -> set of store rows.
+    Updated incrementally on register/update; a query only visits the cells
+    overlapping the search radius.
+    """
+
+    def __init__(self, cell_deg: float = _GRID_CELL_DEG):
+        self.cell_deg = cell_deg
+        self._cells: dict[tuple[int, int], set] = {}
+        self._where: dict[int, tuple[int, int]] = {}
+
+    def _cell(self, lat: float, lon: float) -> tuple[int, int]:
+        return int(floor(lat / self.cell_deg)), int(floor(lon / self.cell_deg))
+
+    def upsert(self, key: int, lat: float, lon: float) -> None:
+        cell = self._cell(lat, lon)
+        old = self._where.get(key)
+        if old == cell:
+            return
+        if old is not None:
+            self._discard(key, old)
+        self._cells.setdefault(cell, set()).add(key)
+        self._where[key] = cell
+
+    def remove(self, key: int) -> None:
+        old = self._where.pop(key, None)
+        if old is not None:
+            self._discard(key, old)
+
+    def _discard(self, key: int, cell: tuple[int, int]) -> None:
+        bucket = self._cells[cell]
+        bucket.discard(key)
+        if not bucket:
+            del self._cells[cell]
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> list:
+        """Rows in every cell that may hold a point within radius_km (superset)."""
+        dlat = radius_km / _KM_PER_DEG
+        # _km scales longitude by cos(mid-latitude); the widest band is at the
+        # highest latitude the search can reach, so this bound never misses.
+        edge_lat = min(abs(lat) + dlat, 89.99)
+        dlon = radius_km / (_KM_PER_DEG * cos(radians(edge_lat)))
+        r0, c0 = self._cell(lat - dlat, lon - dlon)
+        r1, c1 = self._cell(lat + dlat, lon + dlon)
+
+        out: list = []
+        if (r1 - r0 + 1) * (c1 - c0 + 1) > len(self._cells):
+            # Radius covers more cells than are occupied: walk occupied cells.
+            for (r, c), bucket in self._cells.items():
+                if r0 <= r <= r1 and c0 <= c <= c1:
+                    out.extend(bucket)
+        else:
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    bucket = self._cells.get((r, c))
+                    if bucket:
+                        out.extend(bucket)
+        return out
+
+
+_INDEX = _GridIndex()
+
+
+class _TrackHistory:
+    """
+    Per-row ring buffer of the last `depth` position fixes (t, lat, lon),
+    stored as (rows x depth) arrays so memory per target is fixed. Fed by the
+    same write paths as _INDEX; journal replay does not record fixes, so the
+    history restarts empty after a restore.
+    """
+
+    def __init__(self, depth: int = _HISTORY_DEPTH):
+        self.depth = depth
+        self.t = np.zeros((0, depth))
+        self.lat = np.zeros((0, depth))
+        self.lon = np.zeros((0, depth))
+        self.count = np.zeros(0, dtype=np.int64)  # fixes ever recorded per row
+
+    @property
+    def nbytes(self) -> int:
+        return self.t.nbytes + self.lat.nbytes + self.lon.nbytes + self.count.nbytes
+
+    def _reserve(self, rows: int) -> None:
+        cap = self.count.size
+        if rows <= cap:
+            return
+        cap = max(rows, cap * 2, 1024)
+        for name in ("t", "lat", "lon"):
+            old = getattr(self, name)
+            new = np.zeros((cap, self.depth))
+            new[: old.shape[0]] = old
+            setattr(self, name, new)
+        count = np.zeros(cap, dtype=np.int64)
+        count[: self.count.size] = self.count
+        self.count = count
+
+    def record(self, rows: np.ndarray, t: float, lat: np.ndarray, lon: np.ndarray) -> None:
+        """Append one fix per row (rows must be unique)."""
+        if rows.size == 0:
+            return
+        self._reserve(int(rows.max()) + 1)
+        slot = self.count[rows] % self.depth
+        self.t[rows, slot] = t
+        self.lat[rows, slot] = lat
+        self.lon[rows, slot] = lon
+        self.count[rows] += 1
+
+    def track(self, r: int, limit: int) -> list:
+        """Fixes for one row, oldest first."""
+        if r >= self.count.size:
+            return []
+        c = int(self.count[r])
+        k = min(c, self.depth, limit)
+        slots = np.arange(c - k, c) % self.depth
+        return [{"t": float(self.t[r, s]), "lat": float(self.lat[r, s]), "lon": float(self.lon[r, s])}
+                for s in slots.tolist()]
+
+    def velocity_kmh(self, rows: np.ndarray) -> tuple:
+        """
+        East/north velocity from the oldest to the newest fix kept for each
+        row; `ok` is False where fewer than two fixes (or no elapsed time).
+        """
+        vx, vy = np.zeros(rows.size), np.zeros(rows.size)
+        have = rows < self.count.size
+        ok = np.zeros(rows.size, dtype=bool)
+        r = rows[have]
+        c = self.count[r]
+        k = np.minimum(c, self.depth)
+        new, old = (c - 1) % self.depth, (c - k) % self.depth
+        dt_h = (self.t[r, new] - self.t[r, old]) / 3600.0
+        good = (k >= 2) & (dt_h > 0)
+        lat0 = self.lat[r, old]
+        dx, dy = _xy_km(self.lat[r, new], self.lon[r, new], lat0, self.lon[r, old])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vx[have] = np.where(good, dx / dt_h, 0.0)
+            vy[have] = np.where(good, dy / dt_h, 0.0)
+        ok[have] = good
+        return vx, vy, ok
+
+
+_HISTORY = _TrackHistory()
+
+
+def _record_fixes(rows: np.ndarray) -> None:
+    _HISTORY.record(rows, time.time(), _TARGETS.col("lat")[rows], _TARGETS.col("lon")[rows])
+
+
+def _cpa(px, py, vx, vy) -> tuple:
+    """
+    Closest point of approach for relative positions (km) and velocities
+    (km/h), elementwise: (tcpa_h, dcpa_km). Diverging or stationary pairs
+    have their CPA now (tcpa 0).
+    """
+    vv = vx * vx + vy * vy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(vv > 0, -(px * vx + py * vy) / vv, 0.0)
+    t = np.maximum(t, 0.0)
+    return t, np.hypot(px + vx * t, py + vy * t)
+
+
+def _query_nearest(lat: float, lon: float, radius_km: float, limit: int) -> list:
+    rows = _INDEX.candidates(lat, lon, radius_km)
+    if not rows:
+        return []
+    rows = np.fromiter(rows, dtype=np.intp, count=len(rows))
+    d = _km_np(lat, lon, _TARGETS.col("lat")[rows], _TARGETS.col("lon")[rows])
+
+    hit = np.flatnonzero(d <= radius_km)
+    if hit.size > limit:
+        hit = hit[np.argpartition(d[hit], limit - 1)[:limit]]
+    hit = hit[np.argsort(d[hit], kind="stable")]
+
+    items = []
+    for j in hit:
+        t = _TARGETS.record(int(rows[j]))
+        items.append({"target_id": t["target_id"], "cls": t["cls"], "km": round(float(d[j]), 2),
+                      "speed_kn": t["speed_kn"], "heading_deg": t["heading_deg"]})
+    return items
+
+
+def _geofence_alert(level: str, message: str, zone_id: str, target_id: str) -> dict:
+    # The transition happened either way; "delivered"/"suppressed" say whether the
+    # alert pipeline put it on the operator screen (same fields as alert.raise).
+    params = alert_tools.AlertRaiseParams(level=level, message=message, zone_id=zone_id, target_id=target_id)
+    res = alert_tools._raise_internal(params)
+    out = {**res["alert"], "delivered": res["delivered"]}
+    if "suppressed" in res:
+        out["suppressed"] = res["suppressed"]
+    return out
+
+
+_GEOFENCE = GeofenceEvaluator(_geofence_alert)
+
+
+def _check_geofences(rows: np.ndarray, old_lat: np.ndarray, old_lon: np.ndarray) -> list:
+    """Run the geofence evaluator for rows that were just written (unique rows)."""
+    if rows.size == 0:
+        return []
+    return _GEOFENCE.evaluate(
+        zone_tools._INDEX, zone_tools._RULES,
+        [_TARGETS.ids[r] for r in rows.tolist()], old_lat, old_lon,
+        _TARGETS.col("lat")[rows], _TARGETS.col("lon")[rows], _TARGETS.col("speed_kn")[rows],
+    )
+
+
+def _resync_zone(zone_id: str) -> None:
+    _GEOFENCE.resync_zone(zone_tools._INDEX, zone_id, _TARGETS.ids[: len(_TARGETS)], _TARGETS.col("lat"), _TARGETS.col("lon"))
+
+
+zone_tools._ZONE_LISTENERS.append(_resync_zone)
+
+
+def _persist_targets() -> None:
+    p = persist.PERSIST
+    if p is None:
+        return
+
+    def dump():
+        arrays, ids, cls = _TARGETS.dump()
+        return arrays, {"ids": ids, "cls": cls}
+
+    def load(arrays, meta):
+        _TARGETS.load(meta["ids"], meta["cls"], arrays)
+
+    def replay(kind, payload):
+        if kind == persist.TARGET_UPSERT:
+            tid, cls, kin = _unpack_upsert(payload)
+            _TARGETS.upsert(tid, cls, **kin)
+        elif kind == persist.TARGET_ASSIGN:
+            _TARGETS.assign(*_unpack_assign(payload))
+
+    def finish():
+        # Derived state: spatial index and per-zone containment (no alerts on restore)
+        lat, lon = _TARGETS.col("lat"), _TARGETS.col("lon")
+        for r in range(_TARGETS.n):
+            _INDEX.upsert(r, lat[r], lon[r])
+        for zone_id in zone_tools._ZONES:
+            _resync_zone(zone_id)
+
+    p.register(persist.Domain("targets", dump, load, replay, finish))
+    _TARGETS.journal = p.log
+
+
+_persist_targets()
+
+
+def _notify_rows(rows) -> None:
+    if notify.HUB.wants("targets"):
+        notify.HUB.publish("targets", {_TARGETS.ids[r]: _TARGETS.record(r) for r in rows})
+
+
+notify.HUB.source("targets", lambda: _TARGETS)
+
+
+def _apply_updates(updates: list) -> tuple:
+    """Vectorized kinematic update for a list of TargetUpdateParams."""
+    rows, missing = [], []
+    vals = {c: [] for c in _TargetStore.COLUMNS}
+    for u in updates:
+        r = _TARGETS.row.get(u.target_id)
+        if r is None:
+            missing.append(u.target_id)
+            continue
+        rows.append(r)
+        for c in _TargetStore.COLUMNS:
+            v = getattr(u, c)
+            vals[c].append(np.nan if v is None else v)
+
+    rows = np.asarray(rows, dtype=np.intp)
+    touched = np.unique(rows)
+    old_lat, old_lon = _TARGETS.col("lat")[touched], _TARGETS.col("lon")[touched]
+    moved = _TARGETS.assign(rows, {c: np.asarray(v, dtype=np.float64) for c, v in vals.items()})
+    lat, lon = _TARGETS.col("lat"), _TARGETS.col("lon")
+    for r in moved.tolist():
+        _INDEX.upsert(r, lat[r], lon[r])
+    _record_fixes(moved)
+    alerts = _check_geofences(touched, old_lat, old_lon)
+    _notify_rows(touched.tolist())
+    return touched, missing, alerts
+
+
 @app.tool(name="target.register", description="Register a target with initial kinematics")
 def target_register(params: TargetRegisterParams):
-    _TARGETS[params.target_id] = params.dict()
-    return {"ok": True, "stored": _TARGETS[params.target_id]}
+    p = params.dict()
+    r = _TARGETS.row.get(params.target_id)
+    old = (params.lat, params.lon) if r is None else (_TARGETS.col("lat")[r], _TARGETS.col("lon")[r])
+    r = _TARGETS.upsert(p.pop("target_id"), p.pop("cls"), **p)
+    _INDEX.upsert(r, params.lat, params.lon)
+    _record_fixes(np.array([r]))
+    _notify_rows([r])
+    out = {"ok": True, "stored": _TARGETS.record(r)}
+    alerts = _check_geofences(np.array([r]), np.array([old[0]]), np.array([old[1]]))
+    if alerts:
+        out["alerts"] = alerts
+    return out
 
-@app.tool(name="target.update_track", description="Update target kinematics")
+@app.tool(
+    name="target.update_track",
+    description=(
+        "Update target kinematics. Geofence rules (no_entry / speed_limit) are checked "
+        "on every move; enter/exit transitions are returned under 'alerts' "
+        "(delivered=false with a suppressed reason when alert rate limiting held one back)."
+    ),
+)
 def target_update(params: TargetUpdateParams):
-    if params.target_id not in _TARGETS:
+    r = _TARGETS.row.get(params.target_id)
+    if r is None:
         return {"ok": False, "error": "target_not_found"}
-    for k, v in params.dict(exclude={"target_id"}).items():
-        if v is not None:
-            _TARGETS[params.target_id][k] = v
-    return {"ok": True, "updated": _TARGETS[params.target_id]}
+    old_lat, old_lon = _TARGETS.col("lat")[r:r + 1].copy(), _TARGETS.col("lon")[r:r + 1].copy()
+    _TARGETS.set(r, **params.dict(exclude={"target_id"}))
+    if params.lat is not None or params.lon is not None:
+        _INDEX.upsert(r, _TARGETS.col("lat")[r], _TARGETS.col("lon")[r])
+        _record_fixes(np.array([r]))
+    _notify_rows([r])
+    out = {"ok": True, "updated": _TARGETS.record(r)}
+    alerts = _check_geofences(np.array([r]), old_lat, old_lon)
+    if alerts:
+        out["alerts"] = alerts
+    return out
 
-from math import cos, radians, sqrt
-def _km(a_lat,a_lon,b_lat,b_lon):
-    kx = 111 * cos(radians((a_lat+b_lat)/2))
-    ky = 111
-    return sqrt(((a_lon-b_lon)*kx)**2 + ((a_lat-b_lat)*ky)**2)
+@app.tool(
+    name="target.update_tracks_batch",
+    description=(
+        "Apply many target kinematic updates in one call (same fields and rules as "
+        "target.update_track). Unknown target_ids are skipped and listed in 'missing'."
+    ),
+)
+def target_update_batch(params: TargetUpdateBatchParams):
+    rows, missing, alerts = _apply_updates(params.updates)
+    out = {"ok": True, "updated": int(rows.size), "missing": missing}
+    if alerts:
+        out["alerts"] = alerts
+    return out
+
+@app.tool(name="target.query_nearest", description="Find nearest targets within radius")
+def target_query_nearest(params: TargetQueryNearestParams):
+    items = _query_nearest(params.lat, params.lon, params.radius_km, params.limit)
+    return {"ok": True, "count": len(items), "results": items}
+
+
+class _PredictCache:
+    """
+    Dead-reckoned lat/lon for every row, keyed by (store version, horizon):
+    repeated queries between two writes reuse one vectorized propagation.
+    """
+
+    def __init__(self, size: int = _PREDICT_CACHE):
+        self.size = size
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, t_offset_s: float) -> tuple:
+        key = (_TARGETS.version, t_offset_s)
+        hit = self._entries.get(key)
+        if hit is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return hit
+        self.misses += 1
+        if self._entries and next(reversed(self._entries))[0] != key[0]:
+            self._entries.clear()  # older versions can never be hit again
+        lat, lon = _TARGETS.col("lat"), _TARGETS.col("lon")
+        vx, vy = _velocity_kmh(_TARGETS.col("speed_kn"), _TARGETS.col("heading_deg"))
+        h = t_offset_s / 3600.0
+        hit = self._entries[key] = _offset_deg(lat, lon, vx * h, vy * h)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        return hit
+
+
+_PREDICT = _PredictCache()
+
+
+def _select_rows(target_ids: Optional[list]) -> tuple:
+    if target_ids is None:
+        return np.arange(len(_TARGETS)), []
+    rows, missing = [], []
+    for tid in dict.fromkeys(target_ids):
+        r = _TARGETS.row.get(tid)
+        if r is None:
+            missing.append(tid)
+        else:
+            rows.append(r)
+    return np.asarray(rows, dtype=np.intp), missing
+
+
+def _velocities(rows: np.ndarray, source: str) -> tuple:
+    vx, vy = _velocity_kmh(_TARGETS.col("speed_kn")[rows], _TARGETS.col("heading_deg")[rows])
+    if source == "track":
+        tx, ty, ok = _HISTORY.velocity_kmh(rows)
+        vx, vy = np.where(ok, tx, vx), np.where(ok, ty, vy)
+    return vx, vy
+
+
+@app.tool(
+    name="target.track_history",
+    description="Recent position fixes (t = unix seconds, lat, lon) kept for a target, oldest first",
+)
+def target_track_history(params: TargetHistoryParams):
+    r = _TARGETS.row.get(params.target_id)
+    if r is None:
+        return {"ok": False, "error": "target_not_found"}
+    return {"ok": True, "target_id": params.target_id, "depth": _HISTORY.depth,
+            "fixes": _HISTORY.track(r, params.limit)}
+
+
+@app.tool(
+    name="target.cpa",
+    description=(
+        "Closest point of approach (dcpa_km) and time to it (tcpa_min) for every target against a fixed "
+        "point (mode=site, default the EOTS site) or for every pair of targets (mode=pairwise). "
+        "Velocity comes from reported speed/heading or from the recent track history. "
+        "Results are sorted by dcpa_km; tcpa_min=0 means the target is already opening."
+    ),
+)
+def target_cpa(params: TargetCpaParams):
+    rows, missing = _select_rows(params.target_ids)
+    out = {"ok": True, "mode": params.mode, "velocity": params.velocity, "missing": missing}
+    lat, lon = _TARGETS.col("lat")[rows], _TARGETS.col("lon")[rows]
+    vx, vy = _velocities(rows, params.velocity)
+
+    if params.mode == "site":
+        lat0 = eots_pointing.SOLVER.site_lat if params.lat is None else params.lat
+        lon0 = eots_pointing.SOLVER.site_lon if params.lon is None else params.lon
+        px, py = _xy_km(lat, lon, lat0, lon0)
+        a, b = np.arange(rows.size), None
+        out["site"] = {"lat": lat0, "lon": lon0}
+    else:
+        if rows.size > _CPA_PAIR_MAX:
+            return {"ok": False, "error": "too_many_targets", "max": _CPA_PAIR_MAX, "count": int(rows.size)}
+        a, b = np.triu_indices(rows.size, k=1)
+        x, y = _xy_km(lat, lon, float(lat.mean()) if rows.size else 0.0, float(lon.mean()) if rows.size else 0.0)
+        px, py = x[b] - x[a], y[b] - y[a]
+        vx, vy = vx[b] - vx[a], vy[b] - vy[a]
+
+    t_h, d = _cpa(px, py, vx, vy)
+    keep = t_h * 60.0 <= params.max_tcpa_min
+    if params.within_km is not None:
+        keep &= d <= params.within_km
+    hit = np.flatnonzero(keep)
+    out["count"] = int(hit.size)
+    if hit.size > params.limit:
+        hit = hit[np.argpartition(d[hit], params.limit - 1)[: params.limit]]
+    hit = hit[np.argsort(d[hit], kind="stable")]
+
+    ids = _TARGETS.ids
+    results = []
+    for j in hit.tolist():
+        item = {"target_id": ids[rows[a[j]]]}
+        if b is not None:
+            item["other_id"] = ids[rows[b[j]]]
+        item.update(dcpa_km=round(float(d[j]), 3), tcpa_min=round(float(t_h[j]) * 60.0, 2),
+                    range_km=round(float(np.hypot(px[j], py[j])), 3))
+        results.append(item)
+    out["results"] = results
+    return out
+
+
+@app.tool(
+    name="target.predict",
+    description=(
+        "Dead-reckoned position of targets t_offset_s seconds ahead from their speed_kn/heading_deg "
+        "(all targets, or those in ids and/or currently inside bbox). Returns up to limit targets; "
+        "repeated queries for the same horizon between updates are served from cache."
+    ),
+)
+def target_predict(params: TargetPredictParams):
+    version = _TARGETS.version
+    plat, plon = _PREDICT.get(params.t_offset_s)
+    rows, missing = _select_rows(params.ids)
+    if params.bbox is not None:
+        min_lat, min_lon, max_lat, max_lon = params.bbox
+        lat, lon = _TARGETS.col("lat")[rows], _TARGETS.col("lon")[rows]
+        rows = rows[(lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)]
+    count = int(rows.size)
+    rows = rows[: params.limit]
+    km = _km_np(_TARGETS.col("lat")[rows], _TARGETS.col("lon")[rows], plat[rows], plon[rows])
+    ids, cls = _TARGETS.ids, _TARGETS.cls
+    results = [
+        {"target_id": ids[r], "cls": cls[r], "lat": round(float(la), 6), "lon": round(float(lo), 6), "km": round(float(k), 3)}
+        for r, la, lo, k in zip(rows.tolist(), plat[rows].tolist(), plon[rows].tolist(), km.tolist())
+    ]
+    return {"ok": True, "t_offset_s": params.t_offset_s, "version": version, "count": count,
+            "truncated": count > len(results), "missing": missing, "results": results}
 
-# @app.tool(name="target.query_nearest", description="Find nearest targets within radius")
-# def target_query_nearest(params: TargetQueryNearestParams):
-#     items = []
-#     for t in _TARGETS.values():
-#         d = _km(params.lat, params.lon, t["lat"], t["lon"])
-#         if d <= params.radius_km:
-#             items.append({"target_id": t["target_id"], "cls": t["cls"], "km": round(d,2),
-#                           "speed_kn": t["speed_kn"], "heading_deg": t["heading_deg"]})
-#     items.sort(key=lambda x: x["km"])
-#     return {"ok": True, "count": len(items[:params.limit]), "results": items[:params.limit]}
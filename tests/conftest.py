@@ -0,0 +1,44 @@
+# tests/conftest.py
+"""
+공통 픽스처: 서버 모듈을 저장소 루트에서 import 하고, in-memory fastmcp 클라이언트로 툴을 호출한다.
+
+- 지연 로딩(매니페스트) 없이 모든 툴 모듈을 바로 import (MCP_LAZY_TOOLS=0)
+- 카메라 2대 (main, cam2), 장비 드라이버 없음 (데모 모드)
+- 영속화는 끈다 (PERSIST_DIR 미설정). 영속화 테스트는 persist.Persistence 를 직접 만들거나 하위 프로세스로 돌린다.
+"""
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["MCP_LAZY_TOOLS"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.pop("PERSIST_DIR", None)
+os.environ["EOTS_CAMERAS"] = "cam2"  # 기본 카메라(main) + 데모 모드 카메라 1대
+
+import pytest  # noqa: E402
+
+# 툴 모듈은 server_main 을 통해 import 되어야 한다 (server_main -> 툴 모듈 -> from server_main import app)
+import server_main  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    return server_main.app
+
+
+@pytest.fixture
+def call(app):
+    """call(name, args) -> 툴 결과 dict (in-memory 클라이언트, 호출마다 새 이벤트 루프)."""
+    from fastmcp import Client
+
+    def _call(name, args=None):
+        async def run():
+            async with Client(app) as client:
+                res = await client.call_tool(name, args or {}, raise_on_error=False)
+                return res.structured_content if res.structured_content is not None else res
+
+        return asyncio.run(run())
+
+    return _call
@@ -0,0 +1,58 @@
+# tests/test_alerts.py
+"""알림 파이프라인: alert.history 페이징."""
+from alert_pipeline import AlertPipeline
+
+
+def _pipeline(**kw):
+    opts = dict(dedup_s=0.0, key_rate=1e6, key_burst=1e6, global_rate=1e6, global_burst=1e6)
+    return AlertPipeline(**{**opts, **kw})
+
+
+def test_history_pages_oldest_first():
+    p = _pipeline()
+    for i in range(25):
+        p.submit("warning" if i % 5 else "critical", f"m{i}", zone_id="Z1")
+    seen, since = [], 0
+    while True:
+        page = p.query(since_seq=since, limit=10)
+        if not page:
+            break
+        assert len(page) <= 10
+        seen += [e["message"] for e in page]
+        since = page[-1]["seq"]
+    assert seen == [f"m{i}" for i in range(25)]
+    # 필터와 같이 써도 앞에서부터 limit 건
+    crit = p.query(level="critical", limit=3)
+    assert [e["message"] for e in crit] == ["m0", "m5", "m10"]
+    assert [e["message"] for e in p.query(since_seq=crit[-1]["seq"], level="critical", limit=3)] == ["m15", "m20"]
+
+
+def test_history_tool_paging(call):
+    first = call("alert.history", {"params": {"limit": 1000}})
+    since = first["alerts"][-1]["seq"] if first["alerts"] else 0
+    for i in range(5):
+        assert call("alert.raise", {"params": {"level": "info", "message": f"page-{i}", "target_id": f"P{i}"}})["delivered"]
+    page = call("alert.history", {"params": {"since_seq": since, "limit": 2}})
+    assert [a["message"] for a in page["alerts"]] == ["page-0", "page-1"]
+    page = call("alert.history", {"params": {"since_seq": page["alerts"][-1]["seq"], "limit": 2}})
+    assert [a["message"] for a in page["alerts"]] == ["page-2", "page-3"]
+
+
+def test_geofence_alerts_report_suppression(call):
+    call("zone.define", {"params": {"zone_id": "GZ", "polygon": [[10, 10], [10, 11], [11, 11], [11, 10]]}})
+    call("zone.set_rule", {"params": {"zone_id": "GZ", "rule": "no_entry"}})
+    call("target.register", {"params": {"target_id": "G1", "cls": "vessel", "lat": 9.0, "lon": 9.0}})
+
+    def move(lat, lon):
+        return call("target.update_track", {"params": {"target_id": "G1", "lat": lat, "lon": lon}}).get("alerts", [])
+
+    enter = move(10.5, 10.5)
+    assert [(a["level"], a["delivered"]) for a in enter] == [("critical", True)]
+    assert [(a["level"], a["delivered"]) for a in move(9.0, 9.0)] == [("info", True)]
+    # 같은 진입이 dedup 창 안에 다시: 전이는 돌려주되 화면으로는 가지 않았다고 표시
+    again = move(10.5, 10.5)
+    assert len(again) == 1 and again[0]["delivered"] is False and again[0]["suppressed"] == "duplicate"
+    assert again[0]["message"] == enter[0]["message"]
+
+    hist = call("alert.history", {"params": {"target_id": "G1", "kind": "alert", "limit": 100}})["alerts"]
+    assert [a["level"] for a in hist] == ["critical", "info"]
@@ -0,0 +1,51 @@
+# tests/test_apply.py
+"""eots.apply: 주어진 필드만 한 번에 반영 (장비 명령 1건), 범위 밖 값이 하나라도 있으면 아무것도 반영하지 않음."""
+import eots_tools_core as core
+
+
+class _RecordingDriver:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, cmd, **args):
+        self.sent.append((cmd, args))
+        return {}
+
+
+def test_apply_partial_update(call, monkeypatch):
+    drv = _RecordingDriver()
+    monkeypatch.setattr(core._FLEET.default, "driver", drv)
+    call("eots.apply", {"mode": "eo", "zoom": 1, "pan_deg": 0, "tilt_deg": 0, "stabilization": {"eo": False, "ir": False}})
+    before = dict(core._FLEET.default.store.snapshot.data)
+    drv.sent.clear()
+
+    out = call("eots.apply", {"mode": "ir", "zoom": 5, "stabilization": {"ir": True}})
+    assert out["ok"]
+    assert drv.sent == [("apply", {"changes": {"mode": "ir", "zoom": 5, "ir_stab": True}})]
+    assert out["deltas"] == {"mode": {"from": "eo", "to": "ir"}, "zoom": {"from": 1, "to": 5},
+                             "ir_stab": {"from": False, "to": True}}
+    state = core._FLEET.default.store.snapshot.data
+    assert (state["mode"], state["zoom"], state["ir_stab"]) == ("ir", 5, True)
+    for k in ("pan", "tilt", "eo_stab", "ir_polarity", "enhance_eo", "enhance_ir"):
+        assert state.get(k) == before.get(k), k
+    assert out["state"]["zoom"] == 5 and out["version"] == core._FLEET.default.store.snapshot.version
+
+    # 같은 값 재적용: 명령은 나가지만 delta 없음
+    assert call("eots.apply", {"zoom": 5})["deltas"] == {}
+
+
+def test_apply_rejects_out_of_range_without_changes(call, monkeypatch):
+    drv = _RecordingDriver()
+    monkeypatch.setattr(core._FLEET.default, "driver", drv)
+    before = core._FLEET.default.store.snapshot
+    out = call("eots.apply", {"mode": "ir", "pan_deg": 500})
+    assert getattr(out, "is_error", False)
+    assert drv.sent == [] and core._FLEET.default.store.snapshot is before
+
+
+def test_apply_on_other_camera(call):
+    main_zoom = core._FLEET.default.store.snapshot.data.get("zoom")
+    out = call("eots.apply", {"zoom": 7, "tilt_deg": -4.5, "camera_id": "cam2"})
+    assert out["ok"] and out["state"]["zoom"] == 7
+    assert core._FLEET.get("cam2").store.snapshot.data["tilt"] == -4.5
+    assert core._FLEET.default.store.snapshot.data.get("zoom") == main_zoom
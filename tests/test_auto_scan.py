@@ -0,0 +1,28 @@
+# tests/test_auto_scan.py
+import asyncio
+
+from fastmcp import Client
+
+import eots_tools_core as core
+
+
+def test_stop_and_broadcast_stop_end_auto_scan(app):
+    async def scenario():
+        async with Client(app) as c:
+            for cam in ("main", "cam2"):
+                res = await c.call_tool("eots.auto_scan", {"enable": True, "camera_id": cam})
+                assert res.data["ok"]
+            await asyncio.sleep(0.05)
+            assert all(core._SCANNERS[cam].running for cam in ("main", "cam2"))
+
+            await c.call_tool("eots.stop", {"camera_id": "cam2"})
+            assert not core._SCANNERS["cam2"].running and core._SCANNERS["main"].running
+
+            await c.call_tool("eots.auto_scan", {"enable": True, "camera_id": "cam2"})
+            res = await c.call_tool("eots.broadcast", {"tool": "eots.stop"})
+            assert res.data["ok"] and sorted(res.data["results"]) == ["cam2", "main"]
+            await asyncio.sleep(0.05)
+            return {cam: (core._SCANNERS[cam].running, core._FLEET.get(cam).state["auto_scan"])
+                    for cam in ("main", "cam2")}
+
+    assert asyncio.run(scenario()) == {"main": (False, False), "cam2": (False, False)}
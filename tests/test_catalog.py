@@ -0,0 +1,52 @@
+# tests/test_catalog.py
+"""툴 카탈로그: ETag 는 해시 시드/로딩 방식(즉시, 매니페스트 지연 로딩)과 무관하게 같아야 한다. 지연 로딩 시 모듈 간 import."""
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+_CODE = """
+import asyncio, server_main
+print(asyncio.run(server_main.CATALOG.get("en")).etag, asyncio.run(server_main.CATALOG.get("ko", True)).etag)
+"""
+
+
+def _etags(seed, lazy, manifest):
+    env = {**os.environ, "PYTHONHASHSEED": str(seed), "MCP_LAZY_TOOLS": lazy, "MCP_TOOL_MANIFEST": str(manifest)}
+    out = subprocess.run([sys.executable, "-c", _CODE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    return out.stdout.strip().splitlines()[-1]
+
+
+def test_catalog_etag_is_deterministic(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    eager = {_etags(seed, "0", manifest) for seed in (1, 2, 3)}
+    assert len(eager) == 1
+    # 1회차가 매니페스트를 만들고, 나머지는 다른 시드로 매니페스트에서 읽는다
+    lazy = {_etags(seed, "1", manifest) for seed in (4, 5, 6)}
+    assert lazy == eager
+
+
+_COLD = """
+import asyncio, sys, server_main
+from fastmcp import Client
+
+async def main():
+    async with Client(server_main.app) as c:
+        await c.call_tool("system.status", {})
+        await c.call_tool("zone.define", {"params": {"zone_id": "Z", "polygon": [[0, 0], [0, 1], [1, 1]]}})
+        await c.call_tool("zone.list", {"params": {}})
+    print("eots_tools_core" in sys.modules)
+
+asyncio.run(main())
+"""
+
+
+def test_system_and_zone_tools_do_not_load_eots_module(tmp_path):
+    # 지연 로딩에서 system.* / zone.* 호출이 eots 툴 모듈(녹화 파이프라인, 드라이버)을 끌어오지 않는다
+    env = {**os.environ, "MCP_LAZY_TOOLS": "1", "MCP_TOOL_MANIFEST": str(tmp_path / "manifest.json")}
+    for _ in range(2):  # 1회차는 매니페스트를 만든다 (툴 모듈 전부 import)
+        out = subprocess.run([sys.executable, "-c", _COLD], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+        assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "False"
@@ -0,0 +1,76 @@
+# tests/test_detections.py
+import asyncio
+
+from fastmcp import Client
+
+import eots_tools_core as core
+
+
+def _objects():
+    return [
+        {"id": "a", "label": "Ship", "confidence": 0.4},
+        {"id": "b", "label": "ship", "confidence": 0.9},
+        {"id": "c", "label": "ship", "confidence": 0.7},
+        {"id": "d", "label": "person", "confidence": 0.8},
+    ]
+
+
+def test_detection_object_exists_uses_published_index(call):
+    core._publish_objects(_objects())
+    out = call("eots.detection_object_exists", {"object_name": "SHIP"})
+    assert out["exists"] and out["count"] == 3
+    assert [o["id"] for o in out["matched_objects"]] == ["b", "c", "a"]
+
+    out = call("eots.detection_object_exists",
+               {"object_name": "ship", "min_confidence": 0.7, "limit": 1, "fields": ["id"]})
+    assert out["count"] == 2
+    assert out["matched_objects"] == [{"id": "b"}]
+
+    out = call("eots.detection_object_exists", {"object_name": "boat", "limit": 0})
+    assert out == {"ok": True, "query": "boat", "exists": False, "count": 0, "matched_objects": []}
+
+
+def test_detection_index_follows_replaced_objects(call):
+    core._publish_objects(_objects())
+    core._FLEET.default.store.commit({"objects": [{"id": "x", "label": "boat", "confidence": 0.5}]})
+    assert call("eots.detection_object_exists", {"object_name": "boat"})["count"] == 1
+    assert call("eots.detection_object_exists", {"object_name": "ship"})["count"] == 0
+
+
+async def _since(client, cursor, mode="diff"):
+    res = await client.call_tool("eots.objects_since", {"cursor": cursor, "mode": mode})
+    return res.structured_content
+
+
+def test_objects_since_diff_is_against_latest_frame(app):
+    async def main():
+        async with Client(app) as c:
+            seq = core._publish_objects([{"id": "a", "label": "ship", "confidence": 0.5}])
+            await c.call_tool("eots.session_begin", {})  # 세션 스냅샷은 여기서 멈춘다
+            try:
+                latest = core._publish_objects([{"id": "a", "label": "ship", "confidence": 0.9},
+                                                {"id": "b", "label": "boat", "confidence": 0.6}])
+                # 게시 경로 밖에서 상태를 바꿔도 diff 는 이력 프레임 기준
+                core._FLEET.default.store.commit({"objects": [{"id": "z", "label": "noise"}]})
+                first = await _since(c, seq)
+                again = await _since(c, first["cursor"])
+                frames = await _since(c, seq, "frames")
+            finally:
+                await c.call_tool("eots.session_abort", {})
+            return latest, first, again, frames
+
+    latest, first, again, frames = asyncio.run(main())
+    assert first["cursor"] == latest and not first["reset"]
+    assert [o["id"] for o in first["added"]] == ["b"]
+    assert [o["id"] for o in first["changed"]] == ["a"] and first["removed"] == []
+    assert again == {"ok": True, "cursor": latest, "reset": False, "added": [], "changed": [], "removed": []}
+    assert [f["seq"] for f in frames["frames"]] == [latest] and frames["cursor"] == latest and not frames["more"]
+
+
+def test_objects_since_reset_when_cursor_left_the_buffer(call):
+    for i in range(core._HISTORY._frames.maxlen + 2):
+        latest = core._publish_objects([{"id": f"o{i}", "label": "ship"}])
+    out = call("eots.objects_since", {"cursor": latest - core._HISTORY._frames.maxlen - 1, "mode": "diff"})
+    assert out["reset"] and out["cursor"] == latest and out["objects"] == [{"id": f"o{i}", "label": "ship"}]
+    out = call("eots.objects_since", {"cursor": 1, "mode": "frames", "max_frames": 2})
+    assert out["gap"] and out["more"] and [f["seq"] for f in out["frames"]] == [core._HISTORY.oldest, core._HISTORY.oldest + 1]
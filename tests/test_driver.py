@@ -0,0 +1,79 @@
+# tests/test_driver.py
+"""장비 드라이버: 시뮬레이터와의 왕복, 파이프라이닝 응답 매칭, 타임아웃/오류 응답/큐 가득 참."""
+import asyncio
+import socket
+
+import pytest
+
+from eots_driver import DeviceDriver, DriverBusy, DriverError, DriverTimeout
+from eots_simulator import EotsSimulator
+
+
+async def _with_sim(fn, **sim_kw):
+    sim = EotsSimulator(**sim_kw)
+    port = await sim.start()
+    drv = DeviceDriver("127.0.0.1", port, timeout_s=2.0, reconnect_s=0.05)
+    try:
+        return await fn(drv, sim)
+    finally:
+        await drv.close()
+        await sim.close()
+
+
+def test_round_trip_and_pipelined_correlation():
+    async def fn(drv, sim):
+        res = await drv.send("set_pan", pan_deg=12.5)
+        assert res["cmd"] == "set_pan" and res["state"]["pan_deg"] == 12.5
+        # 지연이 제각각인 응답이 순서 없이 돌아와도 요청 id 로 자기 응답을 받는다
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        out = await asyncio.gather(*(drv.send("set_tilt", tilt_deg=float(i)) for i in range(40)))
+        elapsed = loop.time() - t0
+        assert [r["cmd"] for r in out] == ["set_tilt"] * 40
+        assert drv.in_flight == 0 and drv.connected == 1
+        return elapsed, sim.commands
+
+    elapsed, commands = asyncio.run(_with_sim(fn, latency_ms=20, jitter_ms=20))
+    assert commands == 41
+    assert elapsed < 40 * 0.02 / 2  # 한 연결에서 파이프라이닝 (직렬이면 0.8s 이상)
+
+
+def test_timeout_then_recovers():
+    async def fn(drv, sim):
+        with pytest.raises(DriverTimeout):
+            await drv.send("set_pan", timeout_s=0.05, pan_deg=1.0)
+        assert drv.in_flight == 0
+        await asyncio.sleep(0.3)  # 늦게 도착한 응답은 버려진다
+        return await drv.send("set_pan", pan_deg=2.0)
+
+    res = asyncio.run(_with_sim(fn, latency_ms=200))
+    assert res["state"]["pan_deg"] == 2.0
+
+
+def test_device_error_response():
+    async def fn(drv, sim):
+        with pytest.raises(DriverError) as e:
+            await drv.send("set_pan", pan_deg=1.0)
+        assert not isinstance(e.value, DriverTimeout) and "simulated device fault" in str(e.value)
+
+    asyncio.run(_with_sim(fn, latency_ms=0, fail_rate=1.0))
+
+
+def test_queue_full_is_busy_immediately():
+    with socket.socket() as s:  # 아무도 듣지 않는 포트: 명령이 큐에 그대로 남는다
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    async def main():
+        drv = DeviceDriver("127.0.0.1", port, queue_size=1, timeout_s=0.3, reconnect_s=0.05)
+        first = asyncio.create_task(drv.send("set_pan", pan_deg=1.0))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(DriverBusy):
+                await drv.send("set_pan", pan_deg=2.0)
+            with pytest.raises(DriverTimeout):
+                await first
+        finally:
+            await drv.close()
+
+    asyncio.run(main())
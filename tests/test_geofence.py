@@ -0,0 +1,80 @@
+# tests/test_geofence.py
+"""지오펜스 평가기: no_entry / speed_limit 전이, 구역 재정의 시 재동기화 (알림 없음)."""
+import numpy as np
+import pytest
+
+import zone_tools as zt
+from geofence import GeofenceEvaluator
+
+_SQUARE = [[0, 0], [0, 1], [1, 1], [1, 0]]
+_OUTSIDE, _INSIDE = (2.0, 2.0), (0.5, 0.5)
+
+
+class _Fence:
+    def __init__(self, rules):
+        self.index = zt._ZoneIndex()
+        self.rules = rules
+        self.alerts = []
+        self.ev = GeofenceEvaluator(lambda level, msg, zid, tid: self.alerts.append((level, zid, tid, msg)) or msg)
+        self.pos, self.speed = {}, {}
+
+    def define(self, zone_id, polygon):
+        self.index.put(zt._CompiledZone(zone_id, polygon))
+        ids = list(self.pos)
+        lat = np.array([self.pos[t][0] for t in ids])
+        lon = np.array([self.pos[t][1] for t in ids])
+        self.ev.resync_zone(self.index, zone_id, ids, lat, lon)
+
+    def move(self, tid, pos=None, speed=None):
+        old = self.pos.get(tid, pos)
+        new = pos or old
+        self.pos[tid] = new
+        self.speed[tid] = self.speed.get(tid, 0.0) if speed is None else speed
+        self.alerts.clear()
+        self.ev.evaluate(self.index, self.rules, [tid], np.array([old[0]]), np.array([old[1]]),
+                         np.array([new[0]]), np.array([new[1]]), np.array([self.speed[tid]]))
+        return [(a[0], a[1]) for a in self.alerts]
+
+
+@pytest.fixture
+def fence():
+    f = _Fence({"NE": {"rule": "no_entry", "value": None}, "SL": {"rule": "speed_limit", "value": 10.0}})
+    f.define("NE", _SQUARE)
+    f.define("SL", [[5, 5], [5, 6], [6, 6], [6, 5]])
+    return f
+
+
+def test_no_entry_enter_and_leave(fence):
+    assert fence.move("A", _OUTSIDE) == []
+    assert fence.move("A", _INSIDE) == [("critical", "NE")]
+    assert fence.move("A", (0.6, 0.6)) == []  # 안에서 이동: 전이 없음
+    assert fence.move("A", _OUTSIDE) == [("info", "NE")]
+    assert "A" not in fence.ev.inside
+
+
+def test_speed_limit_transitions(fence):
+    assert fence.move("B", (7.0, 7.0), speed=20.0) == []  # 구역 밖에서는 속도 무관
+    assert fence.move("B", (5.5, 5.5), speed=8.0) == []   # 제한 이하로 진입
+    assert fence.move("B", speed=12.0) == [("warning", "SL")]
+    assert fence.move("B", speed=15.0) == []  # 계속 초과: 다시 알리지 않음
+    assert fence.move("B", speed=9.0) == [("info", "SL")]
+    assert fence.move("B", (7.0, 7.0), speed=30.0) == []
+    assert fence.move("B", (5.5, 5.5)) == [("warning", "SL")]  # 초과 속도로 진입
+    assert fence.move("B", (7.0, 7.0)) == [("info", "SL")]  # 초과 상태로 이탈
+    assert "B" not in fence.ev.speeding and "B" not in fence.ev.inside
+
+
+def test_zone_redefine_resyncs_without_alerts(fence):
+    fence.move("C", (5.5, 5.5), speed=20.0)
+    fence.move("D", _INSIDE)
+    assert fence.ev.speeding["C"] == {"SL"} and fence.ev.inside["D"] == {"NE"}
+    fence.alerts.clear()
+    # SL 을 C 가 없는 곳으로 옮기고, NE 를 C 위치까지 넓힌다
+    fence.define("SL", [[8, 8], [8, 9], [9, 9], [9, 8]])
+    fence.define("NE", [[0, 0], [0, 6], [6, 6], [6, 0]])
+    assert fence.alerts == []
+    assert fence.ev.speeding == {}  # 빈 집합이 남지 않는다
+    assert fence.ev.inside == {"C": {"NE"}, "D": {"NE"}}
+    # 재동기화된 상태에서 이동: 이미 안에 있던 C 는 진입 알림 없이 이탈 알림만
+    assert fence.move("C", (5.4, 5.4)) == []
+    assert fence.move("C", (7.0, 7.0)) == [("info", "NE")]
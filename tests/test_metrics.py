@@ -0,0 +1,71 @@
+# tests/test_metrics.py
+"""툴 호출 계측: 스레드 샤드 병합, 분위수 근사, Prometheus 출력, 미들웨어를 거친 호출/오류 집계."""
+import asyncio
+import threading
+
+from fastmcp import Client
+
+from metrics import METRICS, ToolMetrics
+
+
+def test_shards_merge_across_threads():
+    m = ToolMetrics(buckets=(0.001, 0.01, 0.1))
+
+    def work():
+        for i in range(1000):
+            m.observe("a", 0.0005 if i % 10 else 0.05, error=i % 100 == 0)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    m.observe("b", 5.0)
+
+    row = m.merged()["a"]
+    assert row[:2] == [4000, 40] and row[3:] == [3600, 0, 400, 0]
+    snap = m.snapshot()["tools"]
+    assert snap["a"]["calls"] == 4000 and snap["a"]["errors"] == 40
+    assert snap["a"]["mean_ms"] == round((3600 * 0.0005 + 400 * 0.05) / 4000 * 1000, 3)
+    # 버킷 상한 기준: 90% 가 1ms 이하, 나머지는 100ms 버킷
+    assert (snap["a"]["p50_ms_le"], snap["a"]["p95_ms_le"], snap["a"]["p99_ms_le"]) == (1.0, 100.0, 100.0)
+    assert snap["b"]["p50_ms_le"] == float("inf")  # 마지막 경계를 넘는 값은 +Inf 버킷
+    assert list(m.snapshot("b")["tools"]) == ["b"]
+
+
+def test_prometheus_buckets_are_cumulative():
+    m = ToolMetrics(buckets=(0.001, 0.01))
+    for s in (0.0005, 0.005, 0.005, 1.0):
+        m.observe('x"y', s)
+    m.observe('x"y', 0.0001, error=True)
+    text = m.render_prometheus()
+    assert 'mcp_tool_calls_total{tool="x\\"y"} 5' in text
+    assert 'mcp_tool_errors_total{tool="x\\"y"} 1' in text
+    assert 'mcp_tool_latency_seconds_bucket{tool="x\\"y",le="0.001"} 2' in text
+    assert 'mcp_tool_latency_seconds_bucket{tool="x\\"y",le="0.01"} 4' in text
+    assert 'mcp_tool_latency_seconds_bucket{tool="x\\"y",le="+Inf"} 5' in text
+    assert 'mcp_tool_latency_seconds_count{tool="x\\"y"} 5' in text
+    assert text.endswith("mcp_tool_calls_in_flight 0\n")
+
+
+def test_middleware_counts_calls_and_errors(app):
+    def counts(name):
+        row = METRICS.merged().get(name)
+        return (row[0], row[1]) if row else (0, 0)
+
+    async def main():
+        async with Client(app) as c:
+            before = counts("health"), counts("eots.track")
+            for _ in range(3):
+                await c.call_tool("health", {})
+            # 스키마 검증은 미들웨어 앞에서 끝나므로, 핸들러 안에서 실패하는 호출로 오류를 센다
+            bad = await c.call_tool("eots.track", {"enable": True}, raise_on_error=False)
+            assert bad.is_error
+            out = await c.call_tool("system.metrics", {"tool": "health"})
+            return before, out.structured_content
+
+    (health0, track0), out = asyncio.run(main())
+    assert counts("health") == (health0[0] + 3, health0[1])
+    assert counts("eots.track") == (track0[0] + 1, track0[1] + 1)
+    assert out["ok"] and list(out["tools"]) == ["health"] and out["tools"]["health"]["calls"] == health0[0] + 3
+    assert METRICS.in_flight == 0
@@ -0,0 +1,106 @@
+# tests/test_notify.py
+"""notify: 세션이 닫히면 (보낼 알림이 없어도) 구독자가 정리된다. 토픽 소스 모듈은 첫 구독 때 불러온다."""
+import asyncio
+import os
+import subprocess
+import sys
+import types
+
+from fastmcp import Client
+
+import notify
+from conftest import ROOT
+
+
+def test_subscriber_removed_when_session_closes(app):
+    hub = notify.HUB
+    closed = hub.closed_subscribers
+
+    async def run():
+        async with Client(app) as c:
+            res = await c.call_tool("notify.subscribe", {"topics": ["zones", "alerts"], "snapshot": False})
+            assert res.structured_content["ok"]
+            status = (await c.call_tool("notify.status", {})).structured_content["hub"]
+            assert status["subscribers"] == 1 and status["by_topic"]["zones"] == 1
+        # 세션 종료 직후: 조용한 토픽이라 전송 실패로는 정리될 일이 없다
+        return hub.status()
+
+    status = asyncio.run(run())
+    assert status["subscribers"] == 0
+    assert status["by_topic"]["zones"] == status["by_topic"]["alerts"] == 0
+    assert hub.closed_subscribers == closed + 1
+    assert not hub.wants("zones")
+
+
+class _FakeSession:
+    """_exit_stack 이 없는 세션 (종료 훅을 걸 수 없다)."""
+
+    def __init__(self):
+        self._write_stream = types.SimpleNamespace(_closed=False)
+
+
+def test_closed_session_without_exit_stack_is_swept():
+    hub = notify.NotifyHub()
+    live, gone = _FakeSession(), _FakeSession()
+
+    async def run():
+        hub.subscribe(live, ["zones"])
+        hub.subscribe(gone, ["zones", "alerts"])
+        assert hub.status()["subscribers"] == 2
+        gone._write_stream._closed = True  # 세션 수신 루프가 끝나 쓰기 스트림이 닫힘
+        return hub.status()
+
+    status = asyncio.run(run())
+    assert status["subscribers"] == 1 and status["by_topic"]["zones"] == 1 and status["by_topic"]["alerts"] == 0
+    assert hub.closed_subscribers == 1 and hub.subscriber(live) is not None and hub.subscriber(gone) is None
+
+
+def test_source_module_is_imported_on_first_subscribe(tmp_path, monkeypatch):
+    hub = notify.NotifyHub()
+    monkeypatch.setattr(notify, "HUB", hub)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "notify_lazy_src.py").write_text(
+        "import notify\nnotify.HUB.source('targets', lambda: {'T1': {'lat': 1.0}})\n")
+    (tmp_path / "notify_lazy_hook.py").write_text("LOADED = True\n")  # 소스 없이 publish 훅만 거는 모듈
+    hub.source("targets", "notify_lazy_src")
+    hub.source("alerts", "notify_lazy_hook")
+    hub.source("zones", lambda: {"Z": 1})
+    hub.source("zones", "not_imported")  # 이미 등록된 함수는 모듈 이름으로 덮지 않는다
+    assert "notify_lazy_src" not in sys.modules
+
+    async def run():
+        hub.subscribe(_FakeSession(), ["targets", "alerts", "zones"])
+        return {t: hub.snapshot(t) for t in ("targets", "alerts", "zones")}
+
+    try:
+        snap = asyncio.run(run())
+        assert "notify_lazy_src" in sys.modules and "notify_lazy_hook" in sys.modules
+    finally:
+        sys.modules.pop("notify_lazy_src", None)
+        sys.modules.pop("notify_lazy_hook", None)
+    assert snap == {"targets": {"count": 1, "items": {"T1": {"lat": 1.0}}},
+                    "alerts": {"count": 0, "items": {}},
+                    "zones": {"count": 1, "items": {"Z": 1}}}
+
+
+_LAZY = """
+import asyncio, sys, server_main
+from fastmcp import Client
+
+async def main():
+    async with Client(server_main.app) as c:
+        await c.call_tool("notify.subscribe", {"topics": ["zones", "system"]})
+        before = "eots_tools_core" in sys.modules
+        res = await c.call_tool("notify.subscribe", {"topics": ["ptz"]})
+        print(before, "eots_tools_core" in sys.modules, "pan" in res.structured_content["snapshot"]["ptz"]["items"])
+
+asyncio.run(main())
+"""
+
+
+def test_notify_tools_loads_topic_modules_lazily(tmp_path):
+    env = {**os.environ, "MCP_LAZY_TOOLS": "1", "MCP_TOOL_MANIFEST": str(tmp_path / "manifest.json")}
+    for _ in range(2):  # 1회차는 매니페스트를 만든다 (툴 모듈 전부 import)
+        out = subprocess.run([sys.executable, "-c", _LAZY], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+        assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "False True True"
@@ -0,0 +1,110 @@
+# tests/test_persist.py
+"""
+영속화: 스냅샷 + 저널 꼬리 재생으로 재시작 후 상태가 그대로인지, 스냅샷 복사가 upsert 와 겹쳐도 일관적인지.
+
+복구는 모듈 import 중에 일어나므로 기록/복구는 각각 PERSIST_DIR 을 준 하위 프로세스에서 돌린다.
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+
+from conftest import ROOT
+
+_SCRIPT = r"""
+import asyncio, json, sys
+import server_main
+import persist, target_tools, zone_tools, eots_tools_core as core
+from eots_state import DELETED
+from fastmcp import Client
+
+async def main(phase):
+    async with Client(server_main.app) as c:
+        if phase == "write":
+            await c.call_tool("zone.define", {"params": {"zone_id": "Z1", "polygon": [[0, 0], [0, 1], [1, 1], [1, 0]]}})
+            await c.call_tool("zone.set_rule", {"params": {"zone_id": "Z1", "rule": "speed_limit", "value": 12}})
+            for i in range(3):
+                await c.call_tool("target.register", {"params": {"target_id": f"T{i}", "cls": "vessel",
+                                                                 "lat": 5 + i, "lon": 5, "speed_kn": i}})
+            await c.call_tool("eots.set_tilt", {"tilt_deg": 7.5})
+            await c.call_tool("eots.set_tilt", {"tilt_deg": -3.0, "camera_id": "cam2"})
+            await c.call_tool("eots.pan_speed", {"delta": 0.5})
+            assert persist.PERSIST.snapshot() is not None
+            # 스냅샷 이후 변경은 저널 꼬리에서만 복구된다
+            await c.call_tool("target.register", {"params": {"target_id": "T9", "cls": "fishing", "lat": 0.5, "lon": 0.5}})
+            await c.call_tool("target.update_track", {"params": {"target_id": "T0", "lat": 6.25, "speed_kn": 3}})
+            await c.call_tool("eots.set_tilt", {"tilt_deg": 9.0})
+            core._FLEET.default.store.commit({"pan_speed": DELETED})  # 세션 되돌리기의 키 삭제
+            persist.PERSIST.journal.flush()
+        t = target_tools._TARGETS
+        print(json.dumps({
+            "targets": {tid: rec for tid, rec in t.items()},
+            "zones": sorted(zone_tools._ZONES), "rules": zone_tools._RULES,
+            "tilt": core._FLEET.default.store.snapshot.data["tilt"],
+            "tilt_cam2": core._FLEET.get("cam2").store.snapshot.data["tilt"],
+            "has_pan_speed": "pan_speed" in core._FLEET.default.store.snapshot.data,
+            "near": [x["target_id"] for x in target_tools._query_nearest(0.5, 0.5, 5.0, 10)],
+        }))
+
+asyncio.run(main(sys.argv[1]))
+"""
+
+
+def _run(phase, directory):
+    env = {**os.environ, "PERSIST_DIR": str(directory), "MCP_LAZY_TOOLS": "0", "EOTS_CAMERAS": "cam2",
+           "PERSIST_COMMIT_MS": "1"}
+    out = subprocess.run([sys.executable, "-c", _SCRIPT, phase], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_snapshot_and_journal_round_trip(tmp_path):
+    before = _run("write", tmp_path)
+    assert sorted(os.listdir(tmp_path)) == ["journal_00000002.bin", "snapshot_00000002.npz"]
+    after = _run("read", tmp_path)
+    assert after == before
+    assert after["targets"]["T0"]["lat"] == 6.25 and after["targets"]["T9"]["cls"] == "fishing"
+    assert (after["tilt"], after["tilt_cam2"]) == (9.0, -3.0)
+    assert not after["has_pan_speed"]  # 스냅샷에는 있던 키가 저널의 삭제로 지워진다
+    assert after["rules"]["Z1"] == {"rule": "speed_limit", "value": 12}
+    assert after["near"] == ["T9"]  # 공간 인덱스도 재구성
+
+
+def test_target_dump_is_consistent_with_concurrent_upserts():
+    from target_tools import _TargetStore
+
+    store = _TargetStore(capacity=4)  # 작은 용량: 복사 중에 _grow 도 일어난다
+    stop, bad = threading.Event(), []
+
+    def snapshots():
+        while not stop.is_set():
+            arrays, ids, cls = store.dump()
+            # 값은 복사 중에 바뀔 수 있지만(저널이 덮는다) 행 수와 id 는 항상 맞아야 한다
+            if not len(ids) == len(cls) == len(arrays["lat"]) or ids[-1:] != [f"t_{len(ids) - 1}"][:len(ids)]:
+                bad.append((len(ids), len(arrays["lat"])))
+
+    th = threading.Thread(target=snapshots)
+    th.start()
+    try:
+        for i in range(20000):
+            store.upsert(f"t_{i}", "vessel", lat=i % 90, lon=0.0)
+    finally:
+        stop.set()
+        th.join()
+    assert not bad
+    arrays, ids, _ = store.dump()
+    store2 = _TargetStore()
+    store2.load(ids, ["vessel"] * len(ids), arrays)
+    assert len(store2) == 20000 and store2["t_123"]["lat"] == 33.0
+
+
+def test_cold_start_does_not_import_persist(tmp_path):
+    # 매니페스트가 최신이면 server_main import 만으로는 persist(numpy)를 불러오지 않는다
+    env = {**os.environ, "MCP_LAZY_TOOLS": "1", "MCP_TOOL_MANIFEST": str(tmp_path / "manifest.json")}
+    code = "import sys, server_main; print(sorted({'persist', 'numpy'} & set(sys.modules)))"
+    for _ in range(2):  # 1회차는 매니페스트를 만든다 (툴 모듈 전부 import)
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+        assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "[]"
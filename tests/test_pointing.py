@@ -0,0 +1,68 @@
+# tests/test_pointing.py
+"""지향 해: 알려진 방위/부각/줌, 배열 계산 일치, zone 정의/재정의 시 캐시 갱신."""
+import math
+
+import numpy as np
+import pytest
+
+import eots_pointing
+from eots_pointing import EARTH_RADIUS_M, PointingSolver
+
+
+def test_known_bearing_depression_and_zoom():
+    s = PointingSolver(0.0, 0.0, 100.0)
+    north = s.solve(0.1, 0.0)
+    d = math.radians(0.1) * EARTH_RADIUS_M  # 자오선 위 0.1도 = 11.12 km
+    assert north.range_m == pytest.approx(d, rel=1e-9)
+    assert north.bearing_deg == pytest.approx(0.0, abs=1e-9) and north.pan_deg == pytest.approx(0.0, abs=1e-9)
+    # 부각 = atan((높이 + 곡률 강하 d^2 / (2 * 4/3 R)) / d) = 0.5528 도
+    assert north.tilt_deg == pytest.approx(-0.5528, abs=1e-4)
+    assert north.zoom == 30  # 최대 배율에서 잘림
+
+    assert s.solve(0.0, 0.1).bearing_deg == pytest.approx(90.0)
+    assert s.solve(-0.1, 0.0).bearing_deg == pytest.approx(180.0)
+    assert s.solve(1.0, 1.0).bearing_deg == pytest.approx(44.9956, abs=1e-4)  # 대권 초기 방위
+    # 1 km: 250 m 화면 폭(200 m / 0.8) -> tan(30°) * 1000 / 125 = 4.6 -> 4배
+    near = s.solve(1000.0 / (math.radians(1) * EARTH_RADIUS_M), 0.0)
+    assert near.range_m == pytest.approx(1000.0) and near.zoom == 4
+    assert near.tilt_deg == pytest.approx(-math.degrees(math.atan2(100.0 + 1000.0 ** 2 / (2 * EARTH_RADIUS_M * 4 / 3), 1000.0)))
+
+
+def test_pan_zero_and_wrap():
+    s = PointingSolver(0.0, 0.0, 10.0, pan_zero_deg=90.0)
+    assert s.solve(0.1, 0.0).pan_deg == pytest.approx(-90.0)
+    assert s.solve(0.0, 0.1).pan_deg == pytest.approx(0.0)
+    assert s.solve(0.0, -0.1).pan_deg == pytest.approx(-180.0)  # [-180, 180)
+
+
+def test_solve_many_matches_solve():
+    s = PointingSolver(37.22, 129.34, 30.0, pan_zero_deg=20.0)
+    rng = np.random.default_rng(0)
+    lat, lon = 37.22 + rng.uniform(-0.5, 0.5, 200), 129.34 + rng.uniform(-0.5, 0.5, 200)
+    pan, tilt = s.solve_many(lat, lon)
+    for i in range(0, 200, 7):
+        one = s.solve(float(lat[i]), float(lon[i]))
+        assert pan[i] == pytest.approx(one.pan_deg) and tilt[i] == pytest.approx(one.tilt_deg)
+
+
+def test_zone_solution_cached_and_refreshed_on_redefine(call):
+    small = [[37.30, 129.40], [37.30, 129.41], [37.31, 129.41], [37.31, 129.40]]
+    call("zone.define", {"params": {"zone_id": "PZ", "polygon": small}})
+    first = eots_pointing.CACHE.get("zone", "PZ")
+    assert first == eots_pointing.SOLVER.solve_polygon(np.array([p[0] for p in small]), np.array([p[1] for p in small]))
+    assert call("zone.move_camera", {"zone_id": "PZ"})["solution"]["bearing_deg"] == pytest.approx(first.bearing_deg)
+    big = [[37.0, 129.6], [37.0, 129.8], [37.2, 129.8], [37.2, 129.6]]
+    call("zone.define", {"params": {"zone_id": "PZ", "polygon": big}})
+    second = eots_pointing.CACHE.get("zone", "PZ")
+    assert second.bearing_deg != first.bearing_deg and second.zoom <= first.zoom
+    assert call("zone.move_camera", {"zone_id": "PZ"})["solution"]["bearing_deg"] == pytest.approx(second.bearing_deg)
+
+
+def test_preset_goto_uses_cached_solution(call):
+    defined = call("eots.preset_define", {"name": "breakwater", "lat": 37.25, "lon": 129.36, "extent_m": 400})
+    sol = defined["solution"]
+    assert sol == eots_pointing.SOLVER.solve(37.25, 129.36, 400.0).as_dict()
+    out = call("eots.goto_preset", {"name": "breakwater"})
+    assert out["solution"] == sol and out["preset"] == "breakwater"
+    state = call("eots.cameras")["cameras"][0]["state"]
+    assert (state["pan"], state["tilt"], state["zoom"]) == (sol["pan_deg"], sol["tilt_deg"], sol["zoom"])
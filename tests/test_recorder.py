@@ -0,0 +1,75 @@
+# tests/test_recorder.py
+"""녹화: 메모리 상한으로 잘린 pre-event 링을 먼저 내보내고 실시간 프레임을 빈틈없이 이어 쓰는지, writer 큐 상한."""
+import json
+import time
+
+import numpy as np
+
+from eots_recorder import PreEventBuffer, Recorder, SegmentWriter, SyntheticSource
+
+
+def _frame_no(frame):
+    return int(np.frombuffer(frame[0, :8].tobytes(), dtype=np.int64)[0])
+
+
+def _wait(cond, timeout=10.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < end, "timeout"
+        time.sleep(0.01)
+
+
+def test_pre_event_flush_respects_memory_cap(tmp_path):
+    src = SyntheticSource(width=64, height=32, fps=200.0)
+    frame_bytes = 64 * 32
+    # pre_event_s * fps = 2000 프레임이지만 메모리 상한이 20 프레임으로 자른다
+    rec = Recorder(src, str(tmp_path), pre_event_s=10.0, max_buffer_mb=20 * frame_bytes / 2**20,
+                   segment_frames=16, queue_frames=64)
+    assert rec.ring.capacity == 20 and rec.buffer_bytes == 20 * frame_bytes
+
+    rec.start_pipeline()
+    _wait(lambda: rec.ring.seq >= 60)  # 링이 여러 바퀴 돈 뒤
+    rec_id = rec.start("manual", "pier 3")
+    assert rec_id.endswith("_pier_3") and rec.recording
+    _wait(lambda: rec._writer.frames >= 60)
+    assert rec.stop() == rec_id and not rec.recording
+    rec._last.join(10.0)
+
+    doc = json.loads((tmp_path / rec_id / "manifest.json").read_text())
+    assert doc["complete"] and doc["error"] is None
+    assert doc["pre_event_frames"] + doc["pre_event_lost"] == 20  # 링에 있던 만큼만
+    assert doc["frames"] == sum(s["frames"] for s in doc["segments"])
+    assert all(s["frames"] == 16 for s in doc["segments"][:-1])
+
+    numbers, stamps = [], []
+    for s in doc["segments"]:
+        frames = np.load(tmp_path / rec_id / s["file"], mmap_mode="r")[: s["frames"]]
+        ts = np.load(tmp_path / rec_id / (s["file"][:-4] + ".ts.npy"))
+        assert len(ts) == s["frames"] and (ts[0], ts[-1]) == (s["t0"], s["t1"])
+        numbers += [_frame_no(f) for f in frames]
+        stamps += ts.tolist()
+    assert len(numbers) == doc["frames"]
+    # pre-event 구간과 실시간 구간 사이에 중복/역순이 없고, 드롭이 없으면 빈틈도 없다
+    assert numbers == sorted(set(numbers)) and stamps == sorted(stamps)
+    if doc["dropped"] == 0 and doc["pre_event_lost"] == 0:
+        assert numbers == list(range(numbers[0], numbers[0] + len(numbers)))
+
+
+def test_pre_event_seconds_bound_ring_below_memory_cap(tmp_path):
+    rec = Recorder(SyntheticSource(width=64, height=32, fps=10.0), str(tmp_path), pre_event_s=3.0)
+    assert rec.ring.capacity == 30 and rec.status()["pre_event"]["seconds"] == 3.0
+
+
+def test_writer_queue_is_bounded_and_drops(tmp_path):
+    ring = PreEventBuffer(4, (2, 2), np.uint8)
+    for i in range(4):
+        ring.push(float(i), np.full((2, 2), i, dtype=np.uint8))
+    w = SegmentWriter(str(tmp_path / "r"), ring, ring.oldest(), ring.seq, 8, 2, {})
+    frame = np.zeros((2, 2), dtype=np.uint8)
+    w.offer(ring.seq, 3.0, frame)  # pre-event 구간에서 기록될 프레임은 큐에 넣지 않는다
+    for seq in range(4, 9):
+        w.offer(seq, float(seq), frame)
+    assert (w.q.qsize(), w.dropped) == (2, 3)
+    # 이미 덮어써진 링 슬롯은 복사하지 않는다
+    ring.push(4.0, frame)
+    assert ring.copy_into(0, frame.copy()) is None and ring.copy_into(4, frame.copy()) == 4.0
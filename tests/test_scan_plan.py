@@ -0,0 +1,91 @@
+# tests/test_scan_plan.py
+"""오토스캔 경로 계획: 2-opt 국소 최적성, 커버리지 셀이 구역 샘플을 모두 덮는지, 계획 결과/툴 등록."""
+import numpy as np
+import pytest
+
+import eots_scan_plan as sp
+import zone_tools as zt
+from eots_pointing import PointingSolver
+from eots_scan import slew_time
+
+_RATES = (40.0, 20.0)
+
+
+def _zones():
+    return [
+        zt._CompiledZone("near", [[37.24, 129.36], [37.24, 129.38], [37.26, 129.38], [37.26, 129.36]]),
+        zt._CompiledZone("wide", [[37.0, 129.5], [37.1, 129.9], [37.3, 129.7]]),
+        zt._CompiledZone("west", [[37.20, 129.10], [37.22, 129.10], [37.21, 129.20]]),
+    ]
+
+
+def _dist(pts):
+    return np.hypot(*(pts[:, None, :] - pts[None, :, :]).transpose(2, 0, 1))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_two_opt_is_locally_optimal_and_not_worse_than_nn(seed):
+    d = _dist(np.random.default_rng(seed).uniform(0, 100, (25, 2)))
+    nn = sp.nearest_neighbour(d, 3)
+    assert nn[0] == 3 and sorted(nn.tolist()) == list(range(25))
+    order = sp.two_opt(nn, d)
+    assert sorted(order.tolist()) == list(range(25))
+    assert sp._tour_cost(order, d) <= sp._tour_cost(nn, d) + 1e-9
+    # 더 줄일 수 있는 구간 뒤집기가 남아 있지 않아야 한다 (닫힌 순회 기준 전수 확인)
+    n = len(order)
+    for i in range(n):
+        for j in range(i + 2, n):
+            if i == 0 and j == n - 1:
+                continue
+            a, b, c, e = order[i], order[i + 1], order[j], order[(j + 1) % n]
+            assert d[a, b] + d[c, e] - d[a, c] - d[b, e] <= 1e-9
+
+
+def test_coverage_cells_cover_every_zone_sample():
+    solver = PointingSolver(37.22, 129.34, 30.0)
+    zones = _zones()
+    pan, tilt = sp.coverage_cells(zones, solver, 4.0)
+    hfov, vfov = solver.fov_deg(4.0)
+    assert 0 < len(pan) == len(tilt)
+    # 구역 꼭짓점과 내부 점은 모두 자기 셀의 조준점에서 화각 한 칸 이내에 있다
+    rng = np.random.default_rng(1)
+    for z in zones:
+        lat = rng.uniform(z.bbox[0], z.bbox[2], 300)
+        lon = rng.uniform(z.bbox[1], z.bbox[3], 300)
+        keep = z.contains(lat, lon)
+        p, t = solver.solve_many(np.r_[lat[keep], z.vlat], np.r_[lon[keep], z.vlon])
+        dp = np.abs((p[:, None] - pan[None, :] + 180.0) % 360.0 - 180.0)
+        dt = np.abs(t[:, None] - tilt[None, :])
+        assert np.all(np.any((dp < hfov) & (dt < vfov), axis=1)), z.zone_id
+
+
+def test_plan_route_starts_near_camera_and_reports_costs():
+    solver = PointingSolver(37.22, 129.34, 30.0)
+    zones = _zones()
+    start = (-120.0, 0.0)
+    spec, stats = sp.plan_route(zones, solver, _RATES, name="t", zoom=4.0, dwell_s=2.0, start=start)
+    pan, tilt = sp.coverage_cells(zones, solver, 4.0)
+    assert stats["cells"] == len(pan) == len(spec.waypoints) and stats["zones"] == 3
+    slew = stats["slew_s"]
+    assert slew["two_opt"] <= min(slew["nearest_neighbour"], slew["sweep"])
+    assert stats["period_s"] == pytest.approx(slew["two_opt"] + 2.0 * len(pan), abs=1e-2)
+
+    wp = spec.waypoints
+    first = int(np.argmin(slew_time(start[0], start[1], pan, tilt, _RATES)))
+    assert (wp[0].pan, wp[0].tilt) == pytest.approx((pan[first], tilt[first]))
+    # 경로의 (닫힌) 슬루 합이 보고된 값과 일치하고, 모든 셀을 한 번씩 지난다
+    wp_pan, wp_tilt = np.array([w.pan for w in wp]), np.array([w.tilt for w in wp])
+    legs = slew_time(wp_pan, wp_tilt, np.roll(wp_pan, -1), np.roll(wp_tilt, -1), _RATES)
+    assert float(legs.sum()) == pytest.approx(slew["two_opt"], abs=1e-2)
+    assert sorted(zip(wp_pan.round(9), wp_tilt.round(9))) == sorted(zip(pan.round(9), tilt.round(9)))
+    assert all(w.zoom == 4 and w.dwell_s == 2.0 for w in wp)
+
+    assert sp.plan_route([], solver, _RATES) == (None, {"zones": 0, "cells": 0, "zoom": 4.0})
+
+
+def test_auto_scan_plan_tool_registers_pattern(call):
+    call("zone.define", {"params": {"zone_id": "SP1", "polygon": [[37.24, 129.36], [37.24, 129.38], [37.26, 129.38]]}})
+    out = call("eots.auto_scan_plan", {"name": "coverage", "zoom": 6, "dwell_s": 0.5})
+    assert out["ok"] and out["pattern"] == "coverage" and out["plan"]["cells"] >= 1
+    listed = call("eots.auto_scan_list", {})
+    assert "coverage" in listed["patterns"]
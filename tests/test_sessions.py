@@ -0,0 +1,112 @@
+# tests/test_sessions.py
+import asyncio
+
+import pytest
+from fastmcp import Client
+
+import eots_tools_core as core
+from eots_driver import DriverError
+from eots_state import DELETED
+
+
+class _StubDriver:
+    """send 를 기다리는 동안 on_send 를 실행하고, fail=True 면 장비 오류를 낸다."""
+
+    def __init__(self, on_send=None, fail=False):
+        self.on_send, self.fail, self.sent = on_send, fail, []
+
+    async def send(self, cmd, **args):
+        self.sent.append((cmd, args))
+        await asyncio.sleep(0)
+        if self.on_send is not None:
+            self.on_send()
+        if self.fail:
+            raise DriverError("rejected")
+        return {}
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    def install(**kw):
+        stub = _StubDriver(**kw)
+        monkeypatch.setattr(core._FLEET.default, "driver", stub)
+        return stub
+    return install
+
+
+def _run(app, fn):
+    async def main():
+        async with Client(app) as a, Client(app) as b:
+            return await fn(a, b)
+    return asyncio.run(main())
+
+
+def test_session_conflict_applies_nothing(app):
+    async def scenario(a, b):
+        await a.call_tool("eots.session_begin", {})
+        await a.call_tool("eots.set_pan", {"pan_deg": 10})
+        await b.call_tool("eots.set_pan", {"pan_deg": -20})  # 다른 클라이언트가 같은 키를 먼저 바꿈
+        res = await a.call_tool("eots.session_commit", {})
+        return res.data
+
+    out = _run(app, scenario)
+    assert out["ok"] is False and out["error"] == "conflict" and out["keys"] == ["pan"]
+    assert core._FLEET.default.state["pan"] == -20
+
+
+def test_session_commit_survives_write_during_device_send(app, driver):
+    # 장비 응답을 기다리는 동안 같은 키에 쓰기가 끼어들어도, 장비가 이미 움직였으므로 커밋은 성공으로 보고되고
+    # 저장소에는 나중 쓰기가 남는다 (예전 순서는 여기서 conflict 를 돌려줬다)
+    driver(on_send=lambda: core._FLEET.default.store.commit({"tilt": 5.0}))
+
+    async def scenario(a, b):
+        await a.call_tool("eots.session_begin", {})
+        await a.call_tool("eots.set_tilt", {"tilt_deg": 12})
+        return (await a.call_tool("eots.session_commit", {})).data
+
+    out = _run(app, scenario)
+    assert out["ok"] and out["applied"] == {"tilt": 12}
+    assert core._FLEET.default.state["tilt"] == 5.0
+
+
+def test_session_commit_rolls_back_on_device_error(app, driver):
+    # ir_polarity 는 세션 전에 없던 키: 되돌리면 None 이 아니라 키가 없어야 한다
+    core._FLEET.default.store.commit({"tilt": 1.0, "zoom": 2, "ir_polarity": DELETED})
+    # 장비 응답 대기 중 zoom 은 다른 쓰기가 다시 바꿨으므로 되돌리지 않는다
+    driver(fail=True, on_send=lambda: core._FLEET.default.store.commit({"zoom": 5}))
+
+    async def scenario(a, b):
+        await a.call_tool("eots.session_begin", {})
+        await a.call_tool("eots.apply", {"tilt_deg": 30, "zoom": 7, "ir_polarity": "white_hot"})
+        res = await a.call_tool("eots.session_commit", {}, raise_on_error=False)
+        return res.is_error
+
+    assert _run(app, scenario) is True
+    state = core._FLEET.default.state
+    assert state["tilt"] == 1.0 and state["zoom"] == 5
+    assert "ir_polarity" not in core._FLEET.default.store.snapshot.data
+
+
+def test_rolled_back_pan_speed_leaves_no_none(app, driver):
+    core._FLEET.default.store.commit({"pan_speed": DELETED})
+    driver(fail=True)
+
+    async def rejected(a, b):
+        await a.call_tool("eots.session_begin", {})
+        await a.call_tool("eots.pan_speed", {"delta": 0.2})
+        return (await a.call_tool("eots.session_commit", {}, raise_on_error=False)).is_error
+
+    assert _run(app, rejected) is True
+    assert "pan_speed" not in core._FLEET.default.store.snapshot.data
+
+    # pan_speed 를 읽는 스캔 툴과 이후 증감이 그대로 동작해야 한다 (None 이 남으면 TypeError)
+    driver()
+
+    async def after(a, b):
+        listed = await a.call_tool("eots.auto_scan_list", {})
+        speed = await a.call_tool("eots.pan_speed", {"delta": 0.1})
+        return listed.structured_content, speed.structured_content
+
+    listed, speed = _run(app, after)
+    assert listed["ok"]
+    assert speed["pan_speed"] == pytest.approx(0.1)
@@ -0,0 +1,100 @@
+# tests/test_system_monitor.py
+"""시스템 상태 샘플러: /proc 파싱과 직전 샘플 대비 CPU%, 루프 지연 프로브, system.status 가 캐시된 샘플만 읽는지."""
+import asyncio
+import threading
+import time
+
+import pytest
+
+import system_monitor
+import system_tools
+from metrics import ToolMetrics
+from system_monitor import StatusSampler
+
+
+def _proc_stat(utime, stime):
+    return "4242 (eots server) S " + " ".join(["0"] * 10 + [str(utime), str(stime)] + ["0"] * 6)
+
+
+@pytest.fixture
+def fake_proc(monkeypatch):
+    files = {
+        "/proc/stat": "cpu  100 0 100 700 100 0 0 0 0 0\ncpu0 1 2 3 4\n",
+        "/proc/self/stat": _proc_stat(10, 5),
+        "/proc/meminfo": "MemTotal:       1000 kB\nMemFree:         100 kB\nMemAvailable:    250 kB\n",
+        "/proc/self/statm": "1000 50 10 1 0 20 0\n",
+        "/proc/uptime": "90061.5 12345.0\n",
+    }
+    monkeypatch.setattr(system_monitor, "_read", files.get)
+    return files
+
+
+def test_sample_parses_proc_and_diffs_cpu(fake_proc):
+    s = StatusSampler(ToolMetrics(), interval_s=60.0)
+    s.add_gauge("queue", lambda: 3)
+    s.add_gauge("broken", lambda: 1 // 0)
+    first = s.sample()
+    assert first["cpu"] is None and first["detail"]["process_cpu_pct"] is None  # 비교할 직전 샘플이 없다
+    assert first["mem"] == "75%" and first["detail"]["mem_total_mb"] == round(1000 * 1024 / 2**20, 1)
+    assert first["detail"]["process_rss_mb"] == round(50 * system_monitor._PAGE / 2**20, 1)
+    assert first["uptime"] == "1d 1h 1m" and first["detail"]["uptime_s"] == 90061.5
+    assert first["detail"]["queues"] == {"queue": 3, "broken": None}
+    assert first["detail"]["loop_lag_ms"] is None  # 툴 호출 전이라 루프를 모른다
+
+    # busy 200/1000 -> 500/2000: 구간 CPU 는 300/1000
+    fake_proc["/proc/stat"] = "cpu  400 0 100 1300 200 0 0 0 0 0\n"
+    fake_proc["/proc/self/stat"] = _proc_stat(10 + system_monitor._CLK_TCK, 5)
+    second = s.sample()
+    assert second["cpu"] == "30%" and second["detail"]["cpu_pct"] == 30.0
+    assert second["detail"]["process_cpu_pct"] > 0
+    assert s.samples == 2
+
+
+def test_sample_without_proc(monkeypatch):
+    monkeypatch.setattr(system_monitor, "_read", lambda path: None)
+    s = StatusSampler(ToolMetrics())
+    s.sample()
+    out = s.sample()
+    assert (out["cpu"], out["mem"], out["uptime"]) == (None, None, None)
+    assert out["server_uptime"] is not None
+
+
+def test_loop_lag_probe():
+    m = ToolMetrics()
+    loop = asyncio.new_event_loop()
+    th = threading.Thread(target=loop.run_forever, daemon=True)
+    th.start()
+    try:
+        m.loop = loop
+        s = StatusSampler(m)
+        assert s.sample()["detail"]["loop_lag_ms"] is None  # 첫 프로브를 넣기만 한다
+        time.sleep(0.05)
+        lag = s.sample()["detail"]["loop_lag_ms"]
+        assert lag is not None and 0 <= lag < 50
+
+        # 루프가 막혀 있으면 아직 안 돈 프로브의 경과 시간을 보고한다
+        blocked = threading.Event()
+        loop.call_soon_threadsafe(lambda: blocked.wait(5))
+        time.sleep(0.02)
+        s.sample()
+        time.sleep(0.1)
+        assert s.sample()["detail"]["loop_lag_ms"] >= 100
+        blocked.set()
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        th.join(5)
+        loop.close()
+
+
+def test_status_tool_serves_cached_sample(call, monkeypatch, fake_proc):
+    s = StatusSampler(ToolMetrics(), interval_s=3600.0)
+    monkeypatch.setattr(system_tools, "SAMPLER", s)
+    try:
+        a = call("system.status", {})  # 처음 호출에서 샘플러를 띄우고 1회 채운다
+        fake_proc["/proc/meminfo"] = "MemTotal: 1000 kB\nMemAvailable: 900 kB\n"
+        b = call("system.status", {})
+    finally:
+        s.stop()
+    assert s.started and s.samples == 1
+    assert a["ok"] and a["sampled_at"] == b["sampled_at"] == s.latest["sampled_at"]
+    assert b["mem"] == "75%" and b["age_s"] >= 0  # 요청 경로는 /proc 를 다시 읽지 않는다
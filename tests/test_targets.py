@@ -0,0 +1,187 @@
+# tests/test_targets.py
+"""표적 저장소/공간 인덱스/CPA/예측: 전수(brute-force) 계산과 알려진 값으로 비교."""
+import random
+
+import numpy as np
+import pytest
+
+import target_tools as tt
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """빈 표적 테이블과 인덱스로 바꿔 끼운다 (다른 테스트가 등록한 표적과 섞이지 않게)."""
+    monkeypatch.setattr(tt, "_TARGETS", tt._TargetStore())
+    monkeypatch.setattr(tt, "_INDEX", tt._GridIndex())
+    monkeypatch.setattr(tt, "_HISTORY", tt._TrackHistory())
+    monkeypatch.setattr(tt, "_PREDICT", tt._PredictCache())
+    return tt
+
+
+def _fill(t, n, rng, lat0=35.0, lon0=129.0, spread=1.0):
+    for i in range(n):
+        lat, lon = lat0 + rng.uniform(-spread, spread), lon0 + rng.uniform(-spread, spread)
+        r = t._TARGETS.upsert(f"T{i}", "vessel", lat=lat, lon=lon, speed_kn=rng.uniform(0, 30),
+                              heading_deg=rng.uniform(0, 359))
+        t._INDEX.upsert(r, lat, lon)
+
+
+@pytest.mark.parametrize("lat0", [35.0, 78.0])  # 고위도: 경도 폭 경계가 가장 넓어지는 쪽
+def test_query_nearest_matches_brute_force(fresh, lat0):
+    rng = random.Random(1)
+    _fill(fresh, 1500, rng, lat0=lat0)
+    recs = list(fresh._TARGETS.values())
+    for _ in range(100):
+        lat, lon = lat0 + rng.uniform(-1.2, 1.2), 129.0 + rng.uniform(-1.2, 1.2)
+        radius, limit = rng.choice([0.5, 3.0, 20.0, 150.0]), rng.choice([1, 5, 50, 5000])
+        d = sorted((fresh._km(lat, lon, r["lat"], r["lon"]), r["target_id"]) for r in recs)
+        want = [(tid, km) for km, tid in d if km <= radius][:limit]
+        got = fresh._query_nearest(lat, lon, radius, limit)
+        assert [x["target_id"] for x in got] == [tid for tid, _ in want]
+        assert [x["km"] for x in got] == [round(km, 2) for _, km in want]
+        # candidates 는 반경 안 표적을 모두 포함하는 상위 집합
+        inside = {fresh._TARGETS.row[tid] for km, tid in d if km <= radius}
+        assert inside <= set(fresh._INDEX.candidates(lat, lon, radius))
+
+
+def test_grid_index_moves_and_removes(fresh):
+    idx = fresh._GridIndex(cell_deg=0.1)
+    idx.upsert(1, 35.01, 129.01)
+    idx.upsert(1, 36.51, 129.01)  # 다른 칸으로 이동: 이전 칸에서 빠진다
+    assert idx.candidates(35.01, 129.01, 1.0) == []
+    assert idx.candidates(36.51, 129.01, 1.0) == [1]
+    idx.remove(1)
+    assert idx.candidates(36.51, 129.01, 1.0) == [] and not idx._cells
+
+
+def _put(t, tid, lat, lon, speed_kn=0.0, heading_deg=0.0):
+    r = t._TARGETS.upsert(tid, "vessel", lat=lat, lon=lon, speed_kn=speed_kn, heading_deg=heading_deg)
+    t._INDEX.upsert(r, lat, lon)
+    return r
+
+
+def _east(lat, lon, km):
+    return lon + km / (tt._KM_PER_DEG * np.cos(np.radians(lat)))
+
+
+def test_cpa_kernel_head_on_and_diverging():
+    # 정면: 18.52 km 떨어져 상대 속도 37.04 km/h (각 10 kn) 로 마주 옴, 1 km 옆으로 비껴 있음
+    t, d = tt._cpa(np.array([18.52, 18.52, 3.0, 0.0]), np.array([1.0, 0.0, 4.0, 0.0]),
+                   np.array([-37.04, 37.04, 0.0, 0.0]), np.array([0.0, 0.0, 0.0, 0.0]))
+    assert t[0] * 60 == pytest.approx(30.0) and d[0] == pytest.approx(1.0)
+    assert t[1] == 0.0 and d[1] == pytest.approx(np.hypot(18.52, 0.0))  # 멀어지는 쌍: 지금이 CPA
+    assert t[2] == 0.0 and d[2] == pytest.approx(5.0)  # 정지: 지금이 CPA
+    assert (t[3], d[3]) == (0.0, 0.0)
+
+
+def test_target_cpa_pairwise(fresh, call, monkeypatch):
+    lat = 35.0
+    _put(fresh, "A", lat, 129.0, 10.0, 90.0)
+    _put(fresh, "B", lat + 1.0 / tt._KM_PER_DEG, _east(lat, 129.0, 18.52), 10.0, 270.0)  # A 와 정면, 1 km 북쪽
+    _put(fresh, "C", lat - 0.2, 129.0, 10.0, 180.0)  # A 에서 남쪽으로 멀어짐
+    out = call("target.cpa", {"params": {"mode": "pairwise"}})
+    pairs = {(x["target_id"], x["other_id"]): x for x in out["results"]}
+    assert out["ok"] and out["count"] == 3
+    # 쌍 모드는 선택된 표적들의 평균 위도 평면에서 계산한다
+    dx = 18.52 * np.cos(np.radians((3 * lat - 0.2 + 1.0 / tt._KM_PER_DEG) / 3)) / np.cos(np.radians(lat))
+    ab = pairs[("A", "B")]
+    assert ab["tcpa_min"] == pytest.approx(dx / 37.04 * 60, abs=0.01) and ab["dcpa_km"] == pytest.approx(1.0, abs=1e-3)
+    assert ab["range_km"] == pytest.approx(np.hypot(dx, 1.0), abs=1e-3)
+    ac = pairs[("A", "C")]
+    assert ac["tcpa_min"] == 0 and ac["dcpa_km"] == ac["range_km"] == pytest.approx(0.2 * tt._KM_PER_DEG, abs=1e-3)
+    assert out["results"][0]["target_id"] == "A" and out["results"][0]["other_id"] == "B"  # dcpa 오름차순
+
+    out = call("target.cpa", {"params": {"mode": "pairwise", "within_km": 2.0, "target_ids": ["A", "B", "X"]}})
+    assert out["count"] == 1 and out["missing"] == ["X"]
+    out = call("target.cpa", {"params": {"mode": "pairwise", "max_tcpa_min": 20.0}})
+    assert ("A", "B") not in {(x["target_id"], x["other_id"]) for x in out["results"]}
+
+    monkeypatch.setattr(tt, "_CPA_PAIR_MAX", 2)
+    assert call("target.cpa", {"params": {"mode": "pairwise"}}) == {
+        "ok": False, "error": "too_many_targets", "max": 2, "count": 3}
+    assert call("target.cpa", {"params": {"mode": "pairwise", "target_ids": ["A", "B"]}})["count"] == 1
+    assert call("target.cpa", {"params": {"max_tcpa_min": 1e6}})["count"] == 3  # site 모드는 쌍 상한과 무관
+
+
+def test_target_cpa_site_with_track_velocity(fresh, call):
+    lat0, lon0 = 35.0, 129.0
+    south = lat0 - 5.0 / tt._KM_PER_DEG
+    r = _put(fresh, "S", south, lon0)  # 보고 속도 0
+    # 6분 동안 1 km 북진한 항적 -> 10 km/h 로 사이트를 향함
+    for k in range(4):
+        fresh._HISTORY.record(np.array([r]), 1000.0 + 120.0 * k, np.array([south - (3 - k) / 3 / tt._KM_PER_DEG]),
+                              np.array([lon0]))
+    vx, vy, ok = fresh._HISTORY.velocity_kmh(np.array([r, r + 1]))
+    assert ok.tolist() == [True, False] and vx[0] == pytest.approx(0.0) and vy[0] == pytest.approx(10.0)
+
+    reported = call("target.cpa", {"params": {"lat": lat0, "lon": lon0}})["results"][0]
+    assert reported["tcpa_min"] == 0 and reported["dcpa_km"] == pytest.approx(5.0, abs=1e-3)
+    track = call("target.cpa", {"params": {"lat": lat0, "lon": lon0, "velocity": "track"}})["results"][0]
+    assert track["tcpa_min"] == pytest.approx(30.0, abs=0.01) and track["dcpa_km"] == pytest.approx(0.0, abs=1e-3)
+
+
+def test_track_history_velocity_uses_oldest_kept_fix():
+    h = tt._TrackHistory(depth=3)
+    rows = np.array([0, 1])
+    for k in range(5):  # 링이 한 바퀴 넘게 돈다: 남은 fix 는 k = 2, 3, 4
+        lat = np.array([35.0 + k * 0.01, 35.0])
+        lon = np.array([129.0, 129.0 + (0.5 if k == 4 else 0.0)])
+        h.record(rows, 3600.0 * k, lat, lon)
+    vx, vy, ok = h.velocity_kmh(rows)
+    assert ok.all()
+    assert vy[0] == pytest.approx(0.01 * tt._KM_PER_DEG) and vx[0] == pytest.approx(0.0)
+    assert vx[1] == pytest.approx(0.5 * tt._KM_PER_DEG * np.cos(np.radians(35.0)) / 2)  # 2시간 전 fix 기준
+    assert [f["t"] for f in h.track(0, 10)] == [7200.0, 10800.0, 14400.0]
+    same_time = tt._TrackHistory(depth=3)
+    same_time.record(np.array([0]), 5.0, np.array([1.0]), np.array([1.0]))
+    same_time.record(np.array([0]), 5.0, np.array([2.0]), np.array([1.0]))
+    assert not same_time.velocity_kmh(np.array([0]))[2][0]  # 경과 시간 0
+
+
+def test_predict_cache_hits_within_version(fresh):
+    _put(fresh, "A", 35.0, 129.0, 10.0, 0.0)
+    cache = fresh._PREDICT
+    first = cache.get(3600.0)
+    assert cache.get(3600.0) is first and (cache.hits, cache.misses) == (1, 1)
+    other = cache.get(60.0)
+    assert other is not first and cache.misses == 2 and len(cache._entries) == 2
+    assert first[0][0] == pytest.approx(35.0 + 18.52 / tt._KM_PER_DEG) and first[1][0] == pytest.approx(129.0)
+
+    _put(fresh, "B", 36.0, 129.0)  # 쓰기마다 버전이 올라가고 이전 버전 항목은 버려진다
+    again = cache.get(3600.0)
+    assert again is not first and cache.misses == 3 and list(cache._entries) == [(fresh._TARGETS.version, 3600.0)]
+    assert len(again[0]) >= 2
+
+    small = tt._PredictCache(size=2)
+    for h in (1.0, 2.0, 3.0):
+        small.get(h)
+    assert [k[1] for k in small._entries] == [2.0, 3.0]  # 가장 오래 안 쓴 항목부터 밀려난다
+
+
+def test_target_predict_selection(fresh, call):
+    for i in range(6):
+        _put(fresh, f"P{i}", 35.0 + i * 0.1, 129.0, 10.0, 90.0)
+    out = call("target.predict", {"params": {"t_offset_s": 1800}})
+    assert out["count"] == 6 and not out["truncated"] and out["version"] == fresh._TARGETS.version
+    p0 = out["results"][0]
+    assert p0["target_id"] == "P0" and p0["km"] == pytest.approx(9.26, abs=1e-3) and p0["lat"] == pytest.approx(35.0)
+    assert p0["lon"] == pytest.approx(round(_east(35.0, 129.0, 9.26), 6), abs=1e-5)
+    hits = fresh._PREDICT.hits
+
+    out = call("target.predict", {"params": {"t_offset_s": 1800, "bbox": [35.15, 128.0, 35.45, 130.0], "limit": 2}})
+    assert out["count"] == 3 and out["truncated"] and [x["target_id"] for x in out["results"]] == ["P2", "P3"]
+    assert fresh._PREDICT.hits == hits + 1  # 같은 버전/시간: 필터만 다르고 전파는 재사용
+
+    out = call("target.predict", {"params": {"t_offset_s": 1800, "ids": ["P5", "nope", "P1"],
+                                             "bbox": [35.0, 128.0, 35.35, 130.0]}})
+    assert [x["target_id"] for x in out["results"]] == ["P1"] and out["missing"] == ["nope"] and out["count"] == 1
+
+    assert fresh._PREDICT.hits == hits + 2
+
+    # 쓰기 뒤에는 캐시를 쓰지 않고 새 침로로 다시 계산한다
+    misses = fresh._PREDICT.misses
+    call("target.update_track", {"params": {"target_id": "P1", "heading_deg": 0.0}})
+    out = call("target.predict", {"params": {"t_offset_s": 1800, "ids": ["P1"]}})
+    assert out["results"][0]["lat"] == pytest.approx(35.1 + 9.26 / tt._KM_PER_DEG, abs=1e-6)
+    assert (fresh._PREDICT.hits, fresh._PREDICT.misses) == (hits + 2, misses + 1)
+    assert out["version"] == fresh._TARGETS.version
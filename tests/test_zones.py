@@ -0,0 +1,124 @@
+# tests/test_zones.py
+"""
+구역: 폴리곤 포함 판정/구역 인덱스(스칼라 ray casting 과 비교), zone.move_camera 의 명령 큐 순서.
+"""
+import asyncio
+import random
+
+import numpy as np
+from fastmcp import Client
+
+import eots_tools_core as core
+import zone_tools as zt
+
+
+class _GateDriver:
+    """첫 send 는 release 될 때까지 응답하지 않는다."""
+
+    def __init__(self):
+        self.sent, self.gate = [], None
+
+    async def send(self, cmd, **args):
+        self.sent.append(cmd)
+        if len(self.sent) == 1:
+            await self.gate.wait()
+        return {}
+
+
+def test_move_camera_waits_for_queued_commands(app, monkeypatch):
+    drv = _GateDriver()
+    monkeypatch.setattr(core._FLEET.default, "driver", drv)
+
+    async def main():
+        drv.gate = asyncio.Event()
+        async with Client(app) as c:
+            res = await c.call_tool("zone.define", {"params": {"zone_id": "QZ", "polygon": [[1, 1], [1, 2], [2, 2], [2, 1]]}})
+            assert res.structured_content["ok"]
+            tilt = asyncio.create_task(c.call_tool("eots.set_tilt", {"tilt_deg": 12.0}))
+            while not drv.sent:
+                await asyncio.sleep(0)
+            move = asyncio.create_task(c.call_tool("zone.move_camera", {"zone_id": "QZ"}))
+            for _ in range(50):
+                await asyncio.sleep(0)
+            assert drv.sent == ["set_tilt"] and core._FLEET.default.queue_depth == 1
+            drv.gate.set()
+            await tilt
+            return (await move).structured_content
+
+    out = asyncio.run(main())
+    assert drv.sent == ["set_tilt", "apply"]
+    assert out["ok"] and out["zone_id"] == "QZ"
+    # 구역 지향이 나중에 반영되었다
+    assert core._FLEET.default.state["tilt"] == out["solution"]["tilt_deg"]
+
+
+# ---- 폴리곤 포함 판정 / 구역 인덱스 ----
+
+def _ray_cast(poly, lat, lon):
+    """기준 구현: 점 하나에 대한 스칼라 even-odd 교차 판정."""
+    inside = False
+    n = len(poly)
+    for i in range(n):
+        (y0, x0), (y1, x1) = poly[i], poly[(i + 1) % n]
+        if (y0 > lat) != (y1 > lat) and lon < x0 + (lat - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _random_polygon(rng, lat0, lon0, size):
+    # 중심 주위 별 모양 (오목한 꼭짓점 포함)
+    k = rng.randint(3, 12)
+    angles = sorted(rng.uniform(0, 2 * np.pi) for _ in range(k))
+    return [[lat0 + size * rng.uniform(0.2, 1.0) * np.sin(a), lon0 + size * rng.uniform(0.2, 1.0) * np.cos(a)]
+            for a in angles]
+
+
+def _check_index(idx, polys, rng):
+    # 잎 구조: 모든 슬롯이 정확히 한 잎에, 잎 크기 <= node_size, 잎 bbox 가 구성원 bbox 를 덮는다
+    members = np.concatenate(idx.leaves)
+    assert sorted(members.tolist()) == sorted(idx.slot.values())
+    for leaf, m in enumerate(idx.leaves):
+        assert 0 < len(m) <= idx.node_size
+        lb, b = idx.leaf_bbox[leaf], idx.bbox[m]
+        assert lb[0] <= b[:, 0].min() and lb[1] <= b[:, 1].min() and lb[2] >= b[:, 2].max() and lb[3] >= b[:, 3].max()
+        assert all(idx.leaf_of[s] == leaf for s in m.tolist())
+    lat = np.array([rng.uniform(-1, 11) for _ in range(800)])
+    lon = np.array([rng.uniform(-1, 11) for _ in range(800)])
+    member = idx.classify(lat, lon)
+    for zid, poly in polys.items():
+        want = np.array([_ray_cast(poly, a, o) for a, o in zip(lat, lon)])
+        assert np.array_equal(member[:, idx.slot[zid]], want), zid
+        assert np.array_equal(zt._CompiledZone(zid, poly).contains(lat, lon), want)
+    for a, o in zip(lat[:100], lon[:100]):
+        assert sorted(idx.contains(a, o)) == sorted(z for z, p in polys.items() if _ray_cast(p, a, o))
+
+
+def test_zone_index_matches_ray_casting():
+    rng = random.Random(3)
+    idx = zt._ZoneIndex(node_size=4)
+    polys = {}
+    for i in range(40):  # 4 -> 6 -> 9 -> ... 개를 넘을 때마다 다시 pack
+        zid = f"R{i}"
+        polys[zid] = _random_polygon(rng, rng.uniform(0, 10), rng.uniform(0, 10), rng.uniform(0.1, 2.0))
+        idx.put(zt._CompiledZone(zid, polys[zid]))
+        if i in (3, 4, 12, 39):
+            _check_index(idx, polys, rng)
+    assert idx._packed > idx.node_size
+    # 재정의: 슬롯은 그대로, 잎 bbox 는 새 폴리곤을 덮도록 갱신
+    for zid in ("R0", "R17", "R39"):
+        polys[zid] = _random_polygon(rng, rng.uniform(0, 10), rng.uniform(0, 10), 1.5)
+        idx.put(zt._CompiledZone(zid, polys[zid]))
+    assert len(idx) == 40 and len(idx.zones) == 40
+    _check_index(idx, polys, rng)
+
+
+def test_classify_points_tool(call):
+    rng = random.Random(5)
+    call("zone.define", {"params": {"zone_id": "CP1", "polygon": [[20, 20], [20, 21], [20.5, 20.2], [21, 21], [21, 20]]}})
+    call("zone.define", {"params": {"zone_id": "CP2", "polygon": [[20.4, 20.4], [20.4, 22], [22, 22], [22, 20.4]]}})
+    pts = [[rng.uniform(19.5, 22.5), rng.uniform(19.5, 22.5)] for _ in range(300)]
+    out = call("zone.classify_points", {"params": {"points": pts}})
+    assert out["ok"] and out["count"] == len(pts)
+    zones = call("zone.list", {"params": {}})["zones"]
+    for (lat, lon), got in zip(pts, out["results"]):
+        assert sorted(got) == sorted(z["zone_id"] for z in zones if _ray_cast(z["polygon"], lat, lon))
@@ -0,0 +1,186 @@
+# tool_catalog.py
+"""
+언어별 툴 카탈로그 캐시
+
+툴 목록은 툴이 등록/교체/삭제될 때만 바뀌는데, 지금까지는 세션마다 tools/list 를 새로 만들고
+브리지(BridgeSession.build_tools_block)도 요청마다 설명을 다시 조립했다. 여기서는 한 번 만들어 둔다.
+
+- 세대(generation): app 의 ToolManager.add_tool / remove_tool 을 감싸 호출될 때마다 +1.
+  캐시는 세대가 바뀔 때만 비워진다. (Tool.enable()/disable() 은 세대를 바꾸지 않는다)
+- tools/list: CatalogMiddleware 가 세대별로 결과(list[Tool])를 한 번만 만들고 재사용한다.
+- 언어별 직렬화: (lang, compact) 마다 MCP tools/list 형식의 JSON 을 한 번 만들어 둔다.
+  * lang='ko': eots_tools_ko.TOOL_DESCRIPTIONS_KO 설명 사용 (없으면 영문 설명)
+  * compact=True: 설명을 문장 단위로 토큰 예산(CATALOG_COMPACT_TOKENS) 안으로 자르고,
+    예시 줄과 입력 스키마의 title 키, 출력 스키마를 뺀다. 프롬프트에 넣을 툴 블록 크기를 줄이는 용도.
+- version / etag: version 은 세대, etag 는 직렬화 내용 해시. 툴이 다시 등록돼도 내용이 같으면
+  etag 가 그대로라서 클라이언트가 다시 받을 필요가 없다. /catalog 는 If-None-Match 에 304 로 응답한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+from eots_tools_ko import TOOL_DESCRIPTIONS_KO
+
+LANGS = ("en", "ko")
+# compact 변형의 설명 1개당 토큰 예산 (대략치)
+COMPACT_TOKENS = int(os.getenv("CATALOG_COMPACT_TOKENS", "48"))
+
+_SENTENCE = re.compile(r"(?<=[.!?。])\s+|\n+")
+_EXAMPLE = re.compile(r"^\s*(-|e\.g\.|예:|예\))")
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 쓰는 근사치: ASCII 4자당 1토큰, 그 외(한글 등) 1자당 1토큰."""
+    ascii_n = sum(1 for c in text if ord(c) < 128)
+    return (ascii_n + 3) // 4 + (len(text) - ascii_n)
+
+
+def compact_description(text: Optional[str], budget: int = COMPACT_TOKENS) -> str:
+    """예시 줄을 빼고 앞 문장부터 예산 안에서 이어 붙인다. 첫 문장이 예산을 넘으면 잘라서 '…'."""
+    if not text:
+        return ""
+    out: List[str] = []
+    used = 0
+    for s in _SENTENCE.split(text):
+        s = s.strip()
+        if not s or _EXAMPLE.match(s):
+            continue
+        n = estimate_tokens(s)
+        if used + n > budget:
+            if not out:
+                while s and estimate_tokens(s) > budget - 1:
+                    s = s[: int(len(s) * 0.9)]
+                out.append(s.rstrip() + "…")
+            break
+        out.append(s)
+        used += n
+    return " ".join(out)
+
+
+def _strip_titles(schema: Any) -> Any:
+    """pydantic 이 모든 속성에 붙이는 'title' 제거 (속성 이름이 'title' 인 경우는 유지)."""
+    if isinstance(schema, dict):
+        return {
+            k: (_strip_titles(v) if k != "properties" else {pk: _strip_titles(pv) for pk, pv in v.items()})
+            for k, v in schema.items()
+            if k != "title" or not isinstance(v, str)
+        }
+    if isinstance(schema, list):
+        return [_strip_titles(v) for v in schema]
+    return schema
+
+
+class CatalogEntry(NamedTuple):
+    version: int
+    etag: str
+    tools: List[Dict[str, Any]]
+    body: bytes  # {"version", "etag", "lang", "compact", "tokens", "tools"} JSON
+    tokens: int
+
+
+class ToolCatalog:
+
+    def __init__(self):
+        self.app = None
+        self.generation = 0
+        self._tools: Optional[Tuple[int, list]] = None  # (generation, list[Tool]) tools/list 결과
+        self._entries: Dict[Tuple[str, bool], CatalogEntry] = {}
+        self.builds = 0
+
+    def attach(self, app) -> None:
+        """app 의 툴 등록/삭제를 감시한다 (이미 등록된 툴은 첫 조회 때 반영)."""
+        self.app = app
+        tm = app._tool_manager
+        add, remove = tm.add_tool, tm.remove_tool
+
+        def add_tool(tool):
+            try:
+                return add(tool)
+            finally:
+                self.invalidate()
+
+        def remove_tool(key):
+            try:
+                return remove(key)
+            finally:
+                self.invalidate()
+
+        tm.add_tool, tm.remove_tool = add_tool, remove_tool
+
+    def invalidate(self) -> None:
+        self.generation += 1
+        self._tools = None
+        self._entries = {}
+
+    # ---- tools/list ----
+    def cached_tools(self) -> Optional[list]:
+        c = self._tools
+        return c[1] if c is not None and c[0] == self.generation else None
+
+    def store_tools(self, generation: int, tools: list) -> None:
+        if generation == self.generation:  # 만드는 동안 툴이 바뀌었으면 버린다
+            self._tools = (generation, tools)
+
+    # ---- 언어별 직렬화 ----
+    async def get(self, lang: str = "en", compact: bool = False) -> CatalogEntry:
+        if lang not in LANGS:
+            raise ValueError(f"unsupported lang {lang!r} (expected one of {LANGS})")
+        gen = self.generation
+        entry = self._entries.get((lang, compact))
+        if entry is not None and entry.version == gen:
+            return entry
+        tools = self.cached_tools()
+        if tools is None:
+            tools = await self.app._list_tools()  # tools/list 와 같은 경로 (CatalogMiddleware 가 캐시에 넣는다)
+        entry = self._build(gen, tools, lang, compact)
+        if gen == self.generation:
+            self._entries[(lang, compact)] = entry
+        return entry
+
+    def _build(self, gen: int, tools: list, lang: str, compact: bool) -> CatalogEntry:
+        self.builds += 1
+        items = []
+        for t in sorted(tools, key=lambda t: t.key):
+            d = t.to_mcp_tool(name=t.key).model_dump(by_alias=True, mode="json", exclude_none=True)
+            d.pop("_meta", None)
+            desc = TOOL_DESCRIPTIONS_KO.get(t.key, t.description) if lang == "ko" else t.description
+            if compact:
+                desc = compact_description(desc)
+                d["inputSchema"] = _strip_titles(d.get("inputSchema", {}))
+                d.pop("outputSchema", None)
+            d["description"] = desc or ""
+            items.append(d)
+        payload = json.dumps(items, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+        etag = '"' + hashlib.sha256(payload.encode()).hexdigest()[:20] + '"'
+        tokens = estimate_tokens(payload)
+        body = json.dumps(
+            {"version": gen, "etag": etag, "lang": lang, "compact": compact, "tokens": tokens, "tools": items},
+            ensure_ascii=False, separators=(",", ":"),
+        ).encode()
+        return CatalogEntry(gen, etag, items, body, tokens)
+
+
+class CatalogMiddleware(Middleware):
+    """tools/list 를 세대별 캐시에서 응답."""
+
+    def __init__(self, catalog: ToolCatalog):
+        self.catalog = catalog
+
+    async def __call__(self, context: MiddlewareContext, call_next):
+        if context.method != "tools/list":
+            return await call_next(context)
+        tools = self.catalog.cached_tools()
+        if tools is None:
+            gen = self.catalog.generation
+            tools = await call_next(context)
+            self.catalog.store_tools(gen, tools)
+        return list(tools)
+
+
+CATALOG = ToolCatalog()
@@ -0,0 +1,127 @@
+# tool_registry.py
+"""
+툴 모듈 지연 로딩 + 스키마 매니페스트 캐시
+
+서버 기동 비용의 상당 부분은 툴 모듈 import(NumPy, 지향/스캔/녹화 엔진 초기화)와 FastMCP 가
+툴마다 pydantic JSON 스키마를 만드는 일이다. 기동 시에는 이 둘을 건너뛴다.
+- 매니페스트: 툴 이름/설명/입출력 스키마/어노테이션 + 구현 모듈명을 담은 JSON (MCP_TOOL_MANIFEST).
+  키는 이 디렉터리 *.py 소스 + fastmcp 버전의 해시. 소스가 바뀌면 키가 달라져 다시 만든다.
+- 키가 맞으면: 매니페스트 항목마다 가벼운 LazyTool 을 등록한다 (tools/list 는 그대로 응답).
+  LazyTool 이 처음 호출되면 구현 모듈을 import 하고, 모듈의 @app.tool 이 같은 이름으로 실제 툴을
+  덮어쓴다 (app 은 on_duplicate_tools="replace"). 이후 호출은 실제 툴로 바로 간다.
+- 키가 다르거나 매니페스트가 없으면: 예전처럼 모두 import 하고 등록된 툴로 매니페스트를 새로 쓴다.
+
+MCP_LAZY_TOOLS=0 이면 항상 모두 import (매니페스트 사용 안 함).
+기동 시간 측정: python bench_startup.py
+"""
+from __future__ import annotations
+
+import glob
+import hashlib
+import importlib
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, List
+
+import fastmcp
+from fastmcp.exceptions import ToolError
+from fastmcp.tools.tool import Tool, ToolResult
+from pydantic import PrivateAttr
+
+logger = logging.getLogger("tool_registry")
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.getenv("MCP_TOOL_MANIFEST", os.path.join(_HERE, ".tool_manifest.json"))
+_FORMAT = 1
+
+
+def source_key(root: str = _HERE) -> str:
+    """툴 스키마에 영향을 줄 수 있는 소스(이 디렉터리의 모듈, bench_* 제외) + fastmcp 버전 해시."""
+    h = hashlib.sha256(f"{_FORMAT}:{fastmcp.__version__}".encode())
+    for path in sorted(glob.glob(os.path.join(root, "*.py"))):
+        name = os.path.basename(path)
+        if name.startswith("bench_"):
+            continue
+        h.update(name.encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class LazyTool(Tool):
+    """매니페스트에서 만든 자리표시자. 첫 호출 때 구현 모듈을 불러 실제 툴로 교체하고 위임한다."""
+
+    module: str
+    _app: Any = PrivateAttr(default=None)
+
+    async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+        _import(self.module)
+        real = self._app._tool_manager._tools.get(self.key)
+        if real is None or real is self:
+            raise ToolError(f"{self.name}: not registered by {self.module} (stale tool manifest?)")
+        return await real.run(arguments)
+
+
+def _import(module: str) -> None:
+    # sys.modules 에 있어도 다른 스레드가 아직 초기화 중일 수 있으므로 항상 import_module 을 거친다
+    # (모듈별 import 락에서 초기화가 끝날 때까지 기다린다)
+    if module not in sys.modules:
+        logger.info("loading tool module %s", module)
+    importlib.import_module(module)
+
+
+def _entry(tool: Tool) -> Dict[str, Any]:
+    return {
+        "module": getattr(getattr(tool, "fn", None), "__module__", None),
+        "name": tool.name,
+        "title": tool.title,
+        "description": tool.description,
+        "parameters": tool.parameters,
+        "output_schema": tool.output_schema,
+        "annotations": tool.annotations.model_dump(exclude_none=True) if tool.annotations else None,
+        "tags": sorted(tool.tags),
+    }
+
+
+def _read_manifest(path: str) -> Dict[str, Any] | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(app: fastmcp.FastMCP, modules: Iterable[str], key: str, path: str = MANIFEST_PATH) -> int:
+    mods = set(modules)
+    tools = [_entry(t) for t in app._tool_manager._tools.values()]
+    tools = [t for t in tools if t["module"] in mods]
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "tools": tools}, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning("tool manifest not written (%s): %s", path, e)
+    return len(tools)
+
+
+def register(app: fastmcp.FastMCP, modules: List[str], *, lazy: bool = True, path: str = MANIFEST_PATH) -> str:
+    """modules 의 툴을 app 에 등록. 반환값: 'lazy' (매니페스트 사용) 또는 'eager' (모두 import)."""
+    key = source_key() if lazy else ""
+    manifest = _read_manifest(path) if lazy else None
+    if manifest is not None and manifest.get("key") == key:
+        for entry in manifest["tools"]:
+            tool = LazyTool(**entry)
+            tool._app = app
+            app.add_tool(tool)
+        logger.info("registered %d tools lazily from %s", len(manifest["tools"]), path)
+        return "lazy"
+
+    for m in modules:
+        importlib.import_module(m)
+    if lazy:
+        n = write_manifest(app, modules, key, path)
+        logger.info("tool manifest rebuilt: %d tools -> %s", n, path)
+    return "eager"
@@ -1,11 +1,32 @@
 # zone_tools.py (Zone Management)
+import json
+import os
 from typing import Optional, Literal
+
+import numpy as np
 from pydantic import BaseModel, Field
+
+# Callbacks fn(zone_id) run after zone.define compiles a zone. Defined before
+# importing server_main: that import pulls in target_tools, which registers
+# its listener here while this module is still initializing.
+_ZONE_LISTENERS = []
+
 from server_main import app
 
+import eots_pointing
+import notify
+import persist
+
 _ZONES = {}
 _RULES = {}
 
+# Zones per leaf of the bounding-box index
+_NODE_SIZE = int(os.getenv("ZONE_INDEX_NODE_SIZE", "16"))
+# Max points accepted by a single zone.classify_points call
+_CLASSIFY_MAX = int(os.getenv("ZONE_CLASSIFY_MAX", "20000"))
+# Upper bound on points x edges evaluated at once by the point-in-polygon kernel
+_PIP_CHUNK = 1 << 20
+
 class ZoneDefineParams(BaseModel):
     zone_id: str
     type: Literal["restricted","harbor","lane","anchor"] = "restricted"
@@ -19,9 +40,278 @@ class ZoneRuleParams(BaseModel):
     rule: Literal["no_entry","speed_limit","night_ir_only","zoom_cap"]
     value: Optional[float] = None
 
+class ZoneContainsParams(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+class ZoneClassifyParams(BaseModel):
+    points: list[tuple[float, float]] = Field(
+        ..., min_length=1, max_length=_CLASSIFY_MAX, description="[[lat,lon], ...] positions to classify"
+    )
+
+
+class _CompiledZone:
+    """Polygon edges as NumPy arrays (lat = y, lon = x) plus its bounding box."""
+
+    __slots__ = ("zone_id", "vlat", "vlon", "y0", "y1", "x0", "slope", "bbox")
+
+    def __init__(self, zone_id: str, polygon: list):
+        v = np.asarray(polygon, dtype=np.float64)
+        if v.ndim != 2 or v.shape[1] != 2:
+            raise ValueError("polygon must be a list of [lat, lon] pairs")
+        if len(v) > 1 and np.array_equal(v[0], v[-1]):
+            v = v[:-1]  # closing vertex is implicit
+        if len(v) < 3:
+            raise ValueError("polygon needs at least 3 distinct vertices")
+        if not (np.all(np.abs(v[:, 0]) <= 90) and np.all(np.abs(v[:, 1]) <= 180)):
+            raise ValueError("polygon vertex out of lat/lon range")
+
+        self.zone_id = zone_id
+        self.vlat, self.vlon = v[:, 0].copy(), v[:, 1].copy()
+        # edge i runs from vertex i to vertex i+1 (wrapping)
+        self.y0, self.y1 = self.vlat, np.roll(self.vlat, -1)
+        self.x0 = self.vlon
+        dy = self.y1 - self.y0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # horizontal edges never straddle a test point, so their slope is unused
+            self.slope = np.where(dy != 0, (np.roll(self.vlon, -1) - self.x0) / dy, 0.0)
+        self.bbox = (self.vlat.min(), self.vlon.min(), self.vlat.max(), self.vlon.max())
+
+    def contains(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Even-odd crossing test for many points at once (points x edges broadcast)."""
+        out = np.zeros(lat.shape[0], dtype=bool)
+        step = max(1, _PIP_CHUNK // self.y0.size)
+        for i in range(0, lat.shape[0], step):
+            py = lat[i:i + step, None]
+            px = lon[i:i + step, None]
+            straddle = (self.y0 > py) != (self.y1 > py)
+            cross = straddle & (px < self.x0 + (py - self.y0) * self.slope)
+            out[i:i + step] = np.count_nonzero(cross, axis=1) & 1
+        return out
+
+
+class _ZoneIndex:
+    """
+    Two-level R-tree-style index over zone bounding boxes.
+
+    Zones live in slots grouped into leaves of up to _NODE_SIZE; every leaf
+    carries the union bbox of its members. Queries prune by leaf bbox, then
+    by member bbox, and only then run the polygon test. Redefining a zone
+    rewrites its slot and refreshes one leaf bbox; a new zone goes to the
+    non-full leaf whose bbox grows least (or a fresh leaf), and leaves are
+    re-packed (sort-tile-recursive, bboxes only) once the zone count has
+    grown by half since the last pack.
+    """
+
+    def __init__(self, node_size: int = _NODE_SIZE):
+        self.node_size = node_size
+        self.zones: list = []          # slot -> _CompiledZone
+        self.slot: dict = {}           # zone_id -> slot
+        self.bbox = np.empty((0, 4))   # slot -> (min_lat, min_lon, max_lat, max_lon)
+        self.leaves: list = []         # leaf -> np.ndarray of slots
+        self.leaf_bbox = np.empty((0, 4))
+        self.leaf_of: dict = {}        # slot -> leaf
+        self._packed = 0
+
+    def __len__(self) -> int:
+        return len(self.slot)
+
+    def put(self, z: _CompiledZone) -> None:
+        s = self.slot.get(z.zone_id)
+        if s is not None:
+            self.zones[s] = z
+            self.bbox[s] = z.bbox
+            self._refresh_leaf(self.leaf_of[s])
+            return
+
+        s = len(self.zones)
+        self.zones.append(z)
+        self.slot[z.zone_id] = s
+        self.bbox = np.vstack([self.bbox, z.bbox])
+        if len(self.slot) > max(self._packed * 3 // 2, self.node_size):
+            self.pack()
+            return
+        leaf = self._choose_leaf(z.bbox)
+        if leaf is None:
+            self.leaves.append(np.empty(0, dtype=np.intp))
+            self.leaf_bbox = np.vstack([self.leaf_bbox, z.bbox])
+            leaf = len(self.leaves) - 1
+        self.leaves[leaf] = np.append(self.leaves[leaf], s)
+        self.leaf_of[s] = leaf
+        self._refresh_leaf(leaf)
+
+    def _choose_leaf(self, b: tuple):
+        """Non-full leaf needing the least area enlargement to cover b, if any."""
+        if not self.leaves:
+            return None
+        lb = self.leaf_bbox
+        area = (lb[:, 2] - lb[:, 0]) * (lb[:, 3] - lb[:, 1])
+        grown = ((np.maximum(lb[:, 2], b[2]) - np.minimum(lb[:, 0], b[0]))
+                 * (np.maximum(lb[:, 3], b[3]) - np.minimum(lb[:, 1], b[1])))
+        cost = grown - area
+        cost[np.array([len(m) >= self.node_size for m in self.leaves])] = np.inf
+        leaf = int(np.argmin(cost))
+        return None if np.isinf(cost[leaf]) else leaf
+
+    def _refresh_leaf(self, leaf: int) -> None:
+        b = self.bbox[self.leaves[leaf]]
+        self.leaf_bbox[leaf] = (b[:, 0].min(), b[:, 1].min(), b[:, 2].max(), b[:, 3].max())
+
+    def pack(self) -> None:
+        """Sort-tile-recursive bulk load of the leaves from the slot bboxes."""
+        slots = np.fromiter(self.slot.values(), dtype=np.intp, count=len(self.slot))
+        n_leaves = -(-slots.size // self.node_size)
+        n_strips = max(1, int(np.ceil(np.sqrt(n_leaves))))
+        c_lat = (self.bbox[slots, 0] + self.bbox[slots, 2]) / 2
+        c_lon = (self.bbox[slots, 1] + self.bbox[slots, 3]) / 2
+        order = np.argsort(c_lon, kind="stable")
+        slots, c_lat = slots[order], c_lat[order]
+        per_strip = -(-slots.size // n_strips)
+
+        self.leaves, self.leaf_of = [], {}
+        for i in range(0, slots.size, per_strip):
+            strip = slots[i:i + per_strip]
+            strip = strip[np.argsort(c_lat[i:i + per_strip], kind="stable")]
+            for j in range(0, strip.size, self.node_size):
+                self.leaves.append(strip[j:j + self.node_size])
+        self.leaf_bbox = np.empty((len(self.leaves), 4))
+        for leaf, members in enumerate(self.leaves):
+            for s in members.tolist():
+                self.leaf_of[s] = leaf
+            self._refresh_leaf(leaf)
+        self._packed = slots.size
+
+    def query_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        """Slots whose bbox intersects the query box."""
+        if not self.leaves:
+            return np.empty(0, dtype=np.intp)
+        lb = self.leaf_bbox
+        hit = (lb[:, 0] <= max_lat) & (lb[:, 2] >= min_lat) & (lb[:, 1] <= max_lon) & (lb[:, 3] >= min_lon)
+        if not hit.any():
+            return np.empty(0, dtype=np.intp)
+        slots = np.concatenate([self.leaves[i] for i in np.flatnonzero(hit)])
+        b = self.bbox[slots]
+        keep = (b[:, 0] <= max_lat) & (b[:, 2] >= min_lat) & (b[:, 1] <= max_lon) & (b[:, 3] >= min_lon)
+        return slots[keep]
+
+    def query_boxes(self, min_lat, min_lon, max_lat, max_lon) -> tuple:
+        """
+        Batched query_bbox: for N query boxes return (query_idx, slot) pairs
+        of intersecting bboxes, pruned leaf by leaf.
+        """
+        empty = np.empty(0, dtype=np.intp)
+        if not self.leaves or min_lat.size == 0:
+            return empty, empty
+        lb = self.leaf_bbox
+        hit = ((lb[None, :, 0] <= max_lat[:, None]) & (lb[None, :, 2] >= min_lat[:, None])
+               & (lb[None, :, 1] <= max_lon[:, None]) & (lb[None, :, 3] >= min_lon[:, None]))
+        qs, ss = [empty], [empty]
+        for leaf in np.flatnonzero(hit.any(axis=0)):
+            q = np.flatnonzero(hit[:, leaf])
+            members = self.leaves[leaf]
+            b = self.bbox[members]
+            m = ((b[None, :, 0] <= max_lat[q, None]) & (b[None, :, 2] >= min_lat[q, None])
+                 & (b[None, :, 1] <= max_lon[q, None]) & (b[None, :, 3] >= min_lon[q, None]))
+            qi, mj = np.nonzero(m)
+            qs.append(q[qi])
+            ss.append(members[mj])
+        return np.concatenate(qs), np.concatenate(ss)
+
+    def contains(self, lat: float, lon: float) -> list:
+        """zone_ids whose polygon contains the point."""
+        pt_lat, pt_lon = np.array([lat]), np.array([lon])
+        out = []
+        for s in self.query_bbox(lat, lon, lat, lon).tolist():
+            z = self.zones[s]
+            if z.contains(pt_lat, pt_lon)[0]:
+                out.append(z.zone_id)
+        return out
+
+    def classify(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """
+        Membership matrix (points x slots) in one pass: points are pruned per
+        leaf and per zone bbox with vectorized compares, and each surviving
+        zone runs the polygon kernel over its candidate points only.
+        """
+        member = np.zeros((lat.shape[0], len(self.zones)), dtype=bool)
+        for leaf, members in enumerate(self.leaves):
+            lb = self.leaf_bbox[leaf]
+            in_leaf = np.flatnonzero((lat >= lb[0]) & (lat <= lb[2]) & (lon >= lb[1]) & (lon <= lb[3]))
+            if in_leaf.size == 0:
+                continue
+            plat, plon = lat[in_leaf], lon[in_leaf]
+            for s in members.tolist():
+                b = self.bbox[s]
+                sel = (plat >= b[0]) & (plat <= b[2]) & (plon >= b[1]) & (plon <= b[3])
+                if not sel.any():
+                    continue
+                idx = in_leaf[sel]
+                member[idx, s] = self.zones[s].contains(lat[idx], lon[idx])
+        return member
+
+
+_INDEX = _ZoneIndex()
+
+
+def _define(params: ZoneDefineParams) -> None:
+    """Compile and store a zone (raises ValueError/TypeError on a bad polygon)."""
+    compiled = _CompiledZone(params.zone_id, params.polygon)
+    _ZONES[params.zone_id] = params.dict()
+    _INDEX.put(compiled)
+    # 카메라 지향 해를 폴리곤이 바뀔 때만 다시 계산 (zone.move_camera 는 캐시만 조회)
+    eots_pointing.CACHE.put("zone", params.zone_id, eots_pointing.SOLVER.solve_polygon(compiled.vlat, compiled.vlon))
+
+
+def _set_rule(zone_id: str, rule: str, value: Optional[float]) -> None:
+    _RULES[zone_id] = {"rule": rule, "value": value}
+
+
+def _persist_zones() -> None:
+    p = persist.PERSIST
+    if p is None:
+        return
+
+    def dump():
+        return {}, {"zones": list(_ZONES.values()), "rules": dict(_RULES)}
+
+    def load(arrays, meta):
+        for z in meta["zones"]:
+            _define(ZoneDefineParams(**z))
+        for zone_id, r in meta["rules"].items():
+            _set_rule(zone_id, r["rule"], r["value"])
+
+    def replay(kind, payload):
+        if kind == persist.ZONE_DEFINE:
+            _define(ZoneDefineParams(**json.loads(payload)))
+        elif kind == persist.ZONE_RULE:
+            r = json.loads(payload)
+            _set_rule(r["zone_id"], r["rule"], r["value"])
+
+    # 대상 쪽 구역 포함 상태는 target_tools 가 자기 복구 뒤에 전체 구역으로 다시 맞춘다
+    p.register(persist.Domain("zones", dump, load, replay))
+
+
+_persist_zones()
+
+
+def _zone_item(zone_id: str) -> dict:
+    return {"zone": _ZONES.get(zone_id), "rule": _RULES.get(zone_id)}
+
+
+notify.HUB.source("zones", lambda: {z: _zone_item(z) for z in _ZONES})
+
+
 @app.tool(name="zone.define", description="Create/update a geofence zone")
 def zone_define(params: ZoneDefineParams):
-    _ZONES[params.zone_id] = params.dict()
+    try:
+        _define(params)
+    except (ValueError, TypeError) as e:
+        return {"ok": False, "error": "invalid_polygon", "detail": str(e)}
+    if persist.PERSIST is not None:
+        persist.PERSIST.log_json(persist.ZONE_DEFINE, _ZONES[params.zone_id])
+    for fn in _ZONE_LISTENERS:
+        fn(params.zone_id)
+    notify.HUB.publish("zones", {params.zone_id: _zone_item(params.zone_id)})
     return {"ok": True, "zone": _ZONES[params.zone_id]}
 
 @app.tool(name="zone.list", description="List zones")
@@ -35,9 +325,29 @@ def zone_list(params: ZoneListParams):
 def zone_set_rule(params: ZoneRuleParams):
     if params.zone_id not in _ZONES:
         return {"ok": False, "error": "zone_not_found"}
-    _RULES[params.zone_id] = {"rule": params.rule, "value": params.value}
+    _set_rule(params.zone_id, params.rule, params.value)
+    if persist.PERSIST is not None:
+        persist.PERSIST.log_json(persist.ZONE_RULE, {"zone_id": params.zone_id, **_RULES[params.zone_id]})
+    notify.HUB.publish("zones", {params.zone_id: _zone_item(params.zone_id)})
     return {"ok": True, "zone_id": params.zone_id, "rule": _RULES[params.zone_id]}
 
+@app.tool(name="zone.contains", description="List zone_ids whose polygon contains the given lat/lon")
+def zone_contains(params: ZoneContainsParams):
+    zs = _INDEX.contains(params.lat, params.lon)
+    return {"ok": True, "lat": params.lat, "lon": params.lon, "zones": zs}
+
+@app.tool(
+    name="zone.classify_points",
+    description="Classify many [lat,lon] positions against every zone; returns the containing zone_ids per point",
+)
+def zone_classify_points(params: ZoneClassifyParams):
+    pts = np.asarray(params.points, dtype=np.float64)
+    member = _INDEX.classify(pts[:, 0], pts[:, 1])
+    results = [[] for _ in range(len(pts))]
+    for p, s in zip(*np.nonzero(member)):
+        results[p].append(_INDEX.zones[s].zone_id)
+    return {"ok": True, "count": len(results), "results": results}
+
 # =========================
 # 도구: 특정 구역으로 카메라 이동
 # =========================
@@ -50,13 +360,22 @@ def zone_set_rule(params: ZoneRuleParams):
         "예: zone_id='A', 'B', 'HarborEntrance' 등."
     ),
 )
-def zone_move_camera(
+async def zone_move_camera(
     zone_id: str,
 ):
     """
     EOTS 카메라 시야를 zone_id로 정의된 구역을 바라보도록 이동시키는 도구.
 
     - zone_id: 'A', 'B', 'HarborEntrance' 등 미리 정의된 구역 ID 문자열
-    - 내부에서는 이 zone_id를 이용해 사전에 정의된 구역 정보를 찾아
-      카메라를 해당 구역 방향으로 이동시키는 로직을 구현하면 된다.
+    - zone.define 시점에 미리 계산해 둔 지향 해(구역 중심 방위/부각, 구역 전체가 들어오는 줌)를
+      그대로 카메라에 적용한다.
+    - 지향 해는 기본 카메라 설치 위치 기준이므로 기본 카메라를 움직이며, eots.* 명령과 같은 명령 큐 순서를 따른다.
     """
+    import eots_tools_core  # 지연 로딩: zone.list 등은 eots 툴 모듈 없이 동작하므로 호출 시점에 import
+
+    sol = eots_pointing.CACHE.get("zone", zone_id)
+    if sol is None:
+        return {"ok": False, "error": "zone_not_found"}
+    out = await eots_tools_core.point_default_camera(sol)
+    out["zone_id"] = zone_id
+    return out